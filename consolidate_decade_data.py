@@ -18,15 +18,43 @@ decade/
 └── ...
 
 Output: Single consolidated CSV per table with all years combined.
+
+Streaming mode (--stream) handles the append-only fact tables (grades, attendance,
+assignments, ...) without holding them in memory: each year is read in chunks,
+tagged with school_year_id and data_source_year in place, and appended straight
+to the output CSV or to a Parquet dataset (one file per year). Years arrive in
+order, so a year is only sorted (and rewritten) if its own rows are out of order.
+
+Partitioned mode (--partitioned) writes every table that has a school_year_id as
+a Hive-style dataset, table/school_year_id=N/*.parquet (or *.csv), with the
+partition column stored in the directory name only. read_consolidated() then
+reads just the requested years' partitions and columns:
+
+    grades = read_consolidated("consolidated_data", "grades", school_year_ids=[3],
+                               columns=["student_id", "score"])
+
+Usage:
+    python consolidate_decade_data.py --decade-folder data/decade
+    python consolidate_decade_data.py --decade-folder data/decade --stream --format parquet
+    python consolidate_decade_data.py --decade-folder data/decade --stream --partitioned
 """
 
 import glob
 import logging
 import os
-from typing import Dict, List
+import shutil
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from csv_ingest import load_table, load_table_chunks, read_csv_arrow, to_frame, use_jemalloc
+from entity_resolution import PERSON_TABLES, resolve_decade
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -34,10 +62,388 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _in_order(keys: pd.DataFrame) -> bool:
+    """Whether rows are already sorted by their key columns (lexicographically)"""
+    ordered = np.ones(max(len(keys) - 1, 0), dtype=bool)
+    for col in reversed(keys.columns):
+        values = keys[col].to_numpy()
+        ordered = (values[1:] > values[:-1]) | ((values[1:] == values[:-1]) & ordered)
+    return bool(ordered.all())
+
+
+class StreamSummary:
+    """Record counts, ID ranges, date and year ranges of a table seen chunk by chunk"""
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.records = 0
+        self.columns: List[str] = []
+        self._ids: Dict[str, Dict] = {}
+        self._dates: List[pd.Timestamp] = []
+        self._years: List = []
+
+    def update(self, chunk: pd.DataFrame):
+        """Fold one chunk into the summary"""
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        self.records += len(chunk)
+
+        for col in chunk.columns:
+            if col.endswith("_id") and col != "school_year_id":
+                ids = self._ids.setdefault(
+                    col, {"min": [], "max": [], "unique": np.array([]), "pending": []}
+                )
+                ids["min"].append(chunk[col].min())
+                ids["max"].append(chunk[col].max())
+                ids["pending"].append(chunk[col].dropna().unique())
+                # Merge pending values once they outnumber the distinct ones seen so far
+                if sum(len(values) for values in ids["pending"]) > len(ids["unique"]):
+                    self._merge_unique(ids)
+
+        date_columns = [col for col in chunk.columns if "date" in col.lower()]
+        if date_columns:
+            dates = pd.to_datetime(chunk[date_columns[0]], errors="coerce").dropna()
+            if not dates.empty:
+                self._dates.extend([dates.min(), dates.max()])
+
+        if "school_year_id" in chunk.columns:
+            self._years.extend([chunk["school_year_id"].min(), chunk["school_year_id"].max()])
+
+    @staticmethod
+    def _merge_unique(ids: Dict):
+        ids["unique"] = pd.unique(np.concatenate([ids["unique"]] + ids["pending"]))
+        ids["pending"] = []
+
+    def id_report(self) -> List[Dict]:
+        """Rows for the ID mapping report"""
+        for ids in self._ids.values():
+            self._merge_unique(ids)
+        return [
+            {
+                "table": self.table_name,
+                "id_column": col,
+                "min_id": pd.Series(ids["min"]).min(),
+                "max_id": pd.Series(ids["max"]).max(),
+                "unique_ids": len(ids["unique"]),
+                "total_records": self.records,
+                "has_duplicates": len(ids["unique"]) != self.records,
+            }
+            for col, ids in self._ids.items()
+        ]
+
+    def date_range(self) -> str:
+        if not self._dates:
+            return "N/A"
+        return f"{min(self._dates).strftime('%Y-%m-%d')} to {max(self._dates).strftime('%Y-%m-%d')}"
+
+    def year_range(self) -> str:
+        if not self._years:
+            return "N/A"
+        return f"Year {pd.Series(self._years).min()} to {pd.Series(self._years).max()}"
+
+
+class CsvAppender:
+    """Appends chunks to one CSV file; the last year written can be replaced"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.file = open(self.tmp_path, "w", newline="")
+        self.year_start = 0
+
+    def begin_year(self, year_folder: str):
+        self.year_start = self.file.tell()
+
+    def write(self, chunk: pd.DataFrame):
+        chunk.to_csv(self.file, header=self.file.tell() == 0, index=False)
+
+    def rewrite_year(self, frame: pd.DataFrame):
+        self.file.seek(self.year_start)
+        self.file.truncate()
+        self.write(frame)
+
+    def close(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class ParquetAppender:
+    """Appends chunks to a Parquet dataset directory with one file per year"""
+
+    def __init__(self, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.schema = None
+        self.writer = None
+        self.year_path = None
+
+    def begin_year(self, year_folder: str):
+        self._close_writer()
+        self.year_path = os.path.join(self.tmp_path, f"{year_folder}.parquet")
+
+    def write(self, chunk: pd.DataFrame):
+        table = self._pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+        if self.schema is None:
+            self.schema = _parquet_schema(self._pa, table)
+            table = table.cast(self.schema)
+        if self.writer is None:
+            self.writer = self._pq.ParquetWriter(self.year_path, self.schema)
+        self.writer.write_table(table)
+
+    def rewrite_year(self, frame: pd.DataFrame):
+        self._close_writer()
+        os.remove(self.year_path)
+        self.write(frame)
+
+    def _close_writer(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def close(self):
+        self._close_writer()
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp_path, self.path)
+
+
+PARTITION_COLUMN = "school_year_id"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"  # Hive's directory name for null values
+
+
+def _parquet_schema(pa, table):
+    """Schema of a first chunk; columns that are empty in it hold text later on"""
+    return pa.schema(
+        [
+            field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+            for field in table.schema
+        ]
+    )
+
+
+def _partition_name(value) -> str:
+    if pd.isna(value):
+        return f"{PARTITION_COLUMN}={NULL_PARTITION}"
+    if float(value).is_integer():
+        value = int(value)
+    return f"{PARTITION_COLUMN}={value}"
+
+
+class PartitionedAppender:
+    """Appends chunks to a Hive-partitioned dataset, table/school_year_id=N/<part>.<ext>.
+
+    Each partition gets one file per source year (its folder name), so the last
+    year written can be replaced by deleting just that year's files.
+    """
+
+    def __init__(self, path: str, output_format: str = "parquet"):
+        if output_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._pa = pa
+            self._pq = pq
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.output_format = output_format
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.schema = None
+        self.part = None
+        self.files: Dict[str, object] = {}  # Partition path -> open writer or file
+
+    def begin_year(self, year_folder: str):
+        self._close_files()
+        self.part = year_folder
+
+    def write(self, chunk: pd.DataFrame):
+        values = chunk[PARTITION_COLUMN].unique()
+        if len(values) == 1:
+            groups = [(values[0], chunk)]
+        else:
+            groups = chunk.groupby(PARTITION_COLUMN, sort=True, dropna=False)
+        for value, rows in groups:
+            self._append(_partition_name(value), rows.drop(columns=PARTITION_COLUMN))
+
+    def _append(self, partition: str, rows: pd.DataFrame):
+        file_path = os.path.join(
+            self.tmp_path, partition, f"{self.part}.{self.output_format}"
+        )
+        if self.output_format == "parquet":
+            table = self._pa.Table.from_pandas(rows, schema=self.schema, preserve_index=False)
+            if self.schema is None:
+                self.schema = _parquet_schema(self._pa, table)
+                table = table.cast(self.schema)
+            if file_path not in self.files:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                self.files[file_path] = self._pq.ParquetWriter(file_path, self.schema)
+            self.files[file_path].write_table(table)
+        else:
+            if file_path not in self.files:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                self.files[file_path] = open(file_path, "w", newline="")
+            out = self.files[file_path]
+            rows.to_csv(out, header=out.tell() == 0, index=False)
+
+    def rewrite_year(self, frame: pd.DataFrame):
+        written = list(self.files)
+        self._close_files()
+        for file_path in written:
+            os.remove(file_path)
+        self.write(frame)
+
+    def _close_files(self):
+        for writer in self.files.values():
+            writer.close()
+        self.files = {}
+
+    def close(self):
+        self._close_files()
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp_path, self.path)
+
+
+def list_partitions(folder: str, table_name: str) -> Dict[Optional[int], str]:
+    """school_year_id -> partition directory of a partitioned table (None for nulls)"""
+    table_path = os.path.join(folder, table_name)
+    partitions = {}
+    if os.path.isdir(table_path):
+        for item in sorted(os.listdir(table_path)):
+            column, _, value = item.partition("=")
+            if column == PARTITION_COLUMN and os.path.isdir(os.path.join(table_path, item)):
+                key = None if value == NULL_PARTITION else int(value)
+                partitions[key] = os.path.join(table_path, item)
+    return partitions
+
+
+def read_consolidated(
+    folder: str,
+    table_name: str,
+    school_year_ids: Optional[List[int]] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Read a consolidated table, optionally only some school years and columns.
+
+    Partitioned tables only open the selected years' partition files and only
+    parse the selected columns. Tables saved as one file are read with the column
+    projection and filtered by school_year_id afterwards.
+    """
+    partitions = list_partitions(folder, table_name)
+    if not partitions:
+        return _read_unpartitioned(folder, table_name, school_year_ids, columns)
+
+    wanted = set(school_year_ids) if school_year_ids is not None else None
+    file_columns = None if columns is None else [c for c in columns if c != PARTITION_COLUMN]
+
+    frames = []
+    for value, partition_path in sorted(
+        partitions.items(), key=lambda item: (item[0] is None, item[0] or 0)
+    ):
+        if wanted is not None and value not in wanted:
+            continue
+        for name in sorted(os.listdir(partition_path)):
+            file_path = os.path.join(partition_path, name)
+            if name.endswith(".parquet"):
+                frame = pd.read_parquet(file_path, columns=file_columns)
+            elif name.endswith(".csv"):
+                frame = load_table(file_path, table_name, file_columns, parse_dates=False)
+            else:
+                continue
+            if columns is None or PARTITION_COLUMN in columns:
+                frame[PARTITION_COLUMN] = np.nan if value is None else value
+            frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    result = pd.concat(frames, ignore_index=True)
+    return result if columns is None else result[columns]
+
+
+def _read_unpartitioned(
+    folder: str,
+    table_name: str,
+    school_year_ids: Optional[List[int]],
+    columns: Optional[List[str]],
+) -> pd.DataFrame:
+    """Read a table saved as one file (or a per-year Parquet dataset) and filter it.
+
+    Reference tables have no school_year_id; they hold every year's rows and are
+    returned unfiltered.
+    """
+    if school_year_ids is not None and PARTITION_COLUMN not in _stored_columns(folder, table_name):
+        school_year_ids = None
+
+    read_columns = columns
+    if columns is not None and school_year_ids is not None and PARTITION_COLUMN not in columns:
+        read_columns = list(columns) + [PARTITION_COLUMN]
+
+    parquet_path = os.path.join(folder, f"{table_name}.parquet")
+    dataset_path = os.path.join(folder, table_name)
+    if os.path.exists(parquet_path):
+        df = pd.read_parquet(parquet_path, columns=read_columns)
+    elif os.path.isdir(dataset_path):
+        df = pd.concat(
+            [
+                pd.read_parquet(os.path.join(dataset_path, name), columns=read_columns)
+                for name in sorted(os.listdir(dataset_path))
+                if name.endswith(".parquet")
+            ],
+            ignore_index=True,
+        )
+    else:
+        df = load_table(
+            os.path.join(folder, f"{table_name}.csv"), table_name, read_columns, parse_dates=False
+        )
+
+    if school_year_ids is not None:
+        df = df[df[PARTITION_COLUMN].isin(school_year_ids)].reset_index(drop=True)
+    return df if columns is None else df[columns]
+
+
+def _stored_columns(folder: str, table_name: str) -> List[str]:
+    """Column names of a table saved as one file or a per-year Parquet dataset"""
+    parquet_path = os.path.join(folder, f"{table_name}.parquet")
+    dataset_path = os.path.join(folder, table_name)
+    if os.path.isdir(dataset_path):
+        names = sorted(name for name in os.listdir(dataset_path) if name.endswith(".parquet"))
+        parquet_path = os.path.join(dataset_path, names[0]) if names else parquet_path
+    if os.path.exists(parquet_path):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(parquet_path).names
+    return list(pd.read_csv(os.path.join(folder, f"{table_name}.csv"), nrows=0).columns)
+
+
 class LuminosityDataConsolidator:
-    def __init__(self, decade_folder: str, output_folder: str = "./consolidated_data"):
+    def __init__(
+        self,
+        decade_folder: str,
+        output_folder: str = "./consolidated_data",
+        stream: bool = False,
+        output_format: str = "csv",
+        chunk_size: int = 100_000,
+        partitioned: bool = False,
+        workers: Optional[int] = None,
+        resolve_entities: bool = False,
+    ):
         self.decade_folder = decade_folder
         self.output_folder = output_folder
+        self.stream = stream
+        self.output_format = output_format
+        self.chunk_size = chunk_size
+        self.partitioned = partitioned
+        self.workers = workers
+        self.resolve_entities = resolve_entities
+        # Person ID column -> year folder -> (source ID -> canonical ID)
+        self.entity_ids: Dict[str, Dict[str, pd.Series]] = {}
+        self.reads: Dict[str, Future] = {}  # CSV path -> Arrow table being read
+        self.stream_summaries: Dict[str, StreamSummary] = {}
 
         # Expected table names based on YOUR EXACT file structure
         self.expected_tables = [
@@ -106,6 +512,18 @@ class LuminosityDataConsolidator:
         # Year-specific reference tables
         self.yearly_reference_tables = ["terms", "school_years"]
 
+        # Append-only fact tables, streamed year by year in streaming mode
+        self.fact_tables = [
+            "assignments",
+            "attendance",
+            "discipline_reports",
+            "enrollments",
+            "grades",
+            "payments",
+            "standardized_tests",
+            "student_grade_history",
+        ]
+
     def discover_school_years(self) -> List[str]:
         """Discover all school year folders in the decade directory."""
         year_folders = []
@@ -134,10 +552,15 @@ class LuminosityDataConsolidator:
         return table_names
 
     def add_year_context(
-        self, df: pd.DataFrame, table_name: str, school_year_id: int, year_folder: str
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        school_year_id: int,
+        year_folder: str,
+        inplace: bool = False,
     ) -> pd.DataFrame:
-        """Add year context to dataframe if needed."""
-        df_copy = df.copy()
+        """Add year context to dataframe if needed (modifying it directly when inplace)."""
+        df_copy = df if inplace else df.copy()
 
         # Add school_year_id to tables that need it (ALL consolidation tables)
         if table_name in self.tables_to_consolidate:
@@ -148,8 +571,25 @@ class LuminosityDataConsolidator:
         if table_name in self.tables_to_consolidate:
             df_copy["data_source_year"] = year_folder
 
+        # Replace this year's person IDs with canonical decade-wide ones
+        for column, year_ids in self.entity_ids.items():
+            if column in df_copy.columns and year_folder in year_ids:
+                canonical = df_copy[column].map(year_ids[year_folder])
+                df_copy[column] = canonical.fillna(df_copy[column]).astype(df_copy[column].dtype)
+
         return df_copy
 
+    def load_entity_ids(self):
+        """Resolve students and guardians across years into canonical IDs"""
+        for table_name, mapping in resolve_decade(self.decade_folder).items():
+            key = PERSON_TABLES[table_name][0]
+            self.entity_ids[key] = {
+                year: ids.set_index(key)["canonical_id"] for year, ids in mapping.groupby("year")
+            }
+            mapping.to_csv(
+                os.path.join(self.output_folder, f"{table_name}_canonical_ids.csv"), index=False
+            )
+
     def consolidate_table(
         self, table_name: str, year_folders: List[str]
     ) -> pd.DataFrame:
@@ -164,12 +604,12 @@ class LuminosityDataConsolidator:
 
             if os.path.exists(csv_path):
                 try:
-                    df = pd.read_csv(csv_path)
+                    df = self._read_csv(csv_path, table_name)
                     school_year_id = self.extract_school_year_id(year_folder)
 
-                    # Add year context
+                    # Add year context (df was just read, so no copy is needed)
                     df_with_context = self.add_year_context(
-                        df, table_name, school_year_id, year_folder
+                        df, table_name, school_year_id, year_folder, inplace=True
                     )
                     consolidated_data.append(df_with_context)
 
@@ -183,6 +623,13 @@ class LuminosityDataConsolidator:
         if consolidated_data:
             result = pd.concat(consolidated_data, ignore_index=True)
 
+            # One row per person (their latest year) instead of one per person-year
+            if self.entity_ids and table_name in PERSON_TABLES:
+                key = PERSON_TABLES[table_name][0]
+                records = len(result)
+                result = result.drop_duplicates(subset=key, keep="last")
+                logger.info(f"  {records:,} yearly records -> {len(result):,} people")
+
             # Remove duplicate reference data
             if table_name in self.reference_tables:
                 # Keep only unique records for reference tables
@@ -202,6 +649,115 @@ class LuminosityDataConsolidator:
             logger.warning(f"No data found for table: {table_name}")
             return pd.DataFrame()
 
+    def stream_table(
+        self, table_name: str, year_folders: List[str]
+    ) -> Optional[StreamSummary]:
+        """Consolidate an append-only table chunk by chunk, straight into the output.
+
+        Memory stays bounded by the chunk size unless a year's rows are out of
+        (school_year_id, first id) order; only that year is then loaded and sorted.
+        """
+        if self.partitioned:
+            appender = PartitionedAppender(
+                os.path.join(self.output_folder, table_name), self.output_format
+            )
+        elif self.output_format == "parquet":
+            output_path = os.path.join(self.output_folder, table_name)
+            appender = ParquetAppender(output_path)
+        else:
+            output_path = os.path.join(self.output_folder, f"{table_name}.csv")
+            appender = CsvAppender(output_path)
+
+        summary = StreamSummary(table_name)
+        columns = None
+        sort_columns = None
+        last = None  # Sort keys of the last row written
+
+        for year_folder in year_folders:
+            csv_path = os.path.join(self.decade_folder, year_folder, f"{table_name}.csv")
+            if not os.path.exists(csv_path):
+                logger.warning(f"Missing {table_name}.csv in {year_folder}")
+                continue
+
+            school_year_id = self.extract_school_year_id(year_folder)
+            appender.begin_year(year_folder)
+            year_records = 0
+            ordered = True
+            first = None
+            previous = None
+
+            for chunk in load_table_chunks(
+                csv_path, table_name, self.chunk_size, parse_dates=False
+            ):
+                self.add_year_context(chunk, table_name, school_year_id, year_folder, inplace=True)
+                if columns is None:
+                    columns = list(chunk.columns)
+                    sort_columns = list(
+                        dict.fromkeys(
+                            ["school_year_id"] + [col for col in columns if col.endswith("_id")][:1]
+                        )
+                    )
+                chunk = self._align_columns(chunk, columns, table_name, year_folder)
+
+                keys = chunk[sort_columns]
+                if first is None:
+                    first = keys.iloc[:1]
+                if ordered:
+                    ordered = _in_order(keys if previous is None else pd.concat([previous, keys]))
+                previous = keys.iloc[-1:]
+
+                appender.write(chunk)
+                summary.update(chunk)
+                year_records += len(chunk)
+
+            if not ordered:
+                logger.info(f"  {year_folder}: rows out of order, sorting this year")
+                year = self.add_year_context(
+                    load_table(csv_path, table_name, parse_dates=False),
+                    table_name,
+                    school_year_id,
+                    year_folder,
+                    inplace=True,
+                )
+                year = self._align_columns(year, columns, table_name, year_folder)
+                year = year.sort_values(sort_columns, kind="mergesort")
+                appender.rewrite_year(year)
+                first, previous = year[sort_columns].iloc[:1], year[sort_columns].iloc[-1:]
+
+            if last is not None and first is not None and not _in_order(pd.concat([last, first])):
+                logger.warning(
+                    f"{table_name}: {year_folder} starts before the previous year ends; "
+                    f"output is only sorted within each year"
+                )
+            if previous is not None:
+                last = previous
+
+            logger.info(f"  {year_folder}: {year_records} records")
+
+        appender.close()
+        if summary.records == 0:
+            logger.warning(f"No data found for table: {table_name}")
+            return None
+        return summary
+
+    def _align_columns(
+        self, df: pd.DataFrame, columns: List[str], table_name: str, year_folder: str
+    ) -> pd.DataFrame:
+        """Match a year's columns to those already written for the table"""
+        if list(df.columns) == columns:
+            return df
+        dropped = [col for col in df.columns if col not in columns]
+        if dropped:
+            logger.warning(f"{table_name} {year_folder}: dropping columns {dropped}")
+        return df.reindex(columns=columns)
+
+    def _read_csv(self, csv_path: str, table_name: str) -> pd.DataFrame:
+        """A year file as a DataFrame, from a concurrent read if one was started"""
+        read = self.reads.pop(csv_path, None)
+        if read is not None:
+            return to_frame(read.result())
+        return load_table(csv_path, table_name, parse_dates=False)
+
     def handle_reference_tables(
         self, year_folders: List[str]
     ) -> Dict[str, pd.DataFrame]:
@@ -218,7 +774,7 @@ class LuminosityDataConsolidator:
 
             if os.path.exists(csv_path):
                 try:
-                    df = pd.read_csv(csv_path)
+                    df = self._read_csv(csv_path, table_name)
                     reference_data[table_name] = df
                     logger.info(f"Reference table {table_name}: {len(df)} records")
                 except Exception as e:
@@ -257,6 +813,9 @@ class LuminosityDataConsolidator:
                             }
                         )
 
+        for summary in self.stream_summaries.values():
+            report.extend(summary.id_report())
+
         report_df = pd.DataFrame(report)
         if not report_df.empty:
             report_path = os.path.join(self.output_folder, "id_mapping_report.csv")
@@ -270,6 +829,15 @@ class LuminosityDataConsolidator:
                     f"Tables with duplicate IDs: {duplicates['table'].tolist()}"
                 )
 
+    def _start_reads(self, pool: ThreadPoolExecutor, table_name: str, year_folders: List[str]):
+        """Start reading a table's year files concurrently (each file once)"""
+        for year_folder in year_folders:
+            csv_path = os.path.join(self.decade_folder, year_folder, f"{table_name}.csv")
+            if os.path.exists(csv_path) and csv_path not in self.reads:
+                self.reads[csv_path] = pool.submit(
+                    read_csv_arrow, csv_path, table_name, parse_dates=False
+                )
+
     def consolidate_all_data(self) -> Dict[str, pd.DataFrame]:
         """Consolidate all tables from decade folder structure."""
         os.makedirs(self.output_folder, exist_ok=True)
@@ -285,21 +853,48 @@ class LuminosityDataConsolidator:
         logger.info(f"Available tables: {available_tables}")
 
         consolidated_data = {}
+        tables = [
+            table_name
+            for table_name in available_tables
+            if table_name in self.tables_to_consolidate
+            or table_name in self.yearly_reference_tables
+        ]
 
-        # Consolidate main data tables
-        for table_name in available_tables:
-            if (
-                table_name in self.tables_to_consolidate
-                or table_name in self.yearly_reference_tables
-            ):
+        if self.resolve_entities:
+            self.load_entity_ids()
+
+        in_memory = [
+            table_name
+            for table_name in tables
+            if not (self.stream and table_name in self.fact_tables)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # The small latest-year reference tables are read up front; in-memory
+            # tables are read one table ahead, so at most two tables' year files
+            # are held at once
+            for table_name in self.reference_tables:
+                self._start_reads(pool, table_name, year_folders[-1:])
+
+            # Consolidate main data tables
+            for table_name in tables:
+                if table_name in in_memory:
+                    position = in_memory.index(table_name)
+                    for ahead in in_memory[position : position + 2]:
+                        self._start_reads(pool, ahead, year_folders)
                 logger.info(f"Consolidating {table_name}...")
+                if self.stream and table_name in self.fact_tables:
+                    summary = self.stream_table(table_name, year_folders)
+                    if summary is not None:
+                        self.stream_summaries[table_name] = summary
+                    continue
                 consolidated_df = self.consolidate_table(table_name, year_folders)
                 if not consolidated_df.empty:
                     consolidated_data[table_name] = consolidated_df
 
-        # Handle reference tables
-        reference_data = self.handle_reference_tables(year_folders)
-        consolidated_data.update(reference_data)
+            # Handle reference tables
+            reference_data = self.handle_reference_tables(year_folders)
+            consolidated_data.update(reference_data)
 
         # Generate reports
         self.generate_id_mapping_report(consolidated_data)
@@ -313,9 +908,20 @@ class LuminosityDataConsolidator:
         for table_name, df in consolidated_data.items():
             if not df.empty:
                 # Use clean table name (e.g., 'students.csv' instead of 'students__2016_2017.csv')
-                clean_filename = f"{table_name}.csv"
+                clean_filename = f"{table_name}.{self.output_format}"
                 output_path = os.path.join(self.output_folder, clean_filename)
-                df.to_csv(output_path, index=False)
+                if self.partitioned and PARTITION_COLUMN in df.columns:
+                    clean_filename = f"{table_name}/"
+                    appender = PartitionedAppender(
+                        os.path.join(self.output_folder, table_name), self.output_format
+                    )
+                    appender.begin_year("part-0")
+                    appender.write(df)
+                    appender.close()
+                elif self.output_format == "parquet":
+                    df.to_parquet(output_path, index=False)
+                else:
+                    df.to_csv(output_path, index=False)
 
                 stats = {
                     "table": table_name,
@@ -328,6 +934,18 @@ class LuminosityDataConsolidator:
 
                 logger.info(f"Saved {clean_filename}: {len(df):,} records")
 
+        # Streamed tables were written while consolidating
+        for table_name, summary in self.stream_summaries.items():
+            summary_stats.append(
+                {
+                    "table": table_name,
+                    "total_records": summary.records,
+                    "columns": summary.columns,
+                    "date_range": summary.date_range(),
+                    "year_range": summary.year_range(),
+                }
+            )
+
         # Save summary report
         summary_df = pd.DataFrame(
             [
@@ -347,7 +965,7 @@ class LuminosityDataConsolidator:
 
         logger.info(f"Consolidation complete! Files saved to: {self.output_folder}")
         logger.info(
-            f"Summary: {len(consolidated_data)} tables, {sum(len(df) for df in consolidated_data.values()):,} total records"
+            f"Summary: {len(summary_stats)} tables, {sum(s['total_records'] for s in summary_stats):,} total records"
         )
 
     def get_date_range(self, df: pd.DataFrame) -> str:
@@ -383,32 +1001,69 @@ def main():
     parser.add_argument(
         "--output-folder", default="./consolidated_data", help="Output folder"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream append-only fact tables to the output in chunks instead of in memory",
+    )
+    parser.add_argument(
+        "--format", choices=["csv", "parquet"], default="csv", help="Output file format"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=100_000, help="Rows per chunk when streaming"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Year files read concurrently"
+    )
+    parser.add_argument(
+        "--resolve-entities",
+        action="store_true",
+        help="Give each student/guardian one canonical ID across years and one row per person",
+    )
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="Write year-specific tables as table/school_year_id=N/ partitions",
+    )
 
     args = parser.parse_args()
+    use_jemalloc()
 
     if not os.path.exists(args.decade_folder):
         logger.error(f"Decade folder not found: {args.decade_folder}")
         return
 
     # Initialize consolidator
-    consolidator = LuminosityDataConsolidator(args.decade_folder, args.output_folder)
+    consolidator = LuminosityDataConsolidator(
+        args.decade_folder,
+        args.output_folder,
+        stream=args.stream,
+        output_format=args.format,
+        chunk_size=args.chunk_size,
+        partitioned=args.partitioned,
+        workers=args.workers,
+        resolve_entities=args.resolve_entities,
+    )
 
     # Consolidate all data
     consolidated_data = consolidator.consolidate_all_data()
 
-    if consolidated_data:
+    if consolidated_data or consolidator.stream_summaries:
         # Save consolidated data
         consolidator.save_consolidated_data(consolidated_data)
+        total_records = sum(len(df) for df in consolidated_data.values()) + sum(
+            summary.records for summary in consolidator.stream_summaries.values()
+        )
 
         print("\n" + "=" * 60)
         print("CONSOLIDATION COMPLETE!")
         print("=" * 60)
         print(f"Input folder: {args.decade_folder}")
         print(f"Output folder: {args.output_folder}")
-        print(f"Tables processed: {len(consolidated_data)}")
-        print(f"Total records: {sum(len(df) for df in consolidated_data.values()):,}")
+        print(f"Tables processed: {len(consolidated_data) + len(consolidator.stream_summaries)}")
+        print(f"Total records: {total_records:,}")
         print("\nNext steps:")
-        print("1. Review the consolidated CSV files")
+        print(f"1. Review the consolidated {args.format.upper()} files")
         print("2. Check the ID mapping report for conflicts")
         print("3. Load into Supabase using your existing schema")
         print("4. Run data validation queries")
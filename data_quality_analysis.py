@@ -1,9 +1,13 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(str(Path(__file__).resolve().parent / "scripts"))
+from csv_ingest import load_table
+
 # Define the data directory
 data_dir = Path(r"C:\Users\Marshall Sisler\Projects\Luminosity\data\consolidated_data")
 
@@ -38,7 +42,7 @@ for file in files_to_analyze:
         print(f"{'='*60}")
         
         # Load the dataframe
-        df = pd.read_csv(filepath)
+        df = load_table(str(filepath))
         dfs[file.replace('.csv', '')] = df
         
         # Basic statistics
@@ -144,7 +148,7 @@ if 'students' in dfs and 'guardians' in dfs and 'student_guardians' in dfs:
     # Load guardian types if available
     guardian_types_file = data_dir / 'guardian_types.csv'
     if guardian_types_file.exists():
-        guardian_types_df = pd.read_csv(guardian_types_file)
+        guardian_types_df = load_table(str(guardian_types_file))
         guardian_type_map = dict(zip(guardian_types_df['guardian_type_id'], guardian_types_df['label']))
     else:
         guardian_type_map = {}
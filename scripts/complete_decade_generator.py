@@ -24,6 +24,8 @@ import numpy as np
 import pandas as pd
 from faker import Faker
 
+from contact_index import ContactUniquenessIndex
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -354,6 +356,8 @@ class GuardianRegistry:
         self.student_guardians = {}
         self.guardian_id_counter = 1
         self.transferred_guardians = {}  # Track guardians who transferred out
+        # Emails/phones stay claimed after transfers so they are never reissued
+        self.contact_index = ContactUniquenessIndex()
 
     def remove_student_guardians(self, student_id):
         """Remove guardians when student transfers out"""
@@ -436,8 +440,8 @@ class GuardianRegistry:
                         "guardian_id": self.guardian_id_counter,
                         "first_name": fake.first_name_female(),
                         "last_name": family_last_name,
-                        "email": fake.email(),
-                        "phone": fake.phone_number(),
+                        "email": self.contact_index.claim_email(fake.email()),
+                        "phone": self.contact_index.claim_phone(fake.phone_number()),
                     }
                     new_guardians.append(mother)
                     self.guardians[self.guardian_id_counter] = mother
@@ -457,8 +461,8 @@ class GuardianRegistry:
                         "guardian_id": self.guardian_id_counter,
                         "first_name": fake.first_name_male(),
                         "last_name": family_last_name,
-                        "email": fake.email(),
-                        "phone": fake.phone_number(),
+                        "email": self.contact_index.claim_email(fake.email()),
+                        "phone": self.contact_index.claim_phone(fake.phone_number()),
                     }
                     new_guardians.append(father)
                     self.guardians[self.guardian_id_counter] = father
@@ -480,8 +484,8 @@ class GuardianRegistry:
                         "guardian_id": self.guardian_id_counter,
                         "first_name": fake.first_name_female(),
                         "last_name": student_last_name,
-                        "email": fake.email(),
-                        "phone": fake.phone_number(),
+                        "email": self.contact_index.claim_email(fake.email()),
+                        "phone": self.contact_index.claim_phone(fake.phone_number()),
                     }
                     new_guardians.append(mother)
                     self.guardians[self.guardian_id_counter] = mother
@@ -503,8 +507,8 @@ class GuardianRegistry:
                         "guardian_id": self.guardian_id_counter,
                         "first_name": fake.first_name_male(),
                         "last_name": student_last_name,
-                        "email": fake.email(),
-                        "phone": fake.phone_number(),
+                        "email": self.contact_index.claim_email(fake.email()),
+                        "phone": self.contact_index.claim_phone(fake.phone_number()),
                     }
                     new_guardians.append(father)
                     self.guardians[self.guardian_id_counter] = father
@@ -544,8 +548,8 @@ class GuardianRegistry:
                     "guardian_id": self.guardian_id_counter,
                     "first_name": first_name,
                     "last_name": fake.last_name(),  # Different last name
-                    "email": fake.email(),
-                    "phone": fake.phone_number(),
+                    "email": self.contact_index.claim_email(fake.email()),
+                    "phone": self.contact_index.claim_phone(fake.phone_number()),
                 }
                 new_guardians.append(guardian)
                 self.guardians[self.guardian_id_counter] = guardian
@@ -670,6 +674,166 @@ class CurriculumManager:
         return f"Could not find subject: {old_name}"
 
 
+class ClassScheduler:
+    """Assigns teachers, classrooms, terms and periods to class sections without conflicts
+
+    Every (term, period) pair is a slot, and teachers, classrooms and section cohorts
+    each keep a bitset of the slots they are busy in. Sections are placed greedily,
+    most constrained first, on the least-loaded qualified teacher; when no qualified
+    teacher is free, a one-step repair hands one of their existing classes to another
+    qualified teacher before widening to the department and finally to all teachers.
+    """
+
+    # Class names that differ from the curriculum's subject names
+    SUBJECT_ALIASES = {
+        "Mathematics": "Math",
+        "English Language Arts": "ELA",
+        "Physical Education": "PE",
+        "English Literature": "English Lit.",
+        "World Literature": "World Lit.",
+        "Old World History": "World History",
+    }
+
+    def __init__(self, teachers, subjects, teacher_subjects_df, classrooms_df,
+                 num_periods=7, num_terms=4):
+        self.num_periods = num_periods
+        self.num_terms = num_terms
+        self.num_slots = num_periods * num_terms
+        self.all_slots = np.uint32((1 << self.num_slots) - 1)
+
+        self.teacher_ids = np.array([t["teacher_id"] for t in teachers], dtype=np.int64)
+        teacher_pos = {tid: i for i, tid in enumerate(self.teacher_ids)}
+        teacher_departments = np.array([t["department_id"] for t in teachers])
+
+        self.subject_by_name = {s["name"]: s for s in subjects}
+        self.qualified = {}
+        if not teacher_subjects_df.empty:
+            for subject_id, ids in teacher_subjects_df.groupby("subject_id")["teacher_id"]:
+                self.qualified[subject_id] = np.array(
+                    [teacher_pos[t] for t in ids if t in teacher_pos], dtype=np.int64
+                )
+        self.department_teachers = {
+            dept: np.flatnonzero(teacher_departments == dept)
+            for dept in np.unique(teacher_departments)
+        }
+        self.everyone = np.arange(len(self.teacher_ids))
+
+        self.classroom_ids = classrooms_df["classroom_id"].to_numpy()
+        self.classroom_capacity = classrooms_df["capacity"].to_numpy()
+
+    def _teacher_pools(self, subject_name):
+        """Candidate teacher positions, from most to least appropriate."""
+        subject = self.subject_by_name.get(
+            subject_name, self.subject_by_name.get(self.SUBJECT_ALIASES.get(subject_name))
+        )
+        pools = []
+        if subject is not None:
+            pools.append(self.qualified.get(subject["subject_id"], self.everyone[:0]))
+            pools.append(self.department_teachers.get(subject["department_id"], self.everyone[:0]))
+        pools.append(self.everyone)
+        return [pool for pool in pools if len(pool)]
+
+    def _slot_order(self, preferred_period):
+        """Slots ordered by preferred period first, spreading across terms."""
+        periods = (np.arange(self.num_periods) + preferred_period - 1) % self.num_periods
+        return [term * self.num_periods + period for period in periods for term in range(self.num_terms)]
+
+    def schedule(self, sections):
+        """Place sections given as dicts with name, cohort, size and preferred_period.
+
+        Returns one (teacher_id, classroom_id, period_id, term_id) tuple per section.
+        """
+        if sections and not len(self.teacher_ids):
+            raise ValueError(f"Unable to schedule {len(sections)} sections: no active teachers")
+
+        teacher_busy = np.zeros(len(self.teacher_ids), dtype=np.uint32)
+        teacher_load = np.zeros(len(self.teacher_ids), dtype=np.int64)
+        room_busy = np.zeros(len(self.classroom_ids), dtype=np.uint32)
+        cohort_busy = {}
+        teacher_at = {}  # (teacher position, slot) -> section index
+        placed = [None] * len(sections)
+
+        pools = [self._teacher_pools(section["name"]) for section in sections]
+        order = sorted(range(len(sections)), key=lambda i: len(pools[i][0]))
+
+        for i in order:
+            section = sections[i]
+            cohort_free = ~np.uint32(cohort_busy.get(section["cohort"], 0)) & self.all_slots
+            room_free = np.bitwise_or.reduce(~room_busy & self.all_slots) if len(room_busy) else np.uint32(0)
+            open_slots = int(cohort_free & room_free)
+            slot_order = [slot for slot in self._slot_order(section["preferred_period"])
+                          if open_slots >> slot & 1]
+
+            choice = None
+            for depth, pool in enumerate(pools[i]):
+                free = ~teacher_busy[pool] & self.all_slots
+                for slot in slot_order:
+                    available = pool[(free >> np.uint32(slot)) & 1 == 1]
+                    if len(available):
+                        choice = (available[np.argmin(teacher_load[available])], slot)
+                        break
+                if choice is None and depth == 0:
+                    choice = self._repair(
+                        pool, slot_order, pools, placed, teacher_busy, teacher_load, teacher_at
+                    )
+                if choice is not None:
+                    break
+
+            if choice is None:
+                raise ValueError(
+                    f"Unable to schedule {section['name']} for cohort {section['cohort']}: "
+                    "no free teacher, classroom and period"
+                )
+
+            teacher, slot = choice
+            bit = np.uint32(1 << slot)
+            free_rooms = np.flatnonzero((room_busy & bit) == 0)
+            fits = free_rooms[self.classroom_capacity[free_rooms] >= section["size"]]
+            room = (fits[np.argmin(self.classroom_capacity[fits])] if len(fits)
+                    else free_rooms[np.argmax(self.classroom_capacity[free_rooms])])
+
+            teacher_busy[teacher] |= bit
+            teacher_load[teacher] += 1
+            room_busy[room] |= bit
+            cohort_busy[section["cohort"]] = cohort_busy.get(section["cohort"], 0) | (1 << slot)
+            teacher_at[(teacher, slot)] = i
+            placed[i] = [teacher, room, slot]
+
+        return [
+            (
+                int(self.teacher_ids[teacher]),
+                int(self.classroom_ids[room]),
+                slot % self.num_periods + 1,
+                slot // self.num_periods + 1,
+            )
+            for teacher, room, slot in placed
+        ]
+
+    def _repair(self, pool, slot_order, pools, placed, teacher_busy, teacher_load, teacher_at):
+        """Free a qualified teacher by moving one of their classes to the least-loaded
+        other qualified teacher who is idle in that slot. Returns (teacher, slot) or None."""
+        for slot in slot_order:
+            bit = np.uint32(1 << slot)
+            for teacher in pool:
+                other = teacher_at.get((teacher, slot))
+                if other is None:
+                    continue
+                substitutes = pools[other][0]
+                substitutes = substitutes[(teacher_busy[substitutes] & bit) == 0]
+                if not len(substitutes):
+                    continue
+                substitute = substitutes[np.argmin(teacher_load[substitutes])]
+                teacher_busy[teacher] &= ~bit
+                teacher_busy[substitute] |= bit
+                teacher_load[teacher] -= 1
+                teacher_load[substitute] += 1
+                teacher_at[(substitute, slot)] = other
+                del teacher_at[(teacher, slot)]
+                placed[other][0] = substitute
+                return teacher, slot
+        return None
+
+
 class LuminosityDecadeGenerator:
     """Main class for generating 10 years of school data"""
 
@@ -882,9 +1046,11 @@ class LuminosityDecadeGenerator:
         )
 
         # 6. Generate academic data
-        year_data["classes"] = self._generate_classes(year)
-        year_data["enrollments"] = self._generate_enrollments(year_data["classes"])
         year_data["teacher_subjects"] = self._generate_teacher_subjects()
+        year_data["classes"] = self._generate_classes(
+            year, year_data["classrooms"], year_data["teacher_subjects"]
+        )
+        year_data["enrollments"] = self._generate_enrollments(year_data["classes"])
         year_data["assignments"] = self._generate_assignments(
             year, year_data["classes"]
         )
@@ -1192,9 +1358,10 @@ class LuminosityDecadeGenerator:
 
     # ==================== ACADEMIC DATA GENERATORS ====================
 
-    def _generate_classes(self, year):
-        """Generate class sections for the year"""
+    def _generate_classes(self, year, classrooms_df, teacher_subjects_df):
+        """Generate class sections for the year and schedule them without conflicts"""
         classes = []
+        sections = []
         class_id = 1
 
         # Generate classes based on current enrollment and grade levels
@@ -1266,57 +1433,79 @@ class LuminosityDecadeGenerator:
 
             for section in range(sections_needed):
                 for period, subject in enumerate(subjects, 1):
-                    # Find appropriate teacher
-                    available_teachers = list(
-                        self.teacher_registry.active_teachers.keys()
-                    )
-                    if available_teachers:
-                        teacher_id = random.choice(available_teachers)
-                    else:
-                        teacher_id = 1  # Fallback
-
                     classes.append(
                         {
                             "class_id": class_id,
                             "name": subject,
                             "grade_level_id": grade_level,
-                            "teacher_id": teacher_id,
-                            "classroom_id": random.randint(1, 20),
-                            "period_id": period,
-                            "term_id": random.randint(1, 4),
+                        }
+                    )
+                    sections.append(
+                        {
+                            "name": subject,
+                            "cohort": (grade_level, section),
+                            "size": -(-student_count // sections_needed),
+                            "preferred_period": period,
                         }
                     )
                     class_id += 1
 
+        scheduler = ClassScheduler(
+            list(self.teacher_registry.active_teachers.values()),
+            list(self.curriculum_manager.active_subjects.values()),
+            teacher_subjects_df,
+            classrooms_df,
+        )
+        for class_record, (teacher_id, classroom_id, period_id, term_id) in zip(
+            classes, scheduler.schedule(sections)
+        ):
+            class_record.update(
+                {
+                    "teacher_id": teacher_id,
+                    "classroom_id": classroom_id,
+                    "period_id": period_id,
+                    "term_id": term_id,
+                }
+            )
+
         return pd.DataFrame(classes)
 
     def _generate_enrollments(self, classes_df):
-        """Generate student enrollments in classes"""
-        enrollments = []
-        enrollment_id = 1
-
-        for _, class_record in classes_df.iterrows():
-            grade_level = class_record["grade_level_id"]
+        """Generate student enrollments, one section per subject for each student.
+
+        Class rows sharing a grade level and subject name are sections of the same
+        course. Each grade's students are shuffled into balanced cohorts and a student
+        attends the cohort-numbered section of every subject, so rosters are no longer
+        multiplied by the section count.
+        """
+        if classes_df.empty or not self.student_registry.active_students:
+            return pd.DataFrame(columns=["enrollment_id", "student_id", "class_id"])
+
+        # Grade-level index of active students, shuffled into cohorts within each grade
+        students = pd.DataFrame(list(self.student_registry.active_students.values()))[
+            ["student_id", "grade_level_id"]
+        ]
+        students["shuffle_key"] = np.random.random(len(students))
+        students = students.sort_values(["grade_level_id", "shuffle_key"], kind="stable")
+        students["cohort"] = students.groupby("grade_level_id").cumcount()
 
-            # Find students in this grade level
-            grade_students = [
-                s
-                for s in self.student_registry.active_students.values()
-                if s["grade_level_id"] == grade_level
-            ]
+        sections = classes_df[["class_id", "grade_level_id", "name"]].copy()
+        course = sections.groupby(["grade_level_id", "name"], sort=False)
+        sections["section"] = course.cumcount()
+        sections["section_count"] = course["class_id"].transform("size")
 
-            # Enroll students in class
-            for student in grade_students:
-                enrollments.append(
-                    {
-                        "enrollment_id": f"ENR{enrollment_id:06d}",
-                        "student_id": student["student_id"],
-                        "class_id": class_record["class_id"],
-                    }
-                )
-                enrollment_id += 1
+        roster = students.merge(sections, on="grade_level_id")
+        roster = roster[roster["cohort"] % roster["section_count"] == roster["section"]]
+        roster = roster.sort_values(["class_id", "student_id"], kind="stable")
 
-        return pd.DataFrame(enrollments)
+        enrollment_numbers = pd.Series(np.arange(1, len(roster) + 1))
+        return pd.DataFrame(
+            {
+                "enrollment_id": enrollment_numbers.map("ENR{:06d}".format).to_numpy(),
+                "student_id": roster["student_id"].to_numpy(),
+                "class_id": roster["class_id"].to_numpy(),
+            }
+        )
 
     def _generate_assignments(self, year, classes_df):
         """Generate assignments for all classes (~2 per week per class)"""
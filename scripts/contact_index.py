@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Contact Uniqueness Index for Luminosity School Management System
+
+Guardian emails and phones must be unique across the whole decade, otherwise the
+Supabase upload rejects them with unique-constraint errors. Both guardian
+generators (GuardianGenerator and GuardianRegistry) claim every contact through
+this index, and collisions are resolved at generation time with deterministic
+suffixing:
+- Emails get a numeric suffix on the local part: jane.doe@gmail.com -> jane.doe2@gmail.com
+- Phones get their last four digits bumped, keeping the original format
+
+By default the index keeps exact hash sets of normalized keys. For very large runs
+a Bloom filter can be used instead; it may report a false "already taken" (which
+only causes an unnecessary suffix) but never misses a real duplicate.
+"""
+
+import hashlib
+import math
+import re
+from typing import Iterable, Optional
+
+import pandas as pd
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using deterministic blake2b hashing."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("Bloom filter capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("Bloom filter error rate must be between 0 and 1")
+
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing (Kirsch-Mitzenmacher) from a single 128-bit digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class ContactUniquenessIndex:
+    """Tracks claimed guardian emails/phones and hands out collision-free values."""
+
+    MAX_PHONE_ATTEMPTS = 10000
+
+    def __init__(self, bloom_capacity: Optional[int] = None, bloom_error_rate: float = 0.001):
+        """Use exact hash sets, or a Bloom filter sized for bloom_capacity contacts."""
+        if bloom_capacity:
+            self._emails = BloomFilter(bloom_capacity, bloom_error_rate)
+            self._phones = BloomFilter(bloom_capacity, bloom_error_rate)
+        else:
+            self._emails = set()
+            self._phones = set()
+
+        self.email_collisions = 0
+        self.phone_collisions = 0
+
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        return email.strip().lower()
+
+    @staticmethod
+    def normalize_phone(phone: str) -> str:
+        return re.sub(r"\D", "", phone)
+
+    def register_existing(self, emails: Iterable[str] = (), phones: Iterable[str] = ()):
+        """Mark contacts from previously generated data as taken."""
+        for email in emails:
+            if isinstance(email, str) and email:
+                self._emails.add(self.normalize_email(email))
+        for phone in phones:
+            if isinstance(phone, str) and phone:
+                self._phones.add(self.normalize_phone(phone))
+
+    def register_guardians(self, guardians_df: pd.DataFrame):
+        """Mark every email/phone in an existing guardians table as taken."""
+        self.register_existing(
+            guardians_df["email"] if "email" in guardians_df.columns else (),
+            guardians_df["phone"] if "phone" in guardians_df.columns else (),
+        )
+
+    def claim_email(self, email: str) -> str:
+        """Return email, or the first free numerically suffixed variant of it."""
+        local, _, domain = email.partition("@")
+        candidate = email
+        suffix = 2
+        while self.normalize_email(candidate) in self._emails:
+            candidate = f"{local}{suffix}@{domain}"
+            suffix += 1
+
+        if candidate != email:
+            self.email_collisions += 1
+        self._emails.add(self.normalize_email(candidate))
+        return candidate
+
+    def claim_phone(self, phone: str) -> str:
+        """Return phone, or the first free variant with its last four digits bumped."""
+        # Leave any extension ("x1234") alone and bump the subscriber number
+        main, sep, extension = phone.partition("x")
+        digit_positions = [i for i, ch in enumerate(main) if ch.isdigit()]
+        if len(digit_positions) < 4:
+            raise ValueError(f"Cannot derive a unique variant of phone number {phone!r}")
+
+        tail_positions = digit_positions[-4:]
+        base = int("".join(main[i] for i in tail_positions))
+        candidate = phone
+
+        for attempt in range(1, self.MAX_PHONE_ATTEMPTS + 1):
+            if self.normalize_phone(candidate) not in self._phones:
+                break
+            chars = list(main)
+            for pos, digit in zip(tail_positions, f"{(base + attempt) % 10000:04d}"):
+                chars[pos] = digit
+            candidate = "".join(chars) + sep + extension
+        else:
+            raise ValueError(f"No free phone number left for prefix of {phone!r}")
+
+        if candidate != phone:
+            self.phone_collisions += 1
+        self._phones.add(self.normalize_phone(candidate))
+        return candidate
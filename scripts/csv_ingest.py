@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Multithreaded, schema-typed CSV ingestion for the Luminosity decade dataset
+
+Year files are parsed with pyarrow.csv, which splits each file into blocks and
+converts them on Arrow's thread pool, instead of pandas' single-threaded parser.
+Column types come from the schema registry (schema_registry.py), so every year of
+a table gets the same compact types without inference: int32 keys, categorical
+enums, datetime64 dates, bools. A file whose values do not fit the schema types is
+re-read with its dates as text, then with inference.
+
+load_table() is the loader every tool goes through: column projection, typed
+parsing and optionally Arrow-backed pandas dtypes. load_table_chunks() streams
+a file in fixed-size chunks with the same types. read_csv_arrow() returns the
+Arrow table itself so callers convert to pandas only when they need to. Reading
+several files at once is a matter of submitting it to a ThreadPoolExecutor;
+parsing releases the GIL.
+
+Parsed tables are cached in an Arrow IPC (Feather v2) sidecar next to each CSV
+(.attendance.csv.typed.arrow). The sidecar records the CSV's size, mtime and
+blake2b hash, the load variant and the schema fingerprint. A later load of the
+unchanged CSV memory-maps it instead of parsing text; a touched but identical CSV
+is recognized by its hash. Any other change rebuilds it. Set
+LUMINOSITY_CSV_CACHE=0 to disable the cache.
+
+Usage:
+    python csv_ingest.py --data-dir ../data/decade
+    python csv_ingest.py --data-dir ../data/decade --clear-cache
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from schema_registry import SCHEMA_FILE, SchemaRegistry, get_registry
+
+logger = logging.getLogger(__name__)
+
+Source = Union[str, IO[bytes]]
+
+CACHE_ENABLED = os.getenv("LUMINOSITY_CSV_CACHE", "1") != "0"
+CACHE_VERSION = "1"
+CACHE_SUFFIX = ".arrow"
+_CACHE_METADATA = b"luminosity_csv_cache"
+
+
+def use_jemalloc() -> bool:
+    """Make jemalloc Arrow's default memory pool for the whole process.
+
+    jemalloc hands freed parse buffers back to the OS sooner than mimalloc, Arrow's
+    default, so peak RSS follows the frames that are actually alive. This changes
+    the allocator of every pyarrow user in the process, including pandas'
+    Arrow-backed strings, so only CLIs call it. Returns False when pyarrow was
+    built without jemalloc.
+    """
+    try:
+        pa.set_memory_pool(pa.jemalloc_memory_pool())
+    except NotImplementedError:
+        return False
+    return True
+
+
+def _table_name(source: Source, table_name: Optional[str]) -> Optional[str]:
+    if table_name is None and isinstance(source, str):
+        return os.path.splitext(os.path.basename(source))[0]
+    return table_name
+
+
+def _convert_options(types: Dict[str, pa.DataType], columns: Optional[List[str]]) -> pacsv.ConvertOptions:
+    # Empty text fields are missing values, as pandas reads them
+    return pacsv.ConvertOptions(
+        column_types=types, include_columns=columns, strings_can_be_null=True
+    )
+
+
+def _keep_inferred_dates_as_text(
+    table: pa.Table, types: Dict[str, pa.DataType], date_columns: List[str]
+) -> pa.Table:
+    """pandas keeps dates it was not told about as text; do the same"""
+    for i, field in enumerate(table.schema):
+        if field.name not in types and field.name not in date_columns and (
+            pa.types.is_date(field.type) or pa.types.is_timestamp(field.type)
+        ):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+    return table
+
+
+def _parse_csv(
+    source: Source,
+    table_name: Optional[str],
+    columns: Optional[List[str]],
+    compact: bool,
+    parse_dates: bool,
+    registry: SchemaRegistry,
+) -> pa.Table:
+    types = registry.arrow_types(table_name, compact, parse_dates)
+    date_columns = registry.date_columns(table_name) if compact and parse_dates else []
+
+    # Schema types, then the same with dates kept as text (not ISO), then inference
+    text_dates = [registry.arrow_types(table_name, compact, False)] if date_columns else []
+    for types in [types] + text_dates + [{}]:
+        try:
+            table = pacsv.read_csv(source, convert_options=_convert_options(types, columns))
+            break
+        except pa.ArrowInvalid as e:
+            if not types:
+                raise
+            logger.warning(f"⚠️ {table_name} does not match schema types, loosening them: {e}")
+            if not isinstance(source, str):
+                source.seek(0)
+
+    return _keep_inferred_dates_as_text(table, types, date_columns)
+
+
+def cache_path(path: str, compact: bool = True, parse_dates: bool = True) -> str:
+    """Sidecar file caching one load variant of a CSV"""
+    variant = "plain" if not compact else "typed" if parse_dates else "typed-text-dates"
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{variant}{CACHE_SUFFIX}")
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _open_cache(sidecar: str) -> Optional[Tuple[pa.ipc.RecordBatchFileReader, Dict]]:
+    """Memory-mapped reader of a sidecar and its recorded key, or None if unusable"""
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(sidecar, "r"))
+        return reader, json.loads(reader.schema.metadata[_CACHE_METADATA])
+    except (OSError, pa.ArrowInvalid, KeyError, TypeError, ValueError):
+        return None
+
+
+def _write_cache(sidecar: str, table: pa.Table, key: Dict):
+    """Write a sidecar atomically, uncompressed so it can be memory-mapped"""
+    # The IPC file format needs one dictionary per column for all batches
+    table = table.unify_dictionaries().replace_schema_metadata(
+        {_CACHE_METADATA: json.dumps(key)}
+    )
+    tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        with pa.ipc.new_file(tmp_path, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, sidecar)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _cached_table(
+    path: str,
+    table_name: Optional[str],
+    compact: bool,
+    parse_dates: bool,
+    registry: SchemaRegistry,
+    build: bool = True,
+) -> Optional[pa.Table]:
+    """The memory-mapped cached table of a CSV, (re)built from the CSV when missing
+    or stale; None when there is no valid sidecar and build is False"""
+    sidecar = cache_path(path, compact, parse_dates)
+    stat = os.stat(path)
+    key = {
+        "version": CACHE_VERSION,
+        "table": table_name,
+        "schema": registry.fingerprint,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+    cached = _open_cache(sidecar)
+    if cached is not None:
+        reader, recorded = cached
+        same_inputs = all(recorded.get(k) == key[k] for k in ("version", "table", "schema", "size"))
+        if same_inputs and recorded["mtime_ns"] == key["mtime_ns"]:
+            return reader.read_all().replace_schema_metadata(None)
+        if same_inputs and recorded.get("hash") == _file_hash(path):
+            # Touched but unchanged: record the new mtime so the next load skips the hash
+            table = reader.read_all()
+            try:
+                _write_cache(sidecar, table, {**recorded, "mtime_ns": key["mtime_ns"]})
+            except OSError as e:
+                logger.debug(f"Could not refresh {sidecar}: {e}")
+            return table.replace_schema_metadata(None)
+    if not build:
+        return None
+
+    key["hash"] = _file_hash(path)
+    table = _parse_csv(path, table_name, None, compact, parse_dates, registry)
+    try:
+        _write_cache(sidecar, table, key)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not cache {path}: {e}")
+        return table
+    reopened = _open_cache(sidecar)
+    return table if reopened is None else reopened[0].read_all().replace_schema_metadata(None)
+
+
+def read_csv_arrow(
+    source: Source,
+    table_name: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    compact: bool = True,
+    parse_dates: bool = True,
+    schema_path: str = SCHEMA_FILE,
+    cache: Optional[bool] = None,
+) -> pa.Table:
+    """Read one CSV file (path or binary buffer) with multithreaded parsing and
+    schema column types.
+
+    Paths go through the sidecar cache unless cache is False (default:
+    CACHE_ENABLED); a miss parses and caches every column, then projects.
+    """
+    table_name = _table_name(source, table_name)
+    registry = get_registry(schema_path)
+    if isinstance(source, str) and (CACHE_ENABLED if cache is None else cache):
+        table = _cached_table(source, table_name, compact, parse_dates, registry)
+        return table.select(columns) if columns else table
+    return _parse_csv(source, table_name, columns, compact, parse_dates, registry)
+
+
+def to_frame(table: pa.Table, arrow_dtypes: bool = False) -> pd.DataFrame:
+    """Arrow table to pandas: dates as datetime64, enums as categoricals, or every
+    column Arrow-backed (pd.ArrowDtype) with arrow_dtypes"""
+    if arrow_dtypes:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas(date_as_object=False)
+
+
+def load_table(
+    source: Source,
+    table_name: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    compact: bool = True,
+    parse_dates: bool = True,
+    arrow_dtypes: bool = False,
+    schema_path: str = SCHEMA_FILE,
+    cache: Optional[bool] = None,
+) -> pd.DataFrame:
+    """Load one table as a DataFrame with its registered dtypes.
+
+    source is a CSV path, or a binary buffer when table_name is given. columns
+    projects the read onto those columns. parse_dates=False keeps dates as text and
+    compact=False gives the plain int64/text types.
+    """
+    return to_frame(
+        read_csv_arrow(source, table_name, columns, compact, parse_dates, schema_path, cache),
+        arrow_dtypes,
+    )
+
+
+def load_table_chunks(
+    path: str,
+    table_name: Optional[str] = None,
+    chunk_size: int = 100_000,
+    columns: Optional[List[str]] = None,
+    compact: bool = True,
+    parse_dates: bool = True,
+    schema_path: str = SCHEMA_FILE,
+    cache: Optional[bool] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream a table in chunks of chunk_size rows (the last one shorter), typed and
+    indexed like pd.read_csv(chunksize=chunk_size) would number them.
+
+    A valid sidecar is sliced instead of parsing the CSV. Streaming never builds
+    one, since that would parse the whole file at once.
+    """
+    table_name = _table_name(path, table_name)
+    registry = get_registry(schema_path)
+    if CACHE_ENABLED if cache is None else cache:
+        table = _cached_table(path, table_name, compact, parse_dates, registry, build=False)
+        if table is not None:
+            if columns:
+                table = table.select(columns)
+            for start in range(0, table.num_rows, chunk_size):
+                yield _numbered(to_frame(table.slice(start, chunk_size)), start)
+            return
+
+    types = registry.arrow_types(table_name, compact, parse_dates)
+    date_columns = registry.date_columns(table_name) if compact and parse_dates else []
+
+    rows_done = 0
+    try:
+        reader = pacsv.open_csv(path, convert_options=_convert_options(types, columns))
+        pending, rows = [], 0
+        for batch in reader:
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= chunk_size:
+                table = pa.Table.from_batches(pending)
+                chunk = _keep_inferred_dates_as_text(table.slice(0, chunk_size), types, date_columns)
+                rest = table.slice(chunk_size)
+                pending, rows = rest.to_batches(), rest.num_rows
+                yield _numbered(to_frame(chunk), rows_done)
+                rows_done += chunk.num_rows
+        if rows:
+            chunk = _keep_inferred_dates_as_text(pa.Table.from_batches(pending), types, date_columns)
+            yield _numbered(to_frame(chunk), rows_done)
+    except pa.ArrowInvalid as e:
+        # Values past the first block that do not fit: finish the file with pandas
+        logger.warning(f"⚠️ {path} does not match schema types, inferring instead: {e}")
+        for chunk in pd.read_csv(
+            path, usecols=columns, chunksize=chunk_size, skiprows=range(1, rows_done + 1)
+        ):
+            yield _numbered(chunk, rows_done)
+            rows_done += len(chunk)
+
+
+def _numbered(frame: pd.DataFrame, start: int) -> pd.DataFrame:
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame
+
+
+def clear_cache(data_dir: str) -> int:
+    """Delete every sidecar under a data folder; returns how many"""
+    removed = 0
+    for directory, _, names in os.walk(data_dir):
+        for name in names:
+            if name.startswith(".") and ".csv." in name and name.endswith(CACHE_SUFFIX):
+                os.remove(os.path.join(directory, name))
+                removed += 1
+    return removed
+
+
+def main():
+    """Time and size pandas against concurrent typed ingestion of a decade folder,
+    parsed and from the sidecar cache"""
+    parser = argparse.ArgumentParser(description="Benchmark Luminosity CSV ingestion")
+    parser.add_argument(
+        "--data-dir", default="../data/decade", help="Directory containing decade data"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Files read concurrently")
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="Only delete the cached sidecars and exit"
+    )
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        logger.info(f"🧹 Removed {clear_cache(args.data_dir)} cached tables")
+        return 0
+
+    files = sorted(
+        os.path.join(args.data_dir, year, name)
+        for year in os.listdir(args.data_dir)
+        if "-" in year and os.path.isdir(os.path.join(args.data_dir, year))
+        for name in os.listdir(os.path.join(args.data_dir, year))
+        if name.endswith(".csv")
+    )
+    total_bytes = sum(os.path.getsize(path) for path in files)
+
+    def frame_bytes(frame: pd.DataFrame) -> int:
+        return int(frame.memory_usage(deep=True).sum())
+
+    def timed(load) -> Tuple[float, int]:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            loaded = sum(map(frame_bytes, pool.map(load, files)))
+        return time.perf_counter() - start, loaded
+
+    start = time.perf_counter()
+    pandas_bytes = sum(frame_bytes(pd.read_csv(path)) for path in files)
+    pandas_time = time.perf_counter() - start
+
+    arrow_time, typed_bytes = timed(lambda path: load_table(path, cache=False))
+    clear_cache(args.data_dir)
+    build_time, _ = timed(load_table)
+    cached_time, _ = timed(load_table)
+    start = time.perf_counter()
+    for path in files:
+        read_csv_arrow(path)
+    mapped_time = time.perf_counter() - start
+
+    print(f"{len(files)} files, {total_bytes / 1e6:.1f} MB")
+    print(
+        f"pandas.read_csv:         {pandas_time:6.2f}s ({total_bytes / 1e6 / pandas_time:.0f} MB/s), "
+        f"{pandas_bytes / 1e6:.1f} MB in memory"
+    )
+    print(
+        f"load_table, concurrent:  {arrow_time:6.2f}s ({total_bytes / 1e6 / arrow_time:.0f} MB/s), "
+        f"{typed_bytes / 1e6:.1f} MB in memory"
+    )
+    print(f"load_table, cache build: {build_time:6.2f}s")
+    print(f"load_table, cached:      {cached_time:6.2f}s")
+    print(f"read_csv_arrow, cached:  {mapped_time:6.2f}s (memory-mapped Arrow tables)")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    exit(main())
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+In-process query layer over consolidated Luminosity decade data
+
+Answers entity questions (a student's transcript, a class roster with grades, a
+guardian's payment history) locally, without loading and filtering whole CSVs per
+question or calling Supabase. Works on any consolidator output: single CSV or
+Parquet files and school_year_id partitions, all read through read_consolidated.
+
+Each view is a SortedIndex: the rows sorted once by their key (student_id,
+guardian_id, (school_year_id, class_id) or a date), then by date or name, with the
+offset where every key's run starts. A lookup is one binary search over the
+distinct keys and returns that run as a slice, and a date range within a run is
+a second binary search, so lookups take microseconds whatever the table size.
+Views are built on first use; student and guardian IDs are decade-wide (canonical
+after --resolve-entities), class IDs are per school year.
+
+Usage:
+    python decade_query.py --folder ../data/consolidated --student 43
+    python decade_query.py --folder ../data/consolidated --class 3 12
+    python decade_query.py --folder ../data/consolidated --guardian 7 --start 2020-01-01
+    python decade_query.py --folder ../data/consolidated --benchmark 1000
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from consolidate_decade_data import read_consolidated
+from schema_registry import get_registry
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+_KEY = "__key"
+_KEY_BITS = 32  # Width of every key column after the first in a composite key
+
+TOTALS = ["assignments_graded", "points_earned", "points_possible", "percent"]
+TRANSCRIPT_COLUMNS = [
+    "student_id", "school_year_id", "class_id", "class_name", "teacher_id", "term_id"
+] + TOTALS
+ROSTER_COLUMNS = [
+    "school_year_id", "class_id", "student_id", "first_name", "last_name", "grade_level_id"
+] + TOTALS
+
+
+def _codes(values: pd.Series) -> np.ndarray:
+    """int64 codes of a key or order column: ids as is, dates as days since the epoch
+    (missing dates last, where pandas sorts them)"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        days = values.to_numpy("datetime64[ns]")
+        codes = days.astype("datetime64[D]").astype(np.int64)
+        return np.where(np.isnat(days), np.iinfo(np.int64).max, codes)
+    return values.to_numpy(np.int64)
+
+
+def _code(value, is_date: bool) -> int:
+    if is_date:
+        return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+    return int(value)
+
+
+def _pack(parts: Sequence) -> np.ndarray:
+    """One sortable int64 per composite key; parts after the first must fit in 32 bits"""
+    packed = np.asarray(parts[0], dtype=np.int64)
+    for part in parts[1:]:
+        packed = (packed << _KEY_BITS) | np.asarray(part, dtype=np.int64)
+    return packed
+
+
+class SortedIndex:
+    """Rows of a frame sorted by key columns, then order columns, with each key's offsets"""
+
+    def __init__(self, frame: pd.DataFrame, keys: List[str], order_by: Sequence[str] = ()):
+        frame = frame.dropna(subset=keys)
+        self.keys = keys
+        self._dates = [pd.api.types.is_datetime64_any_dtype(frame[key]) for key in keys]
+        packed = _pack([_codes(frame[key]) for key in keys])
+
+        ordered = frame.assign(**{_KEY: packed}).sort_values([_KEY, *order_by], kind="stable")
+        self._row_keys = ordered[_KEY].to_numpy()
+        self.frame = ordered.drop(columns=_KEY).reset_index(drop=True)
+
+        # Run i holds the rows of key _run_keys[i]: frame rows _offsets[i]:_offsets[i + 1]
+        starts = np.flatnonzero(np.r_[True, self._row_keys[1:] != self._row_keys[:-1]])
+        self._run_keys = self._row_keys[starts]
+        self._offsets = np.r_[starts, len(self.frame)]
+
+        # Within a run rows ascend by the first order column; a date one can be ranged over
+        self._order = None
+        if order_by and pd.api.types.is_datetime64_any_dtype(self.frame[order_by[0]]):
+            self._order = _codes(self.frame[order_by[0]])
+
+    def __len__(self) -> int:
+        """Number of distinct keys"""
+        return len(self._run_keys)
+
+    def _key_code(self, key: Tuple) -> int:
+        if len(key) != len(self.keys):
+            raise ValueError(f"Expected a value for each of {self.keys}, got {key}")
+        return int(_pack([_code(value, is_date) for value, is_date in zip(key, self._dates)]))
+
+    def bounds(self, *key) -> Tuple[int, int]:
+        """Frame rows [start, stop) of one key; empty when the key is absent"""
+        code = self._key_code(key)
+        position = np.searchsorted(self._run_keys, code)
+        if position == len(self._run_keys) or self._run_keys[position] != code:
+            return 0, 0
+        return int(self._offsets[position]), int(self._offsets[position + 1])
+
+    def rows(self, *key, start=None, end=None) -> pd.DataFrame:
+        """Rows of one key, optionally only those whose order date is within [start, end]"""
+        low, high = self.bounds(*key)
+        if start is not None or end is not None:
+            if self._order is None:
+                raise ValueError(f"Index on {self.keys} is not ordered by a date")
+            if start is not None:
+                low += int(np.searchsorted(self._order[low:high], _code(start, True)))
+            if end is not None:
+                end_code = _code(end, True)
+                high = low + int(np.searchsorted(self._order[low:high], end_code, side="right"))
+        return self.frame.iloc[low:high]
+
+    def between(self, start, end) -> pd.DataFrame:
+        """Rows whose (single) key is within [start, end]"""
+        if len(self.keys) != 1:
+            raise ValueError("Key ranges need a single-column index")
+        low = np.searchsorted(self._row_keys, self._key_code((start,)))
+        high = np.searchsorted(self._row_keys, self._key_code((end,)), side="right")
+        return self.frame.iloc[low:high]
+
+
+class DecadeQuery:
+    """Entity views over a consolidated decade folder, each indexed on first use"""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.build_seconds: Dict[str, float] = {}
+        self._indexes: Dict[str, SortedIndex] = {}
+        self._registry = get_registry()
+
+    def table(self, table_name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """A consolidated table with its schema date columns parsed"""
+        frame = read_consolidated(self.folder, table_name, columns=columns)
+        for column in self._registry.date_columns(table_name):
+            if column in frame.columns:
+                frame[column] = pd.to_datetime(frame[column], format="ISO8601", errors="coerce")
+        return frame
+
+    def index(self, name: str) -> SortedIndex:
+        """A named view index (see the _build_* methods), built on first use"""
+        if name not in self._indexes:
+            builder = getattr(self, f"_build_{name}", None)
+            if builder is None:
+                raise KeyError(f"Unknown index {name}")
+            start = time.perf_counter()
+            self._indexes[name] = builder()
+            self.build_seconds[name] = round(time.perf_counter() - start, 3)
+            logger.info(
+                f"🗂️ Indexed {name}: {len(self._indexes[name]):,} keys, "
+                f"{len(self._indexes[name].frame):,} rows in {self.build_seconds[name]}s"
+            )
+        return self._indexes[name]
+
+    # Views
+
+    def _build_students(self) -> SortedIndex:
+        return SortedIndex(self.table("students"), ["student_id"], ["school_year_id"])
+
+    def _build_guardians(self) -> SortedIndex:
+        return SortedIndex(self.table("guardians"), ["guardian_id"], ["school_year_id"])
+
+    def _build_grades(self) -> SortedIndex:
+        """Every grade with its assignment (and the assignment's class), per student in
+        submission order"""
+        grades = self.table(
+            "grades", ["student_id", "assignment_id", "score", "submitted_on", "school_year_id"]
+        )
+        assignments = self.table(
+            "assignments",
+            [
+                "assignment_id",
+                "class_id",
+                "title",
+                "category",
+                "points_possible",
+                "due_date",
+                "school_year_id",
+            ],
+        )
+        graded = grades.merge(assignments, on=["school_year_id", "assignment_id"], how="left")
+        return SortedIndex(graded, ["student_id"], ["submitted_on", "school_year_id", "class_id"])
+
+    def _enrollment_view(self) -> pd.DataFrame:
+        """Enrollments with class, student and grade totals (percent of points possible)"""
+        graded = self.index("grades").frame
+        totals = graded.groupby(["school_year_id", "class_id", "student_id"], as_index=False).agg(
+            assignments_graded=("score", "count"),
+            points_earned=("score", "sum"),
+            points_possible=("points_possible", "sum"),
+        )
+        totals["percent"] = (100 * totals["points_earned"] / totals["points_possible"]).round(1)
+
+        classes = self.table(
+            "classes", ["class_id", "name", "teacher_id", "term_id", "school_year_id"]
+        ).rename(columns={"name": "class_name"})
+        students = self.table(
+            "students",
+            ["student_id", "first_name", "last_name", "grade_level_id", "school_year_id"],
+        )
+        enrollments = self.table("enrollments", ["student_id", "class_id", "school_year_id"])
+        return (
+            enrollments.merge(classes, on=["school_year_id", "class_id"], how="left")
+            .merge(students, on=["school_year_id", "student_id"], how="left")
+            .merge(totals, on=["school_year_id", "class_id", "student_id"], how="left")
+        )
+
+    def _build_transcripts(self) -> SortedIndex:
+        return SortedIndex(
+            self._enrollment_view()[TRANSCRIPT_COLUMNS],
+            ["student_id"],
+            ["school_year_id", "class_name"],
+        )
+
+    def _build_rosters(self) -> SortedIndex:
+        return SortedIndex(
+            self._enrollment_view()[ROSTER_COLUMNS],
+            ["school_year_id", "class_id"],
+            ["last_name", "first_name"],
+        )
+
+    def _build_attendance(self) -> SortedIndex:
+        return SortedIndex(
+            self.table("attendance", ["student_id", "date", "status", "school_year_id"]),
+            ["student_id"],
+            ["date"],
+        )
+
+    def _build_attendance_by_date(self) -> SortedIndex:
+        return SortedIndex(self.index("attendance").frame, ["date"], ["student_id"])
+
+    def _build_payments(self) -> SortedIndex:
+        """Payments with their fee type, per guardian in payment order"""
+        fee_types = self.table("fee_types", ["fee_type_id", "name", "frequency"]).rename(
+            columns={"name": "fee_type"}
+        )
+        payments = self.table("payments").merge(fee_types, on="fee_type_id", how="left")
+        return SortedIndex(payments, ["guardian_id"], ["payment_date", "payment_id"])
+
+    def _build_guardians_by_student(self) -> SortedIndex:
+        return SortedIndex(self.table("student_guardians"), ["student_id"], ["school_year_id"])
+
+    def _build_students_by_guardian(self) -> SortedIndex:
+        return SortedIndex(
+            self.index("guardians_by_student").frame, ["guardian_id"], ["school_year_id"]
+        )
+
+    # Lookups
+
+    def student(self, student_id: int) -> pd.DataFrame:
+        """A student's yearly records"""
+        return self.index("students").rows(student_id)
+
+    def transcript(self, student_id: int) -> pd.DataFrame:
+        """One row per class the student took: class, teacher and grade totals"""
+        return self.index("transcripts").rows(student_id)
+
+    def grades(self, student_id: int, start=None, end=None) -> pd.DataFrame:
+        """A student's grades with their assignments, submitted within [start, end]"""
+        return self.index("grades").rows(student_id, start=start, end=end)
+
+    def roster(self, school_year_id: int, class_id: int) -> pd.DataFrame:
+        """A class's students by name, with their grade totals in the class"""
+        return self.index("rosters").rows(school_year_id, class_id)
+
+    def attendance(self, student_id: int, start=None, end=None) -> pd.DataFrame:
+        """A student's attendance records dated within [start, end]"""
+        return self.index("attendance").rows(student_id, start=start, end=end)
+
+    def attendance_on(self, date) -> pd.DataFrame:
+        """Every attendance record of one day"""
+        return self.index("attendance_by_date").rows(date)
+
+    def guardian(self, guardian_id: int) -> pd.DataFrame:
+        """A guardian's yearly records"""
+        return self.index("guardians").rows(guardian_id)
+
+    def payment_history(self, guardian_id: int, start=None, end=None) -> pd.DataFrame:
+        """A guardian's payments with fee types, paid within [start, end]"""
+        return self.index("payments").rows(guardian_id, start=start, end=end)
+
+    def guardians_of(self, student_id: int) -> pd.DataFrame:
+        """student_guardians links of a student, per school year"""
+        return self.index("guardians_by_student").rows(student_id)
+
+    def students_of(self, guardian_id: int) -> pd.DataFrame:
+        """student_guardians links of a guardian, per school year"""
+        return self.index("students_by_guardian").rows(guardian_id)
+
+
+def benchmark(query: DecadeQuery, lookups: int, seed: int = 42) -> Dict[str, float]:
+    """Mean microseconds per lookup of each view, over random existing keys"""
+    rng = np.random.default_rng(seed)
+    views = {
+        "transcript": ("transcripts", query.transcript),
+        "grades": ("grades", query.grades),
+        "roster": ("rosters", query.roster),
+        "attendance": ("attendance", query.attendance),
+        "payment_history": ("payments", query.payment_history),
+    }
+    timings = {}
+    for view, (name, lookup) in views.items():
+        index = query.index(name)
+        rows = index.frame.iloc[rng.integers(0, len(index.frame), lookups)]
+        keys = list(rows[index.keys].itertuples(index=False, name=None))
+        start = time.perf_counter()
+        for key in keys:
+            lookup(*key)
+        timings[view] = round((time.perf_counter() - start) / lookups * 1e6, 1)
+    return timings
+
+
+def main():
+    """Look up one entity view, or time random lookups of every view"""
+    parser = argparse.ArgumentParser(description="Query consolidated Luminosity data in process")
+    parser.add_argument(
+        "--folder", default="../data/consolidated", help="Consolidated data folder"
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--student", type=int, help="Show this student's transcript")
+    group.add_argument(
+        "--class", dest="class_key", type=int, nargs=2, metavar=("SCHOOL_YEAR_ID", "CLASS_ID"),
+        help="Show this class's roster with grades",
+    )
+    group.add_argument("--guardian", type=int, help="Show this guardian's payment history")
+    group.add_argument("--benchmark", type=int, metavar="N", help="Time N random lookups per view")
+    parser.add_argument("--start", help="First date of --guardian payments")
+    parser.add_argument("--end", help="Last date of --guardian payments")
+    args = parser.parse_args()
+
+    query = DecadeQuery(args.folder)
+    if args.benchmark:
+        for view, micros in benchmark(query, args.benchmark).items():
+            print(f"{view:<16} {micros:8.1f} µs per lookup")
+        return 0
+
+    if args.student is not None:
+        result = query.transcript(args.student)
+        label = f"student_id {args.student}"
+    elif args.class_key is not None:
+        result = query.roster(*args.class_key)
+        label = f"class {args.class_key[1]} of school year {args.class_key[0]}"
+    else:
+        result = query.payment_history(args.guardian, start=args.start, end=args.end)
+        label = f"guardian_id {args.guardian}"
+
+    if result.empty:
+        logger.error(f"❌ Nothing found for {label}")
+        return 1
+    print(result.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
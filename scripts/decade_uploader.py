@@ -23,6 +23,7 @@ import json
 import logging
 import os
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -33,6 +34,10 @@ from tqdm import tqdm
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from csv_ingest import read_csv_arrow, to_frame, use_jemalloc
+from referential_integrity import foreign_keys
+from schema_registry import SCHEMA_FILE, parse_schema
+
 # Supabase imports
 try:
     from dotenv import load_dotenv
@@ -53,14 +58,134 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Primary keys that restart at 1 in every year folder. Combined rows get globally
+# unique surrogate keys (old key + a per-year offset) instead of being deduplicated.
+YEAR_SCOPED_KEYS = {
+    "assignments": "assignment_id",
+    "attendance": "attendance_id",
+    "classes": "class_id",
+    "discipline_reports": "discipline_report_id",
+    "enrollments": "enrollment_id",
+    "grades": "grade_id",
+    "payments": "payment_id",
+    "standardized_tests": "test_id",
+    "student_grade_history": "student_grade_history_id",
+}
+
+
+def _key_parts(values: pd.Series) -> Tuple[Optional[pd.DataFrame], pd.Series]:
+    """Split keys like 'ATT000123' into prefix/digits and their integer part
+    (numeric keys have no text part)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return None, values
+    parts = values.astype("string").str.extract(r"^(?P<prefix>.*?)(?P<digits>\d+)$")
+    return parts, pd.to_numeric(parts["digits"])
+
+
+def _shift_keys(values: pd.Series, offsets: pd.Series) -> pd.Series:
+    """Add per-row offsets to keys, keeping the prefix and zero padding of text keys"""
+    parts, numbers = _key_parts(values)
+    if parts is None:
+        return values + offsets
+    shifted = (numbers + offsets).astype("Int64").astype("string")
+    width = int(parts["digits"].str.len().max()) if parts["digits"].notna().any() else 0
+    return (parts["prefix"] + shifted.str.zfill(width)).astype(object)
+
 
 class DecadeDataCombiner:
     """Combines multiple year folders into single CSV files"""
 
-    def __init__(self, decade_dir: Path):
+    def __init__(
+        self, decade_dir: Path, schema_path: str = SCHEMA_FILE, workers: Optional[int] = None
+    ):
         self.decade_dir = decade_dir
         self.year_folders = []
         self.combined_data = {}
+        self.workers = workers
+        self.reads: Dict[Path, Future] = {}  # Year file -> Arrow table being read
+        self.key_columns = self._year_scoped_columns(schema_path)
+        self.key_offsets: Dict[str, Dict[str, int]] = {}
+        self.key_mapping = pd.DataFrame()
+
+    @staticmethod
+    def _year_scoped_columns(schema_path: str) -> Dict[str, Dict[str, str]]:
+        """Columns holding a year-scoped key, per table: the key itself and every
+        foreign key referencing it in the schema ({table: {column: key}})"""
+        columns = {table: {key: key} for table, key in YEAR_SCOPED_KEYS.items()}
+        for fk in foreign_keys(parse_schema(schema_path)):
+            if YEAR_SCOPED_KEYS.get(fk.parent) == fk.parent_column:
+                columns.setdefault(fk.table, {})[fk.column] = fk.parent_column
+        return columns
+
+    def compute_key_offsets(self) -> pd.DataFrame:
+        """Per-year offsets that make every year-scoped key unique across the decade.
+
+        A year's range runs from the smallest to the largest value of the key in
+        any column holding it (dangling foreign keys included). Years are laid
+        end to end: a year's keys are shifted by (keys before it) - (its min) + 1,
+        so new keys start at 1 and never collide whatever the old keys started
+        at. Text keys such as 'ATT000123' are shifted on their numeric part.
+        Returns the old -> new mapping, one row per (key, year).
+        """
+        ranges = {key: {} for key in YEAR_SCOPED_KEYS.values()}
+        for year_folder in self.year_folders:
+            for table_name, columns in self.key_columns.items():
+                csv_file = year_folder / f"{table_name}.csv"
+                if not csv_file.exists():
+                    continue
+                table = self._arrow_table(csv_file, table_name)
+                usecols = [column for column in columns if column in table.column_names]
+                if not usecols:
+                    continue
+                values = table.select(usecols).to_pandas()
+                for column in usecols:
+                    numbers = _key_parts(values[column])[1]
+                    if numbers.notna().any():
+                        key_ranges = ranges[columns[column]]
+                        low, high = int(numbers.min()), int(numbers.max())
+                        if year_folder.name in key_ranges:
+                            known_low, known_high = key_ranges[year_folder.name]
+                            low, high = min(low, known_low), max(high, known_high)
+                        key_ranges[year_folder.name] = (low, high)
+
+        mapping = []
+        for key, key_ranges in ranges.items():
+            offset = 0
+            self.key_offsets[key] = {}
+            for year_folder in self.year_folders:
+                if year_folder.name not in key_ranges:
+                    self.key_offsets[key][year_folder.name] = offset
+                    continue
+                low, high = key_ranges[year_folder.name]
+                shift = offset - low + 1
+                self.key_offsets[key][year_folder.name] = shift
+                mapping.append(
+                    {
+                        "key": key,
+                        "year_folder": year_folder.name,
+                        "old_min": low,
+                        "old_max": high,
+                        "offset": shift,
+                        "new_min": low + shift,
+                        "new_max": high + shift,
+                    }
+                )
+                offset += high - low + 1
+
+        self.key_mapping = pd.DataFrame(mapping)
+        logger.info(
+            f"🔑 Assigned global key ranges for {len(ranges)} year-scoped keys "
+            f"across {len(self.year_folders)} years"
+        )
+        return self.key_mapping
+
+    def _assign_global_keys(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Shift year-scoped keys (and foreign keys to them) by their year's offset"""
+        for column, key in self.key_columns.get(table_name, {}).items():
+            if column in df.columns:
+                offsets = df["source_year_folder"].map(self.key_offsets[key])
+                df[column] = _shift_keys(df[column], offsets)
+        return df
 
     def discover_year_folders(self):
         """Find all year folders in the decade directory"""
@@ -104,6 +229,21 @@ class DecadeDataCombiner:
 
         return sorted(list(table_names))
 
+    def _start_reads(self, pool: ThreadPoolExecutor, table_names: List[str]):
+        """Read every year file of the given tables concurrently (each file once)"""
+        for table_name in table_names:
+            for year_folder in self.year_folders:
+                csv_file = year_folder / f"{table_name}.csv"
+                if csv_file.exists() and csv_file not in self.reads:
+                    self.reads[csv_file] = pool.submit(read_csv_arrow, str(csv_file), table_name)
+
+    def _arrow_table(self, csv_file: Path, table_name: str):
+        """A year file as an Arrow table, from its concurrent read if one was started"""
+        read = self.reads.get(csv_file)
+        if read is not None:
+            return read.result()
+        return read_csv_arrow(str(csv_file), table_name)
+
     def combine_table_data(self, table_name: str) -> pd.DataFrame:
         """Combine data for a specific table across all years"""
         combined_dfs = []
@@ -117,7 +257,8 @@ class DecadeDataCombiner:
 
             if csv_file.exists():
                 try:
-                    df = pd.read_csv(csv_file)
+                    df = to_frame(self._arrow_table(csv_file, table_name))
+                    self.reads.pop(csv_file, None)
                     if len(df) > 0:
                         # Add year information for tracking
                         df["source_year_folder"] = year_folder.name
@@ -136,12 +277,17 @@ class DecadeDataCombiner:
             # Combine all dataframes
             combined_df = pd.concat(combined_dfs, ignore_index=True)
 
+            # Make keys that restart every year unique across the decade
+            combined_df = self._assign_global_keys(table_name, combined_df)
+
             # Remove the tracking column before returning
             if "source_year_folder" in combined_df.columns:
                 combined_df = combined_df.drop("source_year_folder", axis=1)
 
-            # Remove duplicates based on primary key if we can identify it
-            combined_df = self._remove_duplicates(table_name, combined_df)
+            # Rows of year-scoped tables are all distinct now; the others repeat
+            # the same entities every year, so keep their most recent version
+            if table_name not in YEAR_SCOPED_KEYS:
+                combined_df = self._remove_duplicates(table_name, combined_df)
 
             logger.info(f"✅ Combined {table_name}: {len(combined_df)} total records")
             return combined_df
@@ -155,11 +301,6 @@ class DecadeDataCombiner:
         primary_keys = {
             "students": ["student_id"],
             "teachers": ["teacher_id"],
-            "classes": ["class_id"],
-            "assignments": ["assignment_id"],
-            "grades": ["grade_id"],
-            "attendance": ["attendance_id"],
-            "enrollments": ["enrollment_id"],
             "school_calendar": ["calendar_date"],
             "school_years": ["school_year_id"],
             "terms": ["term_id"],
@@ -168,10 +309,6 @@ class DecadeDataCombiner:
             "guardians": ["guardian_id"],
             "student_guardians": ["student_id", "guardian_id"],
             "teacher_subjects": ["teacher_id", "subject_id"],
-            "payments": ["payment_id"],
-            "discipline_reports": ["discipline_report_id"],
-            "standardized_tests": ["test_id"],
-            "student_grade_history": ["student_grade_history_id"],
             "grade_levels": ["grade_level_id"],
             "guardian_types": ["guardian_type_id"],
             "fee_types": ["fee_type_id"],
@@ -212,10 +349,16 @@ class DecadeDataCombiner:
 
         combined_data = {}
 
-        for table_name in table_names:
-            df = self.combine_table_data(table_name)
-            if len(df) > 0:
-                combined_data[table_name] = df
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.compute_key_offsets()
+
+            # Read one table ahead: the next table's year files load while the
+            # current one is combined, so at most two tables are held at once
+            for position, table_name in enumerate(table_names):
+                self._start_reads(pool, table_names[position : position + 2])
+                df = self.combine_table_data(table_name)
+                if len(df) > 0:
+                    combined_data[table_name] = df
 
         logger.info(f"✅ Successfully combined {len(combined_data)} tables")
         return combined_data
@@ -233,6 +376,11 @@ class DecadeDataCombiner:
             df.to_csv(output_file, index=False)
             logger.info(f"    ✅ Saved {table_name}.csv ({len(df)} records)")
 
+        if not self.key_mapping.empty:
+            mapping_file = output_dir / "key_mapping.csv"
+            self.key_mapping.to_csv(mapping_file, index=False)
+            logger.info(f"    🔑 Saved key_mapping.csv ({len(self.key_mapping)} key ranges)")
+
 
 class LuminosityDecadeUploader:
     """Upload combined decade data to Supabase"""
@@ -304,10 +452,11 @@ class LuminosityDecadeUploader:
 
         for col in date_columns:
             if col in df.columns:
-                # Convert to string format instead of date objects
-                df[col] = pd.to_datetime(df[col], errors="coerce").dt.strftime(
-                    "%Y-%m-%d"
-                )
+                # Convert to string format instead of date objects (schema date
+                # columns were already parsed by the loader)
+                if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                    df[col] = pd.to_datetime(df[col], errors="coerce")
+                df[col] = df[col].dt.strftime("%Y-%m-%d")
 
         # Handle boolean columns
         boolean_columns = ["is_school_day", "is_holiday", "is_active", "is_current"]
@@ -541,6 +690,9 @@ def main():
     parser.add_argument(
         "--batch-size", type=int, default=1000, help="Batch size for uploads"
     )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Year files read concurrently"
+    )
     parser.add_argument(
         "--clear-existing",
         action="store_true",
@@ -558,6 +710,7 @@ def main():
     )
 
     args = parser.parse_args()
+    use_jemalloc()
 
     # Convert relative paths to absolute paths from script location
     script_dir = Path(__file__).parent
@@ -570,7 +723,7 @@ def main():
     logger.info("🎓 LUMINOSITY DECADE DATA PROCESSOR")
     logger.info("=" * 60)
 
-    combiner = DecadeDataCombiner(decade_dir)
+    combiner = DecadeDataCombiner(decade_dir, workers=args.workers)
     combined_data = combiner.combine_all_data()
 
     if not combined_data:
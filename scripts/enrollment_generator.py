@@ -7,9 +7,9 @@ No overthinking. Just assigns existing students to existing classes.
 import argparse
 import logging
 import os
-import random
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
@@ -17,8 +17,12 @@ logger = logging.getLogger(__name__)
 
 
 class SimpleEnrollmentGenerator:
-    def __init__(self, data_dir):
+    CLASSES_PER_STUDENT = 6
+    MIN_CLASSES = 4
+
+    def __init__(self, data_dir, seed=42):
         self.data_dir = data_dir
+        self.seed = seed
         self.enrollment_counter = 1
         self._load_data()
 
@@ -30,6 +34,65 @@ class SimpleEnrollmentGenerator:
             f"Loaded {len(self.students)} students and {len(self.classes)} classes"
         )
 
+        # Seat limit per class comes from its classroom; unlimited if unknown
+        self.class_capacity = pd.Series(np.inf, index=self.classes["class_id"].to_numpy())
+        classrooms_file = os.path.join(self.data_dir, "classrooms.csv")
+        if os.path.exists(classrooms_file) and "classroom_id" in self.classes.columns:
+            classrooms = pd.read_csv(classrooms_file)
+            classrooms.columns = classrooms.columns.str.lower()
+            capacity = self.classes["classroom_id"].map(
+                classrooms.set_index("classroom_id")["capacity"]
+            )
+            self.class_capacity[:] = capacity.fillna(np.inf).to_numpy()
+
+    def _candidate_classes(self, class_ids_by_grade, grade):
+        """Classes for a grade, topped up from adjacent grades if there are too few."""
+        candidates = [class_ids_by_grade.get(grade, np.array([], dtype=int))]
+        if len(candidates[0]) < self.MIN_CLASSES:
+            for adj_grade in [grade - 1, grade + 1, grade - 2, grade + 2]:
+                if 0 <= adj_grade <= 12:
+                    candidates.append(class_ids_by_grade.get(adj_grade, np.array([], dtype=int)))
+                    if sum(len(c) for c in candidates) >= self.MIN_CLASSES:
+                        break
+        return np.concatenate(candidates)
+
+    def _assign_grade(self, year, grade, student_ids, class_ids):
+        """Spread one grade's students over its candidate classes.
+
+        Every student gets up to CLASSES_PER_STUDENT distinct classes, class sizes are
+        balanced and capped by classroom capacity, and the shuffle is seeded per
+        (year, grade) so reruns produce the same rosters.
+        """
+        num_students = len(student_ids)
+        if num_students == 0 or len(class_ids) == 0:
+            return np.array([], dtype=int), np.array([], dtype=int)
+
+        rng = np.random.default_rng([self.seed, int(year), int(grade)])
+        student_ids = rng.permutation(student_ids)
+        class_ids = rng.permutation(class_ids)
+
+        # Water-fill seat quotas: as even as possible, never above capacity or roster size
+        per_student = min(self.CLASSES_PER_STUDENT, len(class_ids))
+        limits = np.minimum(self.class_capacity.loc[class_ids].to_numpy(), num_students)
+        quotas = np.zeros(len(class_ids), dtype=int)
+        remaining = num_students * per_student
+        order = np.argsort(limits, kind="stable")
+        for position, idx in enumerate(order):
+            share = -(-remaining // (len(order) - position))
+            quotas[idx] = min(int(limits[idx]), share)
+            remaining -= quotas[idx]
+
+        if remaining > 0:
+            logger.warning(
+                f"Year {year} grade {grade}: {remaining} seats unfilled due to classroom capacity"
+            )
+
+        # Seats of one class are contiguous and each quota <= roster size, so dealing
+        # seats round-robin gives every student distinct classes
+        seat_classes = np.repeat(class_ids, quotas)
+        seat_students = student_ids[np.arange(len(seat_classes)) % num_students]
+        return seat_students, seat_classes
+
     def generate_for_year(self, year):
         """Generate enrollments for one year."""
         # Get students and classes for this year
@@ -40,47 +103,43 @@ class SimpleEnrollmentGenerator:
             f"Year {year}: {len(year_students)} students, {len(year_classes)} classes"
         )
 
-        enrollments = []
+        class_ids_by_grade = {
+            grade: ids.to_numpy()
+            for grade, ids in year_classes.groupby("grade_level_id")["class_id"]
+        }
+
+        student_parts, class_parts = [], []
+        for grade, grade_students in year_students.groupby("grade_level_id"):
+            seat_students, seat_classes = self._assign_grade(
+                year,
+                grade,
+                grade_students["student_id"].to_numpy(),
+                self._candidate_classes(class_ids_by_grade, grade),
+            )
+            student_parts.append(seat_students)
+            class_parts.append(seat_classes)
+
+        student_ids = np.concatenate(student_parts) if student_parts else np.array([], dtype=int)
+        class_ids = np.concatenate(class_parts) if class_parts else np.array([], dtype=int)
+
+        # Order rows by student, as the per-student loop used to
+        order = np.lexsort((class_ids, student_ids))
+        enrollment_numbers = np.arange(
+            self.enrollment_counter, self.enrollment_counter + len(order)
+        )
+        self.enrollment_counter += len(order)
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # For each student, assign them to classes for their grade
-        for _, student in year_students.iterrows():
-            student_id = student["student_id"]
-            grade = student["grade_level_id"]
-
-            # Get all classes for this student's grade and year
-            student_classes = year_classes[year_classes["grade_level_id"] == grade]
-
-            # If no classes for exact grade, try adjacent grades
-            if len(student_classes) < 4:
-                for adj_grade in [grade - 1, grade + 1, grade - 2, grade + 2]:
-                    if 0 <= adj_grade <= 12:
-                        adj_classes = year_classes[
-                            year_classes["grade_level_id"] == adj_grade
-                        ]
-                        student_classes = pd.concat([student_classes, adj_classes])
-                        if len(student_classes) >= 4:
-                            break
-
-            # Take up to 6 classes for this student
-            if len(student_classes) > 6:
-                student_classes = student_classes.sample(n=6, random_state=42)
-
-            # Create enrollment records
-            for _, class_row in student_classes.iterrows():
-                enrollments.append(
-                    {
-                        "enrollment_id": f"ENR{self.enrollment_counter:08d}",
-                        "student_id": student_id,
-                        "class_id": class_row["class_id"],
-                        "school_year_id": year,
-                        "created_at": timestamp,
-                        "updated_at": timestamp,
-                    }
-                )
-                self.enrollment_counter += 1
-
-        return pd.DataFrame(enrollments)
+        return pd.DataFrame(
+            {
+                "enrollment_id": pd.Series(enrollment_numbers).map("ENR{:08d}".format),
+                "student_id": student_ids[order],
+                "class_id": class_ids[order],
+                "school_year_id": year,
+                "created_at": timestamp,
+                "updated_at": timestamp,
+            }
+        )
 
     def generate_all_years(self):
         """Generate enrollments for all years 1-10."""
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Cross-year entity resolution for students and guardians
+
+Every year folder re-emits its students and guardians, and separate generator runs
+(GuardianGenerator, GuardianRegistry) can mint different IDs for the same person.
+This stage links yearly person records that describe the same person and assigns
+each person one canonical ID.
+
+Records are only compared within blocks, records sharing a blocking key:
+- students: last name + date of birth; the student ID (when it carries the same
+  birth date)
+- guardians: normalized email or phone digits (when they carry the same first and
+  last name); the guardian ID (when it carries the same name)
+Within a block, two records match when their comparison columns agree after
+normalization (case, accents, punctuation). Each rule is a single groupby, so no
+pairwise comparison is ever materialized, and matches from all rules are merged
+into people with vectorized connected components.
+
+A year never holds the same person under two IDs, so two distinct source IDs from
+the same year are never linked: such direct matches are dropped, and people that
+would still join them through other records are split again, keeping the
+same-ID links first and then the links in rule order.
+
+A person's canonical ID is the source ID of their earliest record, unless another
+person already claims that ID; such people get fresh IDs above the largest one.
+
+Usage:
+    python entity_resolution.py --data-dir ../data/decade
+    python entity_resolution.py --data-dir ../data/decade --table guardians --output guardian_ids.csv
+"""
+
+import argparse
+import logging
+import os
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csv_ingest import load_table
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MatchRule:
+    """Records sharing every `block` column are candidates; they match if every
+    `compare` column agrees too"""
+
+    name: str
+    block: Tuple[str, ...]
+    compare: Tuple[str, ...] = ()
+
+
+PERSON_TABLES = {
+    "students": (
+        "student_id",
+        [
+            MatchRule("name_birth_date", ("last_name", "date_of_birth"), ("first_name",)),
+            MatchRule("student_id", ("student_id",), ("date_of_birth",)),
+        ],
+    ),
+    "guardians": (
+        "guardian_id",
+        [
+            MatchRule("email", ("email",), ("first_name", "last_name")),
+            MatchRule("phone", ("phone",), ("first_name", "last_name")),
+            MatchRule("guardian_id", ("guardian_id",), ("first_name", "last_name")),
+        ],
+    ),
+}
+
+
+def _normalize_name(values: pd.Series) -> pd.Series:
+    """Lowercase letters and digits only, accents removed"""
+    text = values.astype("string").map(
+        lambda value: unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode(),
+        na_action="ignore",
+    )
+    return text.str.lower().str.replace(r"[^a-z0-9]", "", regex=True).replace("", pd.NA)
+
+
+def normalize_column(column: str, values: pd.Series) -> pd.Series:
+    """Comparable form of a person column; missing or blank values become NA.
+
+    Emails and phones are normalized like ContactUniquenessIndex does.
+    """
+    if column == "email":
+        text = values.astype("string").str.strip().str.lower()
+    elif column == "phone":
+        text = values.astype("string").str.replace(r"\D", "", regex=True)
+    elif "date" in column:
+        text = pd.to_datetime(values, errors="coerce").dt.strftime("%Y-%m-%d").astype("string")
+    elif column.endswith("_id"):
+        return values
+    else:
+        return _normalize_name(values)
+    return text.replace("", pd.NA)
+
+
+def connected_components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Component label (smallest member index) of each of n nodes, given edges"""
+    labels = np.arange(n)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, left, labels[right])
+        np.minimum.at(updated, right, labels[left])
+        updated = updated[updated]  # Pointer jumping halves path lengths
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+class EntityResolver:
+    """Links yearly records of one person table into people with canonical IDs"""
+
+    def __init__(self, key: str, rules: List[MatchRule]):
+        self.key = key
+        self.rules = rules
+        self.stats: Dict = {}
+
+    def resolve(self, records: pd.DataFrame) -> pd.DataFrame:
+        """Canonical ID for each record.
+
+        records needs a `year` column, the key column and the rule columns.
+        Returns one row per record (same index): year, source ID, canonical ID.
+        """
+        start = time.perf_counter()
+        records = records.reset_index(drop=True)
+        n = len(records)
+        normalized = {
+            column: normalize_column(column, records[column])
+            for column in {c for rule in self.rules for c in rule.block + rule.compare}
+            if column in records.columns
+        }
+
+        left, right = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        self.stats = {"records": n, "rules": {}}
+        for rule in self.rules:
+            columns = list(rule.block + rule.compare)
+            if any(column not in normalized for column in columns):
+                continue
+            keys = pd.DataFrame({column: normalized[column] for column in columns})
+            usable = keys.notna().all(axis=1).to_numpy()
+            rows = np.flatnonzero(usable)
+            blocks = keys[usable].groupby(list(rule.block), sort=False).ngroup().to_numpy()
+            groups = keys[usable].groupby(columns, sort=False).ngroup().to_numpy()
+
+            # Link every record to the first record of its matching group
+            first = np.full(groups.max() + 1 if len(groups) else 0, n)
+            np.minimum.at(first, groups, rows)
+            left.append(rows)
+            right.append(first[groups])
+
+            block_sizes = np.bincount(blocks) if len(blocks) else np.zeros(0, dtype=np.int64)
+            self.stats["rules"][rule.name] = {
+                "blocks": int(len(block_sizes)),
+                "candidate_pairs": int((block_sizes * (block_sizes - 1) // 2).sum()),
+                "linked_records": int((rows != first[groups]).sum()),
+            }
+
+        left, right = np.concatenate(left), np.concatenate(right)
+        years = records["year"].to_numpy()
+        keys = records[self.key].to_numpy()
+        same_year = (years[left] == years[right]) & (keys[left] != keys[right])
+        self.stats["same_year_links_dropped"] = int(same_year.sum())
+        left, right = left[~same_year], right[~same_year]
+
+        labels = connected_components(n, left, right)
+        mapping = pd.DataFrame(
+            {"year": records["year"], self.key: records[self.key], "component": labels}
+        )
+        mapping["component"] = self._split_same_year(mapping, left, right)
+        mapping["canonical_id"] = self._canonical_ids(mapping)
+
+        self.stats["entities"] = int(mapping["canonical_id"].nunique())
+        self.stats["source_ids"] = int(mapping[[self.key]].drop_duplicates().shape[0])
+        self.stats["seconds"] = round(time.perf_counter() - start, 3)
+        return mapping.drop(columns="component")
+
+    def _split_same_year(
+        self, mapping: pd.DataFrame, left: np.ndarray, right: np.ndarray
+    ) -> np.ndarray:
+        """Component labels with no two source IDs from the same year.
+
+        Only components that join such IDs through other records are rebuilt:
+        their links are replayed (same-ID links first, then in rule order) and a
+        link is skipped when the two sides hold different IDs for some year.
+        """
+        labels = mapping["component"].to_numpy().copy()
+        ids_per_year = mapping.groupby(["component", "year"])[self.key].nunique()
+        conflicted = ids_per_year[ids_per_year > 1].index.unique(level="component")
+        self.stats["split_people"] = int(len(conflicted))
+        if len(conflicted) == 0:
+            return labels
+
+        keys = mapping[self.key].to_numpy()
+        years = mapping["year"].to_numpy()
+        inside = np.isin(labels[left], conflicted)
+        left, right = left[inside], right[inside]
+        order = np.argsort(keys[left] != keys[right], kind="stable")
+
+        parent: Dict[int, int] = {}
+        held: Dict[int, Dict] = {}  # Root -> {year: source ID} of its records
+
+        def find(node: int) -> int:
+            if node not in parent:
+                parent[node] = node
+                held[node] = {years[node]: keys[node]}
+            root = node
+            while parent[root] != root:
+                root = parent[root]
+            parent[node] = root
+            return root
+
+        for a, b in zip(left[order], right[order]):
+            root_a, root_b = find(a), find(b)
+            if root_a == root_b:
+                continue
+            if any(held[root_a].get(year, key) != key for year, key in held[root_b].items()):
+                continue
+            parent[root_b] = root_a
+            held[root_a].update(held.pop(root_b))
+
+        members = np.flatnonzero(np.isin(labels, conflicted))
+        labels[members] = [find(node) for node in members]
+        return labels
+
+    def _canonical_ids(self, mapping: pd.DataFrame) -> pd.Series:
+        """Earliest source ID of each component, or a fresh ID if it is taken"""
+        earliest = (
+            mapping.sort_values(["year", self.key], kind="mergesort")
+            .drop_duplicates("component")
+            .set_index("component")[self.key]
+            .astype(np.int64)
+        )
+        taken = earliest.duplicated(keep="first")
+        fresh = int(pd.to_numeric(mapping[self.key], errors="coerce").max()) + 1
+        earliest[taken] = np.arange(fresh, fresh + int(taken.sum()))
+        return mapping["component"].map(earliest)
+
+
+def load_person_records(data_dir: str, table: str) -> pd.DataFrame:
+    """One person table from every year folder, with a `year` column (folder name)"""
+    frames = []
+    for item in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, item, f"{table}.csv")
+        if "-" in item and os.path.exists(path):
+            frames.append(load_table(path, table).assign(year=item))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def resolve_decade(data_dir: str, tables: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """Canonical-ID mapping (year, source ID, canonical_id) for each person table"""
+    mappings = {}
+    for table in tables or list(PERSON_TABLES):
+        key, rules = PERSON_TABLES[table]
+        records = load_person_records(data_dir, table)
+        if records.empty:
+            continue
+        resolver = EntityResolver(key, rules)
+        mapping = resolver.resolve(records).drop_duplicates(["year", key])
+        mappings[table] = mapping
+
+        stats = resolver.stats
+        logger.info(
+            f"🔗 {table}: {stats['records']:,} records, {stats['source_ids']:,} source IDs "
+            f"-> {stats['entities']:,} people in {stats['seconds']}s"
+        )
+        if stats["same_year_links_dropped"] or stats["split_people"]:
+            logger.info(
+                f"    same year: {stats['same_year_links_dropped']:,} direct links dropped, "
+                f"{stats['split_people']:,} people split"
+            )
+        for name, rule in stats["rules"].items():
+            logger.info(
+                f"    {name}: {rule['blocks']:,} blocks, {rule['candidate_pairs']:,} candidate pairs, "
+                f"{rule['linked_records']:,} records linked"
+            )
+    return mappings
+
+
+def main():
+    """Resolve people across the decade and optionally save the canonical-ID mapping"""
+    parser = argparse.ArgumentParser(description="Resolve Luminosity students and guardians across years")
+    parser.add_argument(
+        "--data-dir", default="../data/decade", help="Directory containing decade data"
+    )
+    parser.add_argument("--table", choices=list(PERSON_TABLES), help="Only resolve this table")
+    parser.add_argument("--output", help="CSV file for the mapping (year, table, source_id, canonical_id)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    mappings = resolve_decade(args.data_dir, [args.table] if args.table else None)
+    if args.output:
+        combined = pd.concat(
+            [
+                mapping.rename(columns={PERSON_TABLES[table][0]: "source_id"}).assign(table=table)
+                for table, mapping in mappings.items()
+            ],
+            ignore_index=True,
+        )[["year", "table", "source_id", "canonical_id"]]
+        tmp_path = f"{args.output}.tmp"
+        combined.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, args.output)
+        logger.info(f"💾 Mapping saved to {args.output} ({len(combined):,} rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -5,8 +5,14 @@ Definitive fix for Luminosity grade distribution issues
 
 This script identifies and fixes the core disconnect between grade generation
 and validation interpretation.
+
+Usage:
+    python grade_distribution_hotfix.py --decade-dir ../data/decade
+    python grade_distribution_hotfix.py --decade-dir ../data/decade --journal
+    python grade_distribution_hotfix.py --decade-dir ../data/decade --mode target --journal
 """
 
+import argparse
 import logging
 import os
 import random
@@ -14,6 +20,10 @@ import random
 import numpy as np
 import pandas as pd
 
+from csv_ingest import load_table
+from grade_targeting import target_policy_scores
+from patch_journal import PatchJournal
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
@@ -35,8 +45,10 @@ def analyze_current_grade_issue(decade_dir: str):
         print(f"❌ Cannot find files for {year}")
         return
 
-    grades_df = pd.read_csv(grades_file)
-    assignments_df = pd.read_csv(assignments_file)
+    grades_df = load_table(grades_file, "grades", ["assignment_id", "score"])
+    assignments_df = load_table(
+        assignments_file, "assignments", ["assignment_id", "points_possible"]
+    )
 
     # Sample analysis
     sample_size = min(1000, len(grades_df))
@@ -105,10 +117,20 @@ def analyze_current_grade_issue(decade_dir: str):
     }
 
 
-def generate_proper_grades(decade_dir: str):
-    """Generate grades with proper policy-compliant distribution"""
+def generate_proper_grades(
+    decade_dir: str, journal: PatchJournal = None, mode: str = "regenerate"
+):
+    """Generate grades with proper policy-compliant distribution
+
+    mode "regenerate" redraws every score; "target" keeps the existing scores and
+    moves only the rows needed to meet the policy (see grade_targeting).
+
+    With a journal, only the changed scores are recorded as a pending delta and
+    grades.csv is left untouched until the journal is materialized.
+    """
 
     print("\n🎯 GENERATING PROPER GRADES...")
+    patch_id = journal.begin("grade-hotfix") if journal is not None else None
 
     # Set random seed for reproducibility
     random.seed(42)
@@ -127,8 +149,33 @@ def generate_proper_grades(decade_dir: str):
         if not (os.path.exists(grades_file) and os.path.exists(assignments_file)):
             continue
 
-        grades_df = pd.read_csv(grades_file)
-        assignments_df = pd.read_csv(assignments_file)
+        # Dates stay text so rewritten files keep them as they were
+        grades_df = load_table(grades_file, "grades", parse_dates=False)
+        assignments_df = load_table(assignments_file, "assignments", parse_dates=False)
+        if journal is not None:
+            grades_df = journal.overlay(year, "grades", grades_df)
+            assignments_df = journal.overlay(year, "assignments", assignments_df)
+
+        if mode == "target":
+            points_possible = (
+                grades_df["assignment_id"]
+                .map(assignments_df.drop_duplicates("assignment_id").set_index("assignment_id")["points_possible"])
+                .fillna(100)
+                .to_numpy(np.int64)
+            )
+            new_grades_df = grades_df.copy()
+            new_grades_df["score"] = target_policy_scores(
+                grades_df["score"].to_numpy(), points_possible, mean_range=(80, 90)
+            )
+            if journal is not None:
+                changed = journal.record(patch_id, year, "grades", grades_df, new_grades_df, ["score"])
+            else:
+                changed = int((new_grades_df["score"] != grades_df["score"]).sum())
+                new_grades_df.to_csv(grades_file, index=False)
+
+            total_grades_fixed += changed
+            print(f"  ✅ {year}: Moved {changed:,} of {len(grades_df):,} grades")
+            continue
 
         # Create assignment lookup
         assignment_lookup = {
@@ -175,15 +222,23 @@ def generate_proper_grades(decade_dir: str):
 
         # Save new grades
         new_grades_df = pd.DataFrame(new_grades)
-        new_grades_df.to_csv(grades_file, index=False)
+        if journal is not None:
+            changed = journal.record(patch_id, year, "grades", grades_df, new_grades_df, ["score"])
+            print(f"  📝 {year}: Journaled {changed:,} changed scores")
+        else:
+            new_grades_df.to_csv(grades_file, index=False)
 
         total_grades_fixed += len(new_grades)
         print(f"  ✅ {year}: Fixed {len(new_grades):,} grades")
 
+    if journal is not None:
+        journal.save()
+        print(f"  📝 Recorded as patch {patch_id}")
+
     print(f"\n✅ GRADE GENERATION COMPLETE: {total_grades_fixed:,} total grades fixed")
 
 
-def validate_grade_fix(decade_dir: str):
+def validate_grade_fix(decade_dir: str, journal: PatchJournal = None):
     """Validate that the grade fix worked correctly"""
 
     print("\n🔍 VALIDATING GRADE FIX...")
@@ -201,8 +256,13 @@ def validate_grade_fix(decade_dir: str):
         if not (os.path.exists(grades_file) and os.path.exists(assignments_file)):
             continue
 
-        grades_df = pd.read_csv(grades_file)
-        assignments_df = pd.read_csv(assignments_file)
+        grades_df = load_table(grades_file, "grades", ["grade_id", "assignment_id", "score"])
+        assignments_df = load_table(
+            assignments_file, "assignments", ["assignment_id", "points_possible"]
+        )
+        if journal is not None:
+            grades_df = journal.overlay(year, "grades", grades_df)
+            assignments_df = journal.overlay(year, "assignments", assignments_df)
 
         # Calculate percentages
         assignment_lookup = {
@@ -267,7 +327,25 @@ def validate_grade_fix(decade_dir: str):
 def main():
     """Run complete grade distribution analysis and fix"""
 
-    decade_dir = "../data/decade"
+    parser = argparse.ArgumentParser(description="Fix Luminosity grade distributions")
+    parser.add_argument(
+        "--decade-dir", default="../data/decade", help="Path to decade data directory"
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="Record score changes in the patch journal instead of rewriting grades.csv",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["regenerate", "target"],
+        default="regenerate",
+        help="Redraw every score, or move only the rows needed to meet the policy",
+    )
+    args = parser.parse_args()
+
+    decade_dir = args.decade_dir
+    journal = PatchJournal(decade_dir) if args.journal else None
 
     print("🏫 LUMINOSITY GRADE DISTRIBUTION - DEFINITIVE FIX")
     print("=" * 60)
@@ -276,10 +354,10 @@ def main():
     current_stats = analyze_current_grade_issue(decade_dir)
 
     # Step 2: Generate proper grades
-    generate_proper_grades(decade_dir)
+    generate_proper_grades(decade_dir, journal, args.mode)
 
     # Step 3: Validate the fix
-    validation_results = validate_grade_fix(decade_dir)
+    validation_results = validate_grade_fix(decade_dir, journal)
 
     print("\n" + "=" * 60)
     print("🎓 GRADE DISTRIBUTION FIX COMPLETE!")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Minimal-change grade distribution targeting for the Luminosity decade dataset
+
+Instead of regenerating every score, target_policy_scores() takes a year's existing
+scores and moves only as many rows as needed, each by as little as possible, until
+the year meets the grading policy:
+- failing (below 70%) share within FAILING_RANGE
+- perfect (95% and above) share within PERFECT_RANGE
+- median percentage within MEDIAN_RANGE
+- optionally, mean percentage within a given range
+
+Each constraint is fixed by picking, from the empirical percentage distribution,
+the rows closest to the relevant boundary (argpartition on the distance) and
+snapping them onto it. Candidate sets are disjoint, so later steps never undo
+earlier ones. A mean shortfall is closed with the rows that gain the most, so as
+few rows as possible move. Everything runs as a handful of vectorized passes per
+year; rerunning on compliant scores changes nothing.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+MEDIAN_RANGE = (85.0, 90.0)  # Median percentage
+PERFECT_RANGE = (0.02, 0.04)  # Share of grades at 95% and above (~3%)
+FAILING_RANGE = (0.03, 0.05)  # Share of grades below 70%
+
+
+def _min_score(points: np.ndarray, percentage: float) -> np.ndarray:
+    """Smallest integer score reaching `percentage` of points"""
+    return np.ceil(points * percentage / 100 - 1e-9).astype(np.int64)
+
+
+def _max_score(points: np.ndarray, percentage: float) -> np.ndarray:
+    """Largest integer score not exceeding `percentage` of points"""
+    return np.floor(points * percentage / 100 + 1e-9).astype(np.int64)
+
+
+def _move_closest(
+    scores: np.ndarray,
+    points: np.ndarray,
+    candidates: np.ndarray,
+    targets: np.ndarray,
+    count: int,
+) -> int:
+    """Snap the `count` candidate rows nearest to their target onto it, in place"""
+    idx = np.flatnonzero(candidates)
+    if count <= 0 or len(idx) == 0:
+        return 0
+
+    if count < len(idx):
+        distance = np.abs(targets[idx] - scores[idx]) / points[idx]
+        idx = idx[np.argpartition(distance, count - 1)[:count]]
+
+    scores[idx] = targets[idx]
+    return len(idx)
+
+
+def _shift_mean(
+    scores: np.ndarray,
+    points: np.ndarray,
+    candidates: np.ndarray,
+    targets: np.ndarray,
+    deficit: float,
+) -> int:
+    """Snap the fewest candidate rows onto their target so that the summed percentage
+    moves by at least `deficit`, in place"""
+    idx = np.flatnonzero(candidates)
+    if deficit <= 0 or len(idx) == 0:
+        return 0
+
+    gain = np.abs(targets[idx] - scores[idx]) / points[idx] * 100
+    order = np.argsort(-gain, kind="stable")
+    count = min(int(np.searchsorted(np.cumsum(gain[order]), deficit)) + 1, len(idx))
+    idx = idx[order[:count]]
+    scores[idx] = targets[idx]
+    return len(idx)
+
+
+def target_policy_scores(
+    scores: np.ndarray,
+    points_possible: np.ndarray,
+    previous_points: np.ndarray = None,
+    median_range: Tuple[float, float] = MEDIAN_RANGE,
+    perfect_range: Tuple[float, float] = PERFECT_RANGE,
+    failing_range: Tuple[float, float] = FAILING_RANGE,
+    mean_range: Optional[Tuple[float, float]] = None,
+) -> np.ndarray:
+    """Return policy-compliant scores that differ from `scores` in as few rows as possible.
+
+    If assignments were re-pointed, pass the points the scores were earned against as
+    previous_points; scores are first carried over at the same percentage.
+    Rows with no points possible are left as they are.
+    """
+    points = np.asarray(points_possible, dtype=np.int64)
+    new_scores = np.asarray(scores, dtype=float)
+    if previous_points is not None:
+        previous = np.asarray(previous_points, dtype=float)
+        moved = (previous != points) & (previous > 0)
+        new_scores = np.where(moved, new_scores * points / np.where(moved, previous, 1), new_scores)
+    new_scores = np.clip(np.round(np.nan_to_num(new_scores)), 0, np.maximum(points, 0)).astype(
+        np.int64
+    )
+
+    graded = points > 0
+    n = int(graded.sum())
+    if n == 0:
+        return new_scores
+
+    safe_points = np.where(graded, points, 1)
+    pass_score = _min_score(safe_points, 70)
+    perfect_score = _min_score(safe_points, 95)
+    median_low = _min_score(safe_points, median_range[0])
+    median_high = _max_score(safe_points, median_range[1])
+
+    # 1. Failing share: lift the failing rows nearest 70%, or drop the passing ones nearest it
+    failing = graded & (new_scores < pass_score)
+    excess = int(failing.sum()) - int(np.floor(failing_range[1] * n))
+    shortfall = int(np.ceil(failing_range[0] * n)) - int(failing.sum())
+    _move_closest(new_scores, safe_points, failing, pass_score, excess)
+    _move_closest(
+        new_scores,
+        safe_points,
+        graded & ~failing & (new_scores < perfect_score) & (pass_score > 0),
+        pass_score - 1,
+        shortfall,
+    )
+
+    # 2. Perfect share among passing rows
+    failing = graded & (new_scores < pass_score)
+    perfect = graded & (new_scores >= perfect_score)
+    excess = int(perfect.sum()) - int(np.floor(perfect_range[1] * n))
+    shortfall = int(np.ceil(perfect_range[0] * n)) - int(perfect.sum())
+    _move_closest(
+        new_scores,
+        safe_points,
+        perfect & (perfect_score - 1 >= pass_score),
+        perfect_score - 1,
+        excess,
+    )
+    _move_closest(new_scores, safe_points, graded & ~failing & ~perfect, perfect_score, shortfall)
+
+    # 3. Median: more than half the rows must sit at or above the low bound, and at or
+    #    below the high bound; only passing, non-perfect rows are moved
+    middle = graded & (new_scores >= pass_score) & (new_scores < perfect_score)
+    reachable = (median_low <= median_high) & (median_low < perfect_score) & (median_high >= pass_score)
+    majority = n // 2 + 1
+
+    shortfall = majority - int((graded & (new_scores >= median_low)).sum())
+    _move_closest(
+        new_scores, safe_points, middle & reachable & (new_scores < median_low), median_low, shortfall
+    )
+    shortfall = majority - int((graded & (new_scores <= median_high)).sum())
+    _move_closest(
+        new_scores, safe_points, middle & reachable & (new_scores > median_high), median_high, shortfall
+    )
+
+    # 4. Mean: move passing, non-perfect rows across the median band, largest gains first
+    if mean_range is not None:
+        middle = graded & (new_scores >= pass_score) & (new_scores < perfect_score)
+        total = float((new_scores[graded] / safe_points[graded]).sum() * 100)
+        _shift_mean(
+            new_scores,
+            safe_points,
+            middle & reachable & (new_scores < median_high),
+            median_high,
+            mean_range[0] * n - total,
+        )
+        _shift_mean(
+            new_scores,
+            safe_points,
+            middle & reachable & (new_scores > median_low),
+            median_low,
+            total - mean_range[1] * n,
+        )
+
+    return new_scores
+
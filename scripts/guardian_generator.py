@@ -25,13 +25,19 @@ from typing import Dict, List, Tuple
 import logging
 from collections import defaultdict
 
+from contact_index import ContactUniquenessIndex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class GuardianGenerator:
-    def __init__(self, seed: int = 42):
-        """Initialize the guardian generator with specified random seed."""
+    def __init__(self, seed: int = 42, contact_index: ContactUniquenessIndex = None):
+        """Initialize the guardian generator with specified random seed.
+
+        Pass a shared contact_index to keep emails/phones unique across several runs
+        (e.g. every year of the decade).
+        """
         random.seed(seed)
         np.random.seed(seed)
         self.fake = Faker()
@@ -60,6 +66,9 @@ class GuardianGenerator:
         self.generated_guardians = {}
         self.guardian_counter = 1
         
+        # Emails and phones must stay unique across the decade for the upload
+        self.contact_index = contact_index or ContactUniquenessIndex()
+        
     def load_students(self, file_path: str) -> pd.DataFrame:
         """Load students from CSV file."""
         logger.info(f"Loading students from {file_path}")
@@ -184,8 +193,10 @@ class GuardianGenerator:
             'guardian_id': self.guardian_counter,
             'first_name': first_name,
             'last_name': last_name,
-            'email': self.generate_realistic_email(first_name, last_name),
-            'phone': self.generate_realistic_phone()
+            'email': self.contact_index.claim_email(
+                self.generate_realistic_email(first_name, last_name)
+            ),
+            'phone': self.contact_index.claim_phone(self.generate_realistic_phone())
         }
         
         self.generated_guardians[guardian_key] = guardian
@@ -393,6 +404,8 @@ class GuardianGenerator:
         
         logger.info(f"Generated {len(guardians_df)} unique guardians")
         logger.info(f"Generated {len(student_guardians_df)} student-guardian relationships")
+        logger.info(f"Resolved {self.contact_index.email_collisions} email and "
+                    f"{self.contact_index.phone_collisions} phone collisions")
         
         return guardians_df, student_guardians_df
     
@@ -447,11 +460,18 @@ def main():
     parser.add_argument('--input', default='../data/clean_csv/students.csv', help='Input students CSV file')
     parser.add_argument('--output-dir', default='../data/clean_csv', help='Output directory for CSV files')
     parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducibility')
+    parser.add_argument('--existing-guardians', nargs='*', default=[],
+                        help='Guardian CSVs whose emails/phones must not be reused')
+    parser.add_argument('--bloom-capacity', type=int, default=None,
+                        help='Use a Bloom filter sized for this many contacts instead of exact sets')
     
     args = parser.parse_args()
     
     # Initialize generator
-    generator = GuardianGenerator(seed=args.seed)
+    contact_index = ContactUniquenessIndex(bloom_capacity=args.bloom_capacity)
+    for guardians_file in args.existing_guardians:
+        contact_index.register_guardians(pd.read_csv(guardians_file))
+    generator = GuardianGenerator(seed=args.seed, contact_index=contact_index)
     
     # Load students data
     students_df = generator.load_students(args.input)
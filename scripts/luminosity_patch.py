@@ -11,6 +11,8 @@ This script fixes the identified issues in the decade generator:
 
 Usage:
     python luminosity_patch.py --decade-dir ../data/decade --fix-all
+    python luminosity_patch.py --decade-dir ../data/decade --fix-all --journal
+    python luminosity_patch.py --decade-dir ../data/decade --fix-grades --grade-mode target --journal
 """
 
 import argparse
@@ -25,6 +27,10 @@ import numpy as np
 import pandas as pd
 from faker import Faker
 
+from csv_ingest import load_table
+from grade_targeting import target_policy_scores
+from patch_journal import PatchJournal
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -35,11 +41,23 @@ logger = logging.getLogger(__name__)
 class LuminosityDataPatcher:
     """Patches data quality issues in the Luminosity decade dataset"""
 
+    # Tables read by the patches (and reused by validation)
+    PATCH_TABLES = ["grades", "assignments", "students", "teachers", "fee_types", "payments"]
+
+    # Single-column patches that can be journaled instead of rewriting the table
+    JOURNAL_COLUMNS = {
+        "grades": ["score"],
+        "assignments": ["points_possible"],
+        "fee_types": ["amount"],
+        "payments": ["amount_paid"],
+    }
+
     def __init__(self, seed=42):
         random.seed(seed)
         np.random.seed(seed)
         self.fake = Faker()
         Faker.seed(seed)
+        self.rng = np.random.default_rng(seed)
 
         # Grade distribution parameters (matching policy)
         self.grade_policy = {
@@ -49,110 +67,280 @@ class LuminosityDataPatcher:
             "perfect_rate": 0.03,  # 3% perfect grades (95-100%)
             "failing_rate": 0.04,  # 3-5% failing grades (below 70%)
             "std_dev": 8,  # Standard deviation for normal distribution
+            # Acceptance bands used by the minimal-change "target" grade mode
+            "median_range": (85, 90),
+            "perfect_range": (0.02, 0.04),
+            "failing_range": (0.03, 0.05),
         }
 
-    def patch_grade_distributions(self, decade_dir: str, fix_assignments: bool = True):
-        """Fix grade distributions to match school policy"""
-        logger.info("🎯 Patching grade distributions...")
+        # Base fee structure (will be adjusted by year)
+        self.base_fees = {
+            1: {"name": "Tech Fee", "amount": 100, "frequency": "One Time"},
+            2: {"name": "Field Trip Fund", "amount": 50, "frequency": "One Time"},
+            3: {"name": "Lunch Plan", "amount": 400, "frequency": "Monthly"},
+            4: {"name": "Tuition", "amount": 8000, "frequency": "Annual"},
+            5: {"name": "Activity Fee", "amount": 75, "frequency": "Per Term"},
+        }
 
-        years_fixed = 0
-        total_grades_fixed = 0
+        # Year-specific adjustments
+        self.fee_adjustments = {
+            2016: {"Tech Fee": 1.0, "Tuition": 1.0},
+            2017: {"Tech Fee": 1.10, "Tuition": 1.0},
+            2018: {"Tech Fee": 1.10, "Tuition": 1.0},
+            2019: {"Tech Fee": 1.25, "Tuition": 1.0},
+            2020: {"Tech Fee": 1.50, "Tuition": 1.0},  # COVID tech needs
+            2021: {"Tech Fee": 1.50, "Tuition": 1.0},
+            2022: {"Tech Fee": 1.30, "Tuition": 1.10},  # 10% tuition increase
+            2023: {"Tech Fee": 1.30, "Tuition": 1.155},  # 5% increase on 2022
+            2024: {"Tech Fee": 1.30, "Tuition": 1.155},
+            2025: {"Tech Fee": 1.30, "Tuition": 1.189},  # 3% increase
+        }
 
-        for year in range(2016, 2026):
-            year_dir = os.path.join(decade_dir, f"{year}-{year+1}")
-            if not os.path.exists(year_dir):
-                continue
+    def run_patches(
+        self,
+        decade_dir: str,
+        fix_grades: bool = True,
+        fix_assignments: bool = True,
+        fix_ratios: bool = True,
+        fix_financial: bool = True,
+        fill_missing: bool = True,
+        journal: Optional[PatchJournal] = None,
+        grade_mode: str = "regenerate",
+    ) -> Dict[int, Dict[str, pd.DataFrame]]:
+        """Load each year once, run every enabled patch in memory, write once.
+
+        Only tables a patch changed are written, each to a temp file that replaces
+        the original after all of the year's tables were serialized, so a crash never
+        leaves a half-patched year. Returns the patched tables by year for validation.
+
+        With a journal, column patches (JOURNAL_COLUMNS) are recorded as pending
+        deltas instead of rewriting their CSVs; tables that gain rows (teachers,
+        missing reference tables) are still written.
+
+        grade_mode "regenerate" redraws every score; "target" keeps existing scores
+        and moves only the rows needed to meet the grade policy.
+        """
+        year_tables = {}
+        patch_id = journal.begin("luminosity-patch") if journal is not None else None
+        totals = {"grade_years": 0, "grades": 0, "ratio_years": 0, "financial_years": 0, "standard_files": 0}
+
+        if fix_grades:
+            logger.info("🎯 Patching grade distributions...")
+        if fix_ratios:
+            logger.info("👩‍🏫 Patching teacher-student ratios...")
+        if fix_financial:
+            logger.info("💰 Patching financial data...")
+        if fill_missing:
+            logger.info("📋 Generating missing data files...")
+
+        for year, year_dir in self._year_dirs(decade_dir):
+            tables = self._load_year_tables(year_dir, self.PATCH_TABLES, year, journal)
+            original_tables = dict(tables)
+            changed = set()
+
+            if fix_grades:
+                changed |= self._patch_year_grades(year, tables, fix_assignments, grade_mode)
+                if "grades" in changed:
+                    totals["grade_years"] += 1
+                    totals["grades"] += len(tables["grades"])
+            if fix_ratios:
+                changed |= self._patch_year_teachers(year, tables)
+                totals["ratio_years"] += "teachers" in changed
+            if fix_financial:
+                changed |= self._patch_year_finances(year, tables)
+                totals["financial_years"] += "payments" in changed
+            if fill_missing:
+                standard = self._fill_year_standard_tables(year_dir, tables)
+                changed |= standard
+                totals["standard_files"] += len(standard)
+
+            if journal is not None:
+                for table_name in changed & self.JOURNAL_COLUMNS.keys():
+                    journal.record(
+                        patch_id,
+                        year,
+                        table_name,
+                        original_tables[table_name],
+                        tables[table_name],
+                        self.JOURNAL_COLUMNS[table_name],
+                    )
+                changed -= self.JOURNAL_COLUMNS.keys()
 
-            grades_file = os.path.join(year_dir, "grades.csv")
-            assignments_file = os.path.join(year_dir, "assignments.csv")
+            self._write_year_tables(year_dir, tables, sorted(changed))
+            year_tables[year] = tables
 
-            if not os.path.exists(grades_file):
-                logger.warning(f"Grades file not found for {year}")
-                continue
+        if journal is not None:
+            journal.save()
+            logger.info(f"📝 Journaled column deltas as patch {patch_id}")
 
-            # Load data
-            grades_df = pd.read_csv(grades_file)
-            assignments_df = (
-                pd.read_csv(assignments_file)
-                if os.path.exists(assignments_file)
-                else None
+        if fix_grades:
+            logger.info(
+                f"✅ Grade distributions patched: {totals['grade_years']} years, {totals['grades']:,} total grades"
             )
+        if fix_ratios:
+            logger.info(f"✅ Teacher ratios patched: {totals['ratio_years']} years adjusted")
+        if fix_financial:
+            logger.info(f"✅ Financial data patched: {totals['financial_years']} years updated")
+        if fill_missing and totals["standard_files"] > 0:
+            logger.info(f"✅ Generated {totals['standard_files']} missing standard files")
+
+        return year_tables
+
+    @staticmethod
+    def _year_dirs(decade_dir: str):
+        """(year, directory) for each school year folder that exists"""
+        for year in range(2016, 2026):
+            year_dir = os.path.join(decade_dir, f"{year}-{year+1}")
+            if os.path.exists(year_dir):
+                yield year, year_dir
+
+    @staticmethod
+    def _load_year_tables(
+        year_dir: str,
+        table_names: List[str],
+        year: int = None,
+        journal: Optional[PatchJournal] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """Read the named tables of one year (missing files are skipped),
+        with any pending journal deltas overlaid"""
+        tables = {}
+        for table_name in table_names:
+            filepath = os.path.join(year_dir, f"{table_name}.csv")
+            if os.path.exists(filepath):
+                tables[table_name] = load_table(filepath, table_name)
+                if journal is not None:
+                    tables[table_name] = journal.overlay(year, table_name, tables[table_name])
+        return tables
+
+    @staticmethod
+    def _write_year_tables(year_dir: str, tables: Dict[str, pd.DataFrame], table_names: List[str]):
+        """Write tables via temp files, renaming only once every file is complete"""
+        staged = []
+        try:
+            for table_name in table_names:
+                filepath = os.path.join(year_dir, f"{table_name}.csv")
+                temp_path = f"{filepath}.tmp"
+                staged.append((temp_path, filepath))
+                tables[table_name].to_csv(temp_path, index=False)
+        except Exception:
+            for temp_path, _ in staged:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            raise
+
+        for temp_path, filepath in staged:
+            os.replace(temp_path, filepath)
+
+    def patch_grade_distributions(
+        self, decade_dir: str, fix_assignments: bool = True, grade_mode: str = "regenerate"
+    ):
+        """Fix grade distributions to match school policy"""
+        return self.run_patches(
+            decade_dir,
+            fix_assignments=fix_assignments,
+            fix_ratios=False,
+            fix_financial=False,
+            fill_missing=False,
+            grade_mode=grade_mode,
+        )
 
-            # Fix grades
-            fixed_grades = self._fix_grades_for_year(grades_df, assignments_df)
-
-            # Save fixed grades
-            fixed_grades.to_csv(grades_file, index=False)
-
-            # Update assignments if needed and requested
-            if fix_assignments and assignments_df is not None:
-                fixed_assignments = self._fix_assignments_for_year(assignments_df)
-                fixed_assignments.to_csv(assignments_file, index=False)
-
-            years_fixed += 1
-            total_grades_fixed += len(fixed_grades)
-
-            logger.info(f"  Fixed {year}: {len(fixed_grades):,} grades")
+    def _patch_year_grades(
+        self, year: int, tables: Dict, fix_assignments: bool, grade_mode: str = "regenerate"
+    ) -> set:
+        """Rescore one year's grades in memory; returns the changed table names"""
+        if "grades" not in tables:
+            logger.warning(f"Grades file not found for {year}")
+            return set()
+
+        changed = {"grades"}
+        assignments_df = previous_assignments_df = tables.get("assignments")
+
+        # Update assignments first so scores are drawn against the new points
+        if fix_assignments and assignments_df is not None:
+            assignments_df = tables["assignments"] = self._fix_assignments_for_year(
+                assignments_df, keep_in_range=grade_mode == "target"
+            )
+            changed.add("assignments")
 
-        logger.info(
-            f"✅ Grade distributions patched: {years_fixed} years, {total_grades_fixed:,} total grades"
+        tables["grades"] = self._fix_grades_for_year(
+            tables["grades"], assignments_df, previous_assignments_df, grade_mode
         )
+        logger.info(f"  Fixed {year}: {len(tables['grades']):,} grades")
+        return changed
 
     def _fix_grades_for_year(
-        self, grades_df: pd.DataFrame, assignments_df: pd.DataFrame = None
+        self,
+        grades_df: pd.DataFrame,
+        assignments_df: pd.DataFrame = None,
+        previous_assignments_df: pd.DataFrame = None,
+        grade_mode: str = "regenerate",
     ) -> pd.DataFrame:
         """Fix grades for a single year to match policy"""
-
-        # Create assignments lookup for points_possible
-        assignments_lookup = {}
-        if assignments_df is not None:
-            for _, assignment in assignments_df.iterrows():
-                assignments_lookup[assignment["assignment_id"]] = assignment[
-                    "points_possible"
-                ]
-
-        # Fix each grade
         fixed_grades = grades_df.copy()
-
-        for idx, grade in fixed_grades.iterrows():
-            assignment_id = grade["assignment_id"]
-
-            # Get points possible (default to 100 if not found)
-            points_possible = assignments_lookup.get(assignment_id, 100)
-
-            # Generate new realistic score
-            new_score = self._generate_policy_compliant_score(points_possible)
-            fixed_grades.at[idx, "score"] = new_score
-
+        points_possible = self._points_possible_for(grades_df, assignments_df)
+
+        if grade_mode == "target":
+            fixed_grades["score"] = target_policy_scores(
+                grades_df["score"].to_numpy(),
+                points_possible,
+                previous_points=self._points_possible_for(grades_df, previous_assignments_df),
+                median_range=self.grade_policy["median_range"],
+                perfect_range=self.grade_policy["perfect_range"],
+                failing_range=self.grade_policy["failing_range"],
+            )
+        else:
+            fixed_grades["score"] = self._generate_policy_compliant_scores(points_possible)
         return fixed_grades
 
-    def _generate_policy_compliant_score(self, points_possible: int) -> int:
-        """Generate grade score that complies with school policy"""
-        rand = random.random()
-
-        if rand < self.grade_policy["perfect_rate"]:
-            # 3% perfect grades (95-100%)
-            percentage = random.uniform(0.95, 1.0)
-        elif (
-            rand < self.grade_policy["perfect_rate"] + self.grade_policy["failing_rate"]
-        ):
-            # 3-5% failing grades (0-69%)
-            percentage = random.uniform(0.0, 0.69)
-        else:
-            # Normal distribution centered around median (87%)
-            percentage = np.random.normal(
+    @staticmethod
+    def _points_possible_for(
+        grades_df: pd.DataFrame, assignments_df: pd.DataFrame = None
+    ) -> np.ndarray:
+        """points_possible of each grade's assignment (100 if unknown), via a map-join"""
+        if assignments_df is None:
+            return np.full(len(grades_df), 100, dtype=np.int64)
+
+        points_lookup = assignments_df.drop_duplicates("assignment_id").set_index(
+            "assignment_id"
+        )["points_possible"]
+        return (
+            grades_df["assignment_id"].map(points_lookup).fillna(100).to_numpy(np.int64)
+        )
+
+    def _generate_policy_compliant_scores(self, points_possible: np.ndarray) -> np.ndarray:
+        """Generate grade scores that comply with school policy, one per points value"""
+        points_possible = np.asarray(points_possible, dtype=np.int64)
+        n = len(points_possible)
+        perfect_rate = self.grade_policy["perfect_rate"]
+        failing_rate = self.grade_policy["failing_rate"]
+
+        # Mixture: 3% perfect (95-100%), 3-5% failing (0-69%), rest normal around 87%
+        component = self.rng.random(n)
+        percentage = np.clip(
+            self.rng.normal(
                 self.grade_policy["median_percentage"] / 100,
                 self.grade_policy["std_dev"] / 100,
-            )
-            # Clamp to 70-100% range for passing grades
-            percentage = max(0.70, min(1.0, percentage))
+                n,
+            ),
+            0.70,
+            1.0,
+        )
+        perfect = component < perfect_rate
+        failing = ~perfect & (component < perfect_rate + failing_rate)
+        percentage[perfect] = self.rng.uniform(0.95, 1.0, perfect.sum())
+        percentage[failing] = self.rng.uniform(0.0, 0.69, failing.sum())
 
         # Convert to actual points
-        score = round(points_possible * percentage)
-        return max(0, min(points_possible, score))
+        scores = np.round(points_possible * percentage).astype(np.int64)
+        return np.clip(scores, 0, points_possible)
 
-    def _fix_assignments_for_year(self, assignments_df: pd.DataFrame) -> pd.DataFrame:
-        """Fix assignment points to be more realistic"""
+    def _fix_assignments_for_year(
+        self, assignments_df: pd.DataFrame, keep_in_range: bool = False
+    ) -> pd.DataFrame:
+        """Fix assignment points to be more realistic
+
+        With keep_in_range, points already inside their category's range are kept.
+        """
         fixed_assignments = assignments_df.copy()
 
         # Define realistic point ranges by category
@@ -165,60 +353,59 @@ class LuminosityDataPatcher:
             "Final": (100, 200),
         }
 
-        for idx, assignment in fixed_assignments.iterrows():
-            category = assignment.get("category", "Homework")
-
-            if category in points_by_category:
-                min_points, max_points = points_by_category[category]
-                new_points = random.randint(min_points, max_points)
-                fixed_assignments.at[idx, "points_possible"] = new_points
+        # Plain values, so the mapped bounds are numbers rather than categoricals
+        categories = (
+            fixed_assignments["category"].astype(object)
+            if "category" in fixed_assignments.columns
+            else pd.Series("Homework", index=fixed_assignments.index)
+        )
+        low = categories.map({c: r[0] for c, r in points_by_category.items()})
+        high = categories.map({c: r[1] for c, r in points_by_category.items()})
+        known = low.notna().to_numpy()
+        if keep_in_range and "points_possible" in fixed_assignments.columns:
+            current = fixed_assignments["points_possible"]
+            known = known & ~((current >= low) & (current <= high)).to_numpy()
+
+        new_points = self.rng.integers(
+            low[known].to_numpy(np.int64), high[known].to_numpy(np.int64) + 1
+        )
+        if "points_possible" not in fixed_assignments.columns:
+            fixed_assignments["points_possible"] = np.nan
+        fixed_assignments.loc[known, "points_possible"] = new_points
 
         return fixed_assignments
 
     def patch_teacher_ratios(self, decade_dir: str):
         """Fix teacher-student ratios by adjusting teacher counts"""
-        logger.info("👩‍🏫 Patching teacher-student ratios...")
-
-        target_ratio = 8.5  # Target ratio for optimal class sizes
-        years_fixed = 0
-
-        for year in range(2016, 2026):
-            year_dir = os.path.join(decade_dir, f"{year}-{year+1}")
-            if not os.path.exists(year_dir):
-                continue
-
-            students_file = os.path.join(year_dir, "students.csv")
-            teachers_file = os.path.join(year_dir, "teachers.csv")
-
-            if not (os.path.exists(students_file) and os.path.exists(teachers_file)):
-                continue
+        return self.run_patches(
+            decade_dir, fix_grades=False, fix_financial=False, fill_missing=False
+        )
 
-            students_df = pd.read_csv(students_file)
-            teachers_df = pd.read_csv(teachers_file)
+    def _patch_year_teachers(self, year: int, tables: Dict) -> set:
+        """Add teachers to one year in memory if the ratio is too high"""
+        if not ("students" in tables and "teachers" in tables):
+            return set()
 
-            current_ratio = len(students_df) / len(teachers_df)
+        target_ratio = 8.5  # Target ratio for optimal class sizes
+        students_df = tables["students"]
+        teachers_df = tables["teachers"]
 
-            # If ratio is too high, add teachers
-            if current_ratio > target_ratio + 1:
-                needed_teachers = int(len(students_df) / target_ratio) - len(
-                    teachers_df
-                )
-                new_teachers = self._generate_additional_teachers(
-                    teachers_df, needed_teachers, year
-                )
+        current_ratio = len(students_df) / len(teachers_df)
 
-                if len(new_teachers) > 0:
-                    updated_teachers_df = pd.concat(
-                        [teachers_df, new_teachers], ignore_index=True
-                    )
-                    updated_teachers_df.to_csv(teachers_file, index=False)
+        # If ratio is too high, add teachers
+        if current_ratio <= target_ratio + 1:
+            return set()
 
-                    logger.info(
-                        f"  {year}: Added {len(new_teachers)} teachers (ratio: {current_ratio:.1f} → {len(students_df)/len(updated_teachers_df):.1f})"
-                    )
-                    years_fixed += 1
+        needed_teachers = int(len(students_df) / target_ratio) - len(teachers_df)
+        new_teachers = self._generate_additional_teachers(teachers_df, needed_teachers, year)
+        if len(new_teachers) == 0:
+            return set()
 
-        logger.info(f"✅ Teacher ratios patched: {years_fixed} years adjusted")
+        tables["teachers"] = pd.concat([teachers_df, new_teachers], ignore_index=True)
+        logger.info(
+            f"  {year}: Added {len(new_teachers)} teachers (ratio: {current_ratio:.1f} → {len(students_df)/len(tables['teachers']):.1f})"
+        )
+        return {"teachers"}
 
     def _generate_additional_teachers(
         self, existing_teachers_df: pd.DataFrame, count: int, year: int
@@ -257,60 +444,29 @@ class LuminosityDataPatcher:
 
     def patch_financial_data(self, decade_dir: str):
         """Fix financial data inconsistencies"""
-        logger.info("💰 Patching financial data...")
-
-        # Base fee structure (will be adjusted by year)
-        base_fees = {
-            1: {"name": "Tech Fee", "amount": 100, "frequency": "One Time"},
-            2: {"name": "Field Trip Fund", "amount": 50, "frequency": "One Time"},
-            3: {"name": "Lunch Plan", "amount": 400, "frequency": "Monthly"},
-            4: {"name": "Tuition", "amount": 8000, "frequency": "Annual"},
-            5: {"name": "Activity Fee", "amount": 75, "frequency": "Per Term"},
-        }
-
-        # Year-specific adjustments
-        fee_adjustments = {
-            2016: {"Tech Fee": 1.0, "Tuition": 1.0},
-            2017: {"Tech Fee": 1.10, "Tuition": 1.0},
-            2018: {"Tech Fee": 1.10, "Tuition": 1.0},
-            2019: {"Tech Fee": 1.25, "Tuition": 1.0},
-            2020: {"Tech Fee": 1.50, "Tuition": 1.0},  # COVID tech needs
-            2021: {"Tech Fee": 1.50, "Tuition": 1.0},
-            2022: {"Tech Fee": 1.30, "Tuition": 1.10},  # 10% tuition increase
-            2023: {"Tech Fee": 1.30, "Tuition": 1.155},  # 5% increase on 2022
-            2024: {"Tech Fee": 1.30, "Tuition": 1.155},
-            2025: {"Tech Fee": 1.30, "Tuition": 1.189},  # 3% increase
-        }
-
-        years_fixed = 0
+        return self.run_patches(
+            decade_dir, fix_grades=False, fix_ratios=False, fill_missing=False
+        )
 
-        for year in range(2016, 2026):
-            year_dir = os.path.join(decade_dir, f"{year}-{year+1}")
-            if not os.path.exists(year_dir):
-                continue
+    def _patch_year_finances(self, year: int, tables: Dict) -> set:
+        """Adjust one year's fee types and payments in memory"""
+        changed = set()
 
-            fee_types_file = os.path.join(year_dir, "fee_types.csv")
-            payments_file = os.path.join(year_dir, "payments.csv")
+        # Update fee types
+        if "fee_types" in tables:
+            tables["fee_types"] = self._apply_fee_adjustments(
+                tables["fee_types"], self.base_fees, self.fee_adjustments.get(year, {})
+            )
+            changed.add("fee_types")
 
-            # Update fee types
-            if os.path.exists(fee_types_file):
-                fee_types_df = pd.read_csv(fee_types_file)
-                adjusted_fees = self._apply_fee_adjustments(
-                    fee_types_df, base_fees, fee_adjustments.get(year, {})
-                )
-                adjusted_fees.to_csv(fee_types_file, index=False)
-
-            # Update payments to match new fee structure
-            if os.path.exists(payments_file):
-                payments_df = pd.read_csv(payments_file)
-                adjusted_payments = self._adjust_payment_amounts(
-                    payments_df,
-                    adjusted_fees if "adjusted_fees" in locals() else fee_types_df,
-                )
-                adjusted_payments.to_csv(payments_file, index=False)
-                years_fixed += 1
+        # Update payments to match new fee structure
+        if "payments" in tables and "fee_types" in tables:
+            tables["payments"] = self._adjust_payment_amounts(
+                tables["payments"], tables["fee_types"]
+            )
+            changed.add("payments")
 
-        logger.info(f"✅ Financial data patched: {years_fixed} years updated")
+        return changed
 
     def _apply_fee_adjustments(
         self, fee_types_df: pd.DataFrame, base_fees: Dict, adjustments: Dict
@@ -318,14 +474,14 @@ class LuminosityDataPatcher:
         """Apply year-specific fee adjustments"""
         adjusted_df = fee_types_df.copy()
 
-        for idx, fee in adjusted_df.iterrows():
-            fee_name = fee["name"]
-            if fee_name in adjustments:
-                base_amount = base_fees.get(fee["fee_type_id"], {}).get(
-                    "amount", fee["amount"]
-                )
-                new_amount = int(base_amount * adjustments[fee_name])
-                adjusted_df.at[idx, "amount"] = new_amount
+        factor = adjusted_df["name"].map(adjustments)
+        adjusted = factor.notna()
+        base_amount = adjusted_df["fee_type_id"].map(
+            {fee_type_id: fee["amount"] for fee_type_id, fee in base_fees.items()}
+        ).fillna(adjusted_df["amount"])
+        adjusted_df.loc[adjusted, "amount"] = (
+            (base_amount[adjusted] * factor[adjusted]).astype(np.int64)
+        )
 
         return adjusted_df
 
@@ -335,56 +491,49 @@ class LuminosityDataPatcher:
         """Adjust payment amounts to match fee structure"""
         adjusted_df = payments_df.copy()
 
-        # Create fee lookup
-        fee_lookup = {}
-        for _, fee in fee_types_df.iterrows():
-            fee_lookup[fee["fee_type_id"]] = fee["amount"]
-
-        for idx, payment in adjusted_df.iterrows():
-            fee_type_id = payment["fee_type_id"]
-            if fee_type_id in fee_lookup:
-                expected_amount = fee_lookup[fee_type_id]
+        expected_amount = adjusted_df["fee_type_id"].map(
+            fee_types_df.drop_duplicates("fee_type_id").set_index("fee_type_id")["amount"]
+        )
+        known = expected_amount.notna().to_numpy()
 
-                # Add some realistic variation (±10%)
-                variation = random.uniform(0.9, 1.1)
-                adjusted_amount = int(expected_amount * variation)
-                adjusted_df.at[idx, "amount_paid"] = adjusted_amount
+        # Add some realistic variation (±10%)
+        variation = self.rng.uniform(0.9, 1.1, known.sum())
+        adjusted_df.loc[known, "amount_paid"] = (
+            expected_amount[known].to_numpy(float) * variation
+        ).astype(np.int64)
 
         return adjusted_df
 
     def generate_missing_data(self, decade_dir: str):
         """Generate any missing data files"""
-        logger.info("📋 Generating missing data files...")
-
-        missing_files_generated = 0
-
-        for year in range(2016, 2026):
-            year_dir = os.path.join(decade_dir, f"{year}-{year+1}")
-            if not os.path.exists(year_dir):
-                continue
-
-            # Standard files that should exist
-            standard_files = [
-                "grade_levels.csv",
-                "departments.csv",
-                "guardian_types.csv",
-                "periods.csv",
-                "classrooms.csv",
-            ]
-
-            for filename in standard_files:
-                filepath = os.path.join(year_dir, filename)
-                if not os.path.exists(filepath):
-                    self._generate_standard_file(filepath, filename)
-                    missing_files_generated += 1
-
-        if missing_files_generated > 0:
-            logger.info(
-                f"✅ Generated {missing_files_generated} missing standard files"
-            )
+        return self.run_patches(
+            decade_dir, fix_grades=False, fix_ratios=False, fix_financial=False
+        )
 
-    def _generate_standard_file(self, filepath: str, filename: str):
-        """Generate standard reference data files"""
+    def _fill_year_standard_tables(self, year_dir: str, tables: Dict) -> set:
+        """Create missing standard reference tables for one year in memory"""
+        # Standard files that should exist
+        standard_files = [
+            "grade_levels.csv",
+            "departments.csv",
+            "guardian_types.csv",
+            "periods.csv",
+            "classrooms.csv",
+        ]
+
+        created = set()
+        for filename in standard_files:
+            if not os.path.exists(os.path.join(year_dir, filename)):
+                data = self._generate_standard_table(filename)
+                if data is not None:
+                    table_name = filename[: -len(".csv")]
+                    tables[table_name] = data
+                    created.add(table_name)
+                    logger.info(f"  Generated {filename}")
+        return created
+
+    def _generate_standard_table(self, filename: str) -> Optional[pd.DataFrame]:
+        """Generate standard reference data tables"""
 
         if filename == "grade_levels.csv":
             data = pd.DataFrame(
@@ -474,15 +623,29 @@ class LuminosityDataPatcher:
             )
 
         else:
-            return  # Unknown file type
+            return None  # Unknown file type
+
+        return data
 
-        data.to_csv(filepath, index=False)
-        logger.info(f"  Generated {filename}")
+    def validate_patches(
+        self,
+        decade_dir: str,
+        year_tables: Dict[int, Dict[str, pd.DataFrame]] = None,
+        journal: Optional[PatchJournal] = None,
+    ) -> Dict:
+        """Validate that patches have been applied correctly
 
-    def validate_patches(self, decade_dir: str) -> Dict:
-        """Validate that patches have been applied correctly"""
+        Pass the tables returned by run_patches to validate them without re-reading
+        the year directories. Pending journal deltas are overlaid when reading.
+        """
         logger.info("🔍 Validating patches...")
 
+        if year_tables is None:
+            year_tables = {
+                year: self._load_year_tables(year_dir, self.PATCH_TABLES, year, journal)
+                for year, year_dir in self._year_dirs(decade_dir)
+            }
+
         validation_results = {
             "passed": [],
             "failed": [],
@@ -491,7 +654,7 @@ class LuminosityDataPatcher:
         }
 
         # Validate grade distributions
-        grade_stats = self._validate_grade_distributions(decade_dir)
+        grade_stats = self._validate_grade_distributions(year_tables)
         validation_results["statistics"]["grade_distributions"] = grade_stats
 
         for year, stats in grade_stats.items():
@@ -513,7 +676,7 @@ class LuminosityDataPatcher:
                 )
 
         # Validate teacher ratios
-        ratio_stats = self._validate_teacher_ratios(decade_dir)
+        ratio_stats = self._validate_teacher_ratios(year_tables)
         validation_results["statistics"]["teacher_ratios"] = ratio_stats
 
         ratios_in_range = all(
@@ -535,7 +698,7 @@ class LuminosityDataPatcher:
             )
 
         # Validate financial consistency
-        financial_stats = self._validate_financial_data(decade_dir)
+        financial_stats = self._validate_financial_data(year_tables)
         validation_results["statistics"]["financial_summary"] = financial_stats
 
         validation_results["passed"].append(
@@ -551,36 +714,24 @@ class LuminosityDataPatcher:
 
         return validation_results
 
-    def _validate_grade_distributions(self, decade_dir: str) -> Dict:
+    def _validate_grade_distributions(self, year_tables: Dict) -> Dict:
         """Validate grade distributions after patching"""
         grade_stats = {}
 
-        for year in range(2016, 2026):
-            year_dir = os.path.join(decade_dir, f"{year}-{year+1}")
-            grades_file = os.path.join(year_dir, "grades.csv")
-            assignments_file = os.path.join(year_dir, "assignments.csv")
-
-            if not (os.path.exists(grades_file) and os.path.exists(assignments_file)):
+        for year, tables in year_tables.items():
+            if not ("grades" in tables and "assignments" in tables):
                 continue
 
-            grades_df = pd.read_csv(grades_file)
-            assignments_df = pd.read_csv(assignments_file)
+            grades_df = tables["grades"]
 
             # Calculate percentages for each grade
-            percentages = []
-            assignments_lookup = {
-                row["assignment_id"]: row["points_possible"]
-                for _, row in assignments_df.iterrows()
-            }
-
-            for _, grade in grades_df.iterrows():
-                points_possible = assignments_lookup.get(grade["assignment_id"], 100)
-                if points_possible > 0:
-                    percentage = (grade["score"] / points_possible) * 100
-                    percentages.append(percentage)
+            points_possible = self._points_possible_for(grades_df, tables["assignments"])
+            graded = points_possible > 0
+            percentages = (
+                grades_df["score"].to_numpy(float)[graded] / points_possible[graded] * 100
+            )
 
-            if percentages:
-                percentages = np.array(percentages)
+            if len(percentages):
                 grade_stats[year] = {
                     "mean": float(np.mean(percentages)),
                     "median": float(np.median(percentages)),
@@ -593,41 +744,31 @@ class LuminosityDataPatcher:
 
         return grade_stats
 
-    def _validate_teacher_ratios(self, decade_dir: str) -> Dict:
+    def _validate_teacher_ratios(self, year_tables: Dict) -> Dict:
         """Validate teacher-student ratios"""
         ratio_stats = {}
 
-        for year in range(2016, 2026):
-            year_dir = os.path.join(decade_dir, f"{year}-{year+1}")
-            students_file = os.path.join(year_dir, "students.csv")
-            teachers_file = os.path.join(year_dir, "teachers.csv")
-
-            if not (os.path.exists(students_file) and os.path.exists(teachers_file)):
+        for year, tables in year_tables.items():
+            if not ("students" in tables and "teachers" in tables):
                 continue
 
-            students_df = pd.read_csv(students_file)
-            teachers_df = pd.read_csv(teachers_file)
-
             ratio_stats[year] = {
-                "teachers": len(teachers_df),
-                "students": len(students_df),
-                "ratio": len(students_df) / len(teachers_df),
+                "teachers": len(tables["teachers"]),
+                "students": len(tables["students"]),
+                "ratio": len(tables["students"]) / len(tables["teachers"]),
             }
 
         return ratio_stats
 
-    def _validate_financial_data(self, decade_dir: str) -> Dict:
+    def _validate_financial_data(self, year_tables: Dict) -> Dict:
         """Validate financial data consistency"""
         financial_stats = {}
 
-        for year in range(2016, 2026):
-            year_dir = os.path.join(decade_dir, f"{year}-{year+1}")
-            payments_file = os.path.join(year_dir, "payments.csv")
-
-            if not os.path.exists(payments_file):
+        for year, tables in year_tables.items():
+            if "payments" not in tables:
                 continue
 
-            payments_df = pd.read_csv(payments_file)
+            payments_df = tables["payments"]
 
             financial_stats[year] = {
                 "total_revenue": int(payments_df["amount_paid"].sum()),
@@ -637,21 +778,23 @@ class LuminosityDataPatcher:
 
         return financial_stats
 
-    def run_comprehensive_patch(self, decade_dir: str):
+    def run_comprehensive_patch(
+        self,
+        decade_dir: str,
+        journal: Optional[PatchJournal] = None,
+        grade_mode: str = "regenerate",
+    ):
         """Run all patches and validation"""
         logger.info(f"\n{'='*60}")
         logger.info("LUMINOSITY DATA QUALITY COMPREHENSIVE PATCH")
         logger.info(f"{'='*60}")
         logger.info(f"Target Directory: {decade_dir}")
 
-        # Run all patches
-        self.patch_grade_distributions(decade_dir, fix_assignments=True)
-        self.patch_teacher_ratios(decade_dir)
-        self.patch_financial_data(decade_dir)
-        self.generate_missing_data(decade_dir)
+        # Run all patches in a single pass over the years
+        year_tables = self.run_patches(decade_dir, journal=journal, grade_mode=grade_mode)
 
-        # Validate results
-        validation_results = self.validate_patches(decade_dir)
+        # Validate results from the patched tables still in memory
+        validation_results = self.validate_patches(decade_dir, year_tables)
 
         # Save validation report
         report_file = os.path.join(decade_dir, "patch_validation_report.json")
@@ -705,27 +848,44 @@ def main():
         "--validate-only", action="store_true", help="Only validate, no fixes"
     )
     parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--grade-mode",
+        choices=["regenerate", "target"],
+        default="regenerate",
+        help="Redraw every score, or move only the rows needed to meet the grade policy",
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="Record column patches as deltas in the patch journal instead of rewriting CSVs",
+    )
 
     args = parser.parse_args()
 
     # Initialize patcher
     patcher = LuminosityDataPatcher(seed=args.seed)
+    journal = PatchJournal(args.decade_dir) if args.journal else None
 
     if args.validate_only:
-        validation_results = patcher.validate_patches(args.decade_dir)
+        validation_results = patcher.validate_patches(args.decade_dir, journal=journal)
         print("Validation complete. Check patch_validation_report.json for details.")
     elif args.fix_all:
-        patcher.run_comprehensive_patch(args.decade_dir)
+        patcher.run_comprehensive_patch(
+            args.decade_dir, journal=journal, grade_mode=args.grade_mode
+        )
     else:
-        if args.fix_grades:
-            patcher.patch_grade_distributions(args.decade_dir)
-        if args.fix_ratios:
-            patcher.patch_teacher_ratios(args.decade_dir)
-        if args.fix_financial:
-            patcher.patch_financial_data(args.decade_dir)
+        year_tables = patcher.run_patches(
+            args.decade_dir,
+            fix_grades=args.fix_grades,
+            fix_ratios=args.fix_ratios,
+            fix_financial=args.fix_financial,
+            fill_missing=False,
+            journal=journal,
+            grade_mode=args.grade_mode,
+        )
 
         # Run validation after individual fixes
-        validation_results = patcher.validate_patches(args.decade_dir)
+        validation_results = patcher.validate_patches(args.decade_dir, year_tables)
         print(
             "Patches applied. Check patch_validation_report.json for validation results."
         )
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Column-level patch journal for the Luminosity decade dataset
+
+Patches such as the grade distribution fix only change a single column (score,
+points_possible, amount_paid, ...), yet used to rewrite whole CSVs and lose the
+previous values. The journal records each change as a compact, primary-key-keyed
+delta (key, old value, new value) per year/table/column instead:
+
+    <decade_dir>/patch_journal/journal.json                 manifest of all deltas
+    <decade_dir>/patch_journal/<patch_id>/<year>_<table>_<column>.parquet
+
+Deltas start out "pending": the CSVs are untouched and readers see the patched
+values through overlay(). materialize() writes pending deltas into the CSVs,
+revert() undoes a patch (only the journaled column is rewritten, and nothing at all
+if it was never materialized), and describe() reports what a patch changed straight
+from the delta files.
+
+Usage:
+    python patch_journal.py --decade-dir ../data/decade --list
+    python patch_journal.py --decade-dir ../data/decade --describe PATCH_ID
+    python patch_journal.py --decade-dir ../data/decade --materialize [PATCH_ID]
+    python patch_journal.py --decade-dir ../data/decade --revert PATCH_ID
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from csv_ingest import load_table
+
+logger = logging.getLogger(__name__)
+
+# Primary key of every table a column patch may touch
+PRIMARY_KEYS = {
+    "grades": "grade_id",
+    "assignments": "assignment_id",
+    "payments": "payment_id",
+    "fee_types": "fee_type_id",
+    "teachers": "teacher_id",
+    "students": "student_id",
+}
+
+PENDING = "pending"
+MATERIALIZED = "materialized"
+REVERTED = "reverted"
+
+
+class PatchJournal:
+    """Records, overlays, materializes and reverts column deltas for a decade directory"""
+
+    def __init__(self, decade_dir: str, journal_dir: Optional[str] = None):
+        self.decade_dir = decade_dir
+        self.journal_dir = journal_dir or os.path.join(decade_dir, "patch_journal")
+        self.manifest_file = os.path.join(self.journal_dir, "journal.json")
+        self.entries = self._load_manifest()
+
+    def _load_manifest(self) -> List[Dict]:
+        if not os.path.exists(self.manifest_file):
+            return []
+        with open(self.manifest_file, "r") as f:
+            return json.load(f)
+
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        temp_file = f"{self.manifest_file}.tmp"
+        with open(temp_file, "w") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(temp_file, self.manifest_file)
+
+    def begin(self, patch_name: str) -> str:
+        """Allocate a new patch id"""
+        patch_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{patch_name}"
+        existing = {entry["patch_id"] for entry in self.entries}
+        suffix = 2
+        candidate = patch_id
+        while candidate in existing or os.path.exists(os.path.join(self.journal_dir, candidate)):
+            candidate = f"{patch_id}-{suffix}"
+            suffix += 1
+        return candidate
+
+    def record(
+        self,
+        patch_id: str,
+        year: int,
+        table: str,
+        before: pd.DataFrame,
+        after: pd.DataFrame,
+        columns: List[str],
+    ) -> int:
+        """Record the changed cells of `columns` between two row-aligned frames.
+
+        Returns the number of changed cells. Nothing is written to the CSVs.
+        """
+        key_column = PRIMARY_KEYS[table]
+        changed_cells = 0
+
+        for column in columns:
+            old = before[column].to_numpy()
+            new = after[column].to_numpy()
+            changed = ~((old == new) | (pd.isna(old) & pd.isna(new)))
+            if not changed.any():
+                continue
+
+            self._ensure_single_active(year, table, column, patch_id)
+            delta = pd.DataFrame(
+                {
+                    "key": before[key_column].to_numpy()[changed],
+                    "old": old[changed],
+                    "new": new[changed],
+                }
+            )
+            delta_file = os.path.join(patch_id, f"{year}_{table}_{column}.parquet")
+            os.makedirs(os.path.join(self.journal_dir, patch_id), exist_ok=True)
+            delta.to_parquet(os.path.join(self.journal_dir, delta_file), index=False)
+
+            self.entries.append(
+                {
+                    "patch_id": patch_id,
+                    "year": year,
+                    "table": table,
+                    "column": column,
+                    "key_column": key_column,
+                    "rows": int(changed.sum()),
+                    "delta_file": delta_file,
+                    "status": PENDING,
+                    "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                }
+            )
+            changed_cells += int(changed.sum())
+
+        return changed_cells
+
+    def _ensure_single_active(self, year: int, table: str, column: str, patch_id: str):
+        """Deltas stack on one column only after the previous one was materialized"""
+        for entry in self._entries_for(year, table, status=PENDING):
+            if entry["column"] == column and entry["patch_id"] != patch_id:
+                raise ValueError(
+                    f"{table}.{column} for {year} already has pending patch "
+                    f"{entry['patch_id']}; materialize or revert it first"
+                )
+
+    def _entries_for(self, year: int, table: str, status: str) -> List[Dict]:
+        return [
+            entry
+            for entry in self.entries
+            if entry["year"] == year and entry["table"] == table and entry["status"] == status
+        ]
+
+    def _read_delta(self, entry: Dict) -> pd.DataFrame:
+        return pd.read_parquet(os.path.join(self.journal_dir, entry["delta_file"]))
+
+    @staticmethod
+    def _apply_values(df: pd.DataFrame, entry: Dict, delta: pd.DataFrame, value_column: str):
+        """Set df[column] to delta[value_column] for rows whose key appears in delta"""
+        positions = pd.Index(delta["key"]).get_indexer(df[entry["key_column"]])
+        hit = positions >= 0
+        values = delta[value_column].to_numpy()[positions[hit]]
+        column = entry["column"]
+        if hit.any():
+            if column not in df.columns:
+                df[column] = np.nan
+            result = df[column].to_numpy(copy=True)
+            if result.dtype.kind in "iu" and np.asarray(values).dtype.kind == "f":
+                result = result.astype(float)
+            result[hit] = values
+            df[column] = result
+
+    def overlay(self, year: int, table: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Return df with this year's pending deltas for the table applied (lazy view)"""
+        pending = self._entries_for(year, table, status=PENDING)
+        if not pending:
+            return df
+
+        df = df.copy()
+        for entry in pending:
+            self._apply_values(df, entry, self._read_delta(entry), "new")
+        return df
+
+    def _rewrite_tables(self, entries: List[Dict], value_column: str, new_status: str):
+        """Apply the given entries to their CSVs, one atomic write per file"""
+        by_file = {}
+        for entry in entries:
+            by_file.setdefault((entry["year"], entry["table"]), []).append(entry)
+
+        for (year, table), file_entries in sorted(by_file.items()):
+            csv_path = os.path.join(self.decade_dir, f"{year}-{year+1}", f"{table}.csv")
+            df = load_table(csv_path, table)
+            # Revert newest first so stacked deltas unwind in order
+            if value_column == "old":
+                file_entries = list(reversed(file_entries))
+            for entry in file_entries:
+                self._apply_values(df, entry, self._read_delta(entry), value_column)
+
+            temp_path = f"{csv_path}.tmp"
+            df.to_csv(temp_path, index=False)
+            os.replace(temp_path, csv_path)
+
+            for entry in file_entries:
+                entry["status"] = new_status
+            self.save()
+            logger.info(
+                f"  {year} {table}: {new_status} "
+                f"{', '.join(sorted({e['column'] for e in file_entries}))}"
+            )
+
+    def materialize(self, patch_id: Optional[str] = None):
+        """Write pending deltas (all, or one patch's) into the CSVs"""
+        pending = [
+            entry
+            for entry in self.entries
+            if entry["status"] == PENDING and (patch_id is None or entry["patch_id"] == patch_id)
+        ]
+        self._rewrite_tables(pending, "new", MATERIALIZED)
+        logger.info(f"✅ Materialized {len(pending)} column deltas")
+
+    def revert(self, patch_id: str):
+        """Undo a patch. Pending deltas are simply dropped; materialized ones get
+        their old values written back."""
+        entries = [e for e in self.entries if e["patch_id"] == patch_id and e["status"] != REVERTED]
+        if not entries:
+            raise ValueError(f"No active entries for patch {patch_id}")
+
+        for entry in entries:
+            later = [
+                e
+                for e in self.entries[self.entries.index(entry) + 1:]
+                if e["patch_id"] != patch_id
+                and e["status"] != REVERTED
+                and (e["year"], e["table"], e["column"]) == (entry["year"], entry["table"], entry["column"])
+            ]
+            if later:
+                raise ValueError(
+                    f"{entry['table']}.{entry['column']} for {entry['year']} was patched again by "
+                    f"{later[0]['patch_id']}; revert that patch first"
+                )
+
+        for entry in entries:
+            if entry["status"] == PENDING:
+                entry["status"] = REVERTED
+        self.save()
+
+        self._rewrite_tables(
+            [e for e in entries if e["status"] == MATERIALIZED], "old", REVERTED
+        )
+        logger.info(f"✅ Reverted patch {patch_id}")
+
+    def describe(self, patch_id: str) -> pd.DataFrame:
+        """What a patch changed, per year/table/column, read from the delta files only"""
+        rows = []
+        for entry in self.entries:
+            if entry["patch_id"] != patch_id:
+                continue
+            delta = self._read_delta(entry)
+            row = {
+                "year": entry["year"],
+                "table": entry["table"],
+                "column": entry["column"],
+                "status": entry["status"],
+                "rows_changed": len(delta),
+            }
+            if pd.api.types.is_numeric_dtype(delta["new"]) and pd.api.types.is_numeric_dtype(delta["old"]):
+                diff = delta["new"].astype(float) - delta["old"].astype(float)
+                row.update(
+                    {
+                        "mean_delta": float(diff.mean()),
+                        "mean_abs_delta": float(diff.abs().mean()),
+                        "max_abs_delta": float(diff.abs().max()),
+                    }
+                )
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def patches(self) -> pd.DataFrame:
+        """One row per patch with its status counts"""
+        if not self.entries:
+            return pd.DataFrame(columns=["patch_id", "status", "deltas", "rows"])
+        entries = pd.DataFrame(self.entries)
+        return (
+            entries.groupby(["patch_id", "status"], sort=False)
+            .agg(deltas=("column", "size"), rows=("rows", "sum"))
+            .reset_index()
+        )
+
+    def purge(self, patch_id: str):
+        """Remove a reverted patch's delta files and manifest entries"""
+        if any(e["patch_id"] == patch_id and e["status"] != REVERTED for e in self.entries):
+            raise ValueError(f"Patch {patch_id} is still active; revert it first")
+        self.entries = [e for e in self.entries if e["patch_id"] != patch_id]
+        shutil.rmtree(os.path.join(self.journal_dir, patch_id), ignore_errors=True)
+        self.save()
+
+
+def main():
+    """Inspect, materialize or revert journaled patches"""
+    parser = argparse.ArgumentParser(description="Manage the Luminosity patch journal")
+    parser.add_argument(
+        "--decade-dir", default="../data/decade", help="Path to decade data directory"
+    )
+    parser.add_argument("--list", action="store_true", help="List journaled patches")
+    parser.add_argument("--describe", metavar="PATCH_ID", help="Show what a patch changed")
+    parser.add_argument(
+        "--materialize",
+        nargs="?",
+        const="",
+        metavar="PATCH_ID",
+        help="Write pending deltas into the CSVs (all patches if no id is given)",
+    )
+    parser.add_argument("--revert", metavar="PATCH_ID", help="Undo a patch")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    journal = PatchJournal(args.decade_dir)
+
+    if args.describe:
+        print(journal.describe(args.describe).to_string(index=False))
+    elif args.materialize is not None:
+        journal.materialize(args.materialize or None)
+    elif args.revert:
+        journal.revert(args.revert)
+    else:
+        print(journal.patches().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
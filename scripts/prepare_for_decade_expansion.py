@@ -21,6 +21,8 @@ from typing import Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
+from csv_ingest import load_table
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -48,7 +50,7 @@ class LuminosityDataAnalyzer:
             file_path = os.path.join(self.data_dir, csv_file)
 
             try:
-                df = pd.read_csv(file_path)
+                df = load_table(file_path, table_name)
                 self.tables[table_name] = df
                 logger.info(
                     f"✅ Loaded {table_name}: {len(df)} rows, {len(df.columns)} columns"
@@ -137,7 +139,8 @@ class LuminosityDataAnalyzer:
 
         # Age analysis (calculate from birth dates)
         try:
-            students_df["date_of_birth"] = pd.to_datetime(students_df["date_of_birth"])
+            if not pd.api.types.is_datetime64_any_dtype(students_df["date_of_birth"]):
+                students_df["date_of_birth"] = pd.to_datetime(students_df["date_of_birth"])
             today = pd.Timestamp.now()
             students_df["age"] = (today - students_df["date_of_birth"]).dt.days / 365.25
 
@@ -529,9 +532,10 @@ class LuminosityDataAnalyzer:
             students_df = self.tables["students"]
 
             try:
-                students_df["date_of_birth"] = pd.to_datetime(
-                    students_df["date_of_birth"]
-                )
+                if not pd.api.types.is_datetime64_any_dtype(students_df["date_of_birth"]):
+                    students_df["date_of_birth"] = pd.to_datetime(
+                        students_df["date_of_birth"]
+                    )
                 today = pd.Timestamp.now()
                 students_df["age"] = (
                     today - students_df["date_of_birth"]
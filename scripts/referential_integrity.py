@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Schema-driven referential integrity engine for the Luminosity decade dataset
+
+Every column marked FK in luminosity_schema.mmd is resolved to the table whose
+primary key has the same name (students.grade_level_id -> grade_levels, grades
+.assignment_id -> assignments, payments.guardian_id -> guardians, ...), and each
+foreign key is checked for every year in two scopes:
+- same year: the key must exist in that year's parent table. This is what the
+  consolidated dataset needs, since ids restart each year and consolidated rows
+  are keyed by (school_year_id, id).
+- any year: the key must exist in the parent table of some year. Violations of
+  the first scope that pass this one are cross-year references; the rest dangle.
+
+Parent keys are kept as sorted unique arrays and membership is a vectorized
+np.searchsorted, so each child table is read once (in chunks if requested) for
+all of its foreign keys and the full decade checks in seconds.
+
+Usage:
+    python referential_integrity.py --data-dir ../data/decade
+    python referential_integrity.py --data-dir ../data/decade --chunk-size 500000
+"""
+
+import argparse
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from csv_ingest import load_table, load_table_chunks
+from schema_registry import SCHEMA_FILE, parse_schema
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    table: str
+    column: str
+    parent: str
+    parent_column: str
+
+    def __str__(self):
+        return f"{self.table}.{self.column} -> {self.parent}.{self.parent_column}"
+
+
+def foreign_keys(schema: Dict) -> List[ForeignKey]:
+    """Resolve every FK column to the table whose primary key has the same name"""
+    owners = {}
+    for table, spec in schema["tables"].items():
+        if len(spec["pk"]) == 1:
+            owners.setdefault(spec["pk"][0], []).append(table)
+
+    related = {frozenset(pair) for pair in schema["relationships"]}
+    resolved = []
+    for table, spec in schema["tables"].items():
+        for column in spec["fk"]:
+            parents = [parent for parent in owners.get(column, []) if parent != table]
+            if len(parents) != 1:
+                logger.warning(f"Cannot resolve foreign key {table}.{column}; skipping")
+                continue
+            if frozenset((table, parents[0])) not in related:
+                logger.debug(f"{table}.{column} has no declared relationship to {parents[0]}")
+            resolved.append(ForeignKey(table, column, parents[0], column))
+    return resolved
+
+
+def _contains(sorted_keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Vectorized membership of values in a sorted unique key array"""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_keys, values), len(sorted_keys) - 1)
+    return sorted_keys[positions] == values
+
+
+def _key_array(values: pd.Series) -> np.ndarray:
+    """Non-null key values as a sortable numpy array"""
+    values = values.dropna()
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(np.int64)
+    return values.astype(str).to_numpy()
+
+
+class ForeignKeyEngine:
+    """Checks every schema foreign key within and across the years of a decade folder"""
+
+    def __init__(
+        self,
+        data_dir: str,
+        schema_path: str = SCHEMA_FILE,
+        chunk_size: Optional[int] = None,
+        sample_size: int = 5,
+    ):
+        self.data_dir = data_dir
+        self.foreign_keys = foreign_keys(parse_schema(schema_path))
+        self.chunk_size = chunk_size
+        self.sample_size = sample_size
+        self.years = sorted(
+            int(item.split("-")[0])
+            for item in os.listdir(data_dir)
+            if "-" in item and os.path.isdir(os.path.join(data_dir, item))
+        )
+        self._headers = {}
+        self.rows_read = 0
+        self.bytes_read = 0
+
+    def _path(self, year: int, table: str) -> str:
+        return os.path.join(self.data_dir, f"{year}-{year+1}", f"{table}.csv")
+
+    def _columns(self, year: int, table: str) -> List[str]:
+        """Header of a year's table (empty if the file is missing)"""
+        key = (year, table)
+        if key not in self._headers:
+            path = self._path(year, table)
+            self._headers[key] = (
+                list(pd.read_csv(path, nrows=0).columns) if os.path.exists(path) else []
+            )
+        return self._headers[key]
+
+    def _parent_keys(self) -> Dict:
+        """Sorted unique keys of every referenced parent column, per year and decade-wide"""
+        parent_keys = {}
+        for parent, column in {(fk.parent, fk.parent_column) for fk in self.foreign_keys}:
+            by_year = {}
+            for year in self.years:
+                if column in self._columns(year, parent):
+                    keys = load_table(self._path(year, parent), parent, [column])[column]
+                    self.rows_read += len(keys)
+                    self.bytes_read += os.path.getsize(self._path(year, parent))
+                    by_year[year] = np.unique(_key_array(keys))
+            if by_year:
+                parent_keys[parent, column] = {
+                    "by_year": by_year,
+                    "any_year": np.unique(np.concatenate(list(by_year.values()))),
+                }
+        return parent_keys
+
+    def check(self) -> List[Dict]:
+        """Check every foreign key; one result dict per foreign key that applies to the data"""
+        parent_keys = self._parent_keys()
+        results = {}
+
+        by_table = {}
+        for fk in self.foreign_keys:
+            if (fk.parent, fk.parent_column) in parent_keys:
+                by_table.setdefault(fk.table, []).append(fk)
+
+        for table, table_fks in sorted(by_table.items()):
+            for year in self.years:
+                header = self._columns(year, table)
+                year_fks = [fk for fk in table_fks if fk.column in header]
+                if not year_fks:
+                    continue
+
+                path = self._path(year, table)
+                columns = sorted({fk.column for fk in year_fks})
+                self.bytes_read += os.path.getsize(path)
+                if self.chunk_size is None:
+                    chunks = [load_table(path, table, columns)]
+                else:
+                    chunks = load_table_chunks(path, table, self.chunk_size, columns)
+                for chunk in chunks:
+                    self.rows_read += len(chunk)
+                    for fk in year_fks:
+                        self._check_chunk(fk, year, chunk[fk.column], parent_keys, results)
+
+        return [results[fk] for fk in self.foreign_keys if fk in results]
+
+    def _check_chunk(self, fk: ForeignKey, year: int, values: pd.Series, parent_keys, results):
+        """Accumulate one chunk of child keys into the foreign key's result"""
+        result = results.setdefault(
+            fk,
+            {
+                "foreign_key": str(fk),
+                "rows_checked": 0,
+                "missing_same_year": 0,
+                "cross_year": 0,
+                "dangling": 0,
+                "samples": [],
+            },
+        )
+        keys = parent_keys[fk.parent, fk.parent_column]
+        values = _key_array(values)
+        year_keys = keys["by_year"].get(year, values[:0])
+
+        missing = ~_contains(year_keys, values)
+        dangling = missing & ~_contains(keys["any_year"], values)
+
+        result["rows_checked"] += len(values)
+        result["missing_same_year"] += int(missing.sum())
+        result["cross_year"] += int((missing & ~dangling).sum())
+        result["dangling"] += int(dangling.sum())
+
+        room = self.sample_size - len(result["samples"])
+        if room > 0 and missing.any():
+            seen = {sample["value"] for sample in result["samples"] if sample["year"] == year}
+            for value in pd.unique(values[missing]):
+                value = value.item() if hasattr(value, "item") else value
+                if room == 0:
+                    break
+                if value not in seen:
+                    result["samples"].append({"year": year, "value": value})
+                    room -= 1
+
+
+def main():
+    """Run the foreign key engine and print a summary"""
+    parser = argparse.ArgumentParser(description="Check Luminosity foreign keys across the decade")
+    parser.add_argument(
+        "--data-dir", default="../data/decade", help="Directory containing decade data"
+    )
+    parser.add_argument("--schema", default=SCHEMA_FILE, help="Mermaid ER schema file")
+    parser.add_argument(
+        "--chunk-size", type=int, default=None, help="Stream child tables in chunks of this size"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    engine = ForeignKeyEngine(args.data_dir, args.schema, chunk_size=args.chunk_size)
+    results = engine.check()
+
+    violations = 0
+    for result in results:
+        status = "✅" if result["missing_same_year"] == 0 else "❌"
+        violations += result["missing_same_year"] > 0
+        print(
+            f"{status} {result['foreign_key']}: {result['rows_checked']:,} rows, "
+            f"{result['missing_same_year']:,} missing in year "
+            f"({result['cross_year']:,} cross-year, {result['dangling']:,} dangling)"
+        )
+        if result["samples"]:
+            print(f"     samples: {result['samples']}")
+
+    print(f"\n{len(results)} foreign keys checked, {violations} with violations")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Typed schema registry for the Luminosity decade dataset
+
+luminosity_schema.mmd is parsed once per process (again only if the file changes)
+into one ColumnSpec per column, and every tool loads its tables with the dtypes
+registered here instead of letting the CSV parser guess them. Compact types:
+- integer keys (*_id) -> int32, other integers -> int64
+- text -> string; text marked "enum" in the schema -> dictionary (pandas categorical)
+- date -> date32, which becomes datetime64 in pandas; kept as text when dates
+  are not parsed
+- time -> string, boolean -> bool
+- numeric is inferred (int64 or float64), so whole amounts are written back
+  unchanged
+Without compaction every integer is int64 and enums and dates stay text.
+
+Usage:
+    python schema_registry.py
+    python schema_registry.py --table attendance
+"""
+
+import argparse
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+
+SCHEMA_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "luminosity_schema.mmd"
+)
+
+_TABLE_START = re.compile(r"^\s*(\w+)\s*\{\s*$")
+_COLUMN = re.compile(r'^\s*(\w+)\s+(\w+)(?:\s+(PK|FK))?(?:\s+"([^"]*)")?\s*$')
+_RELATIONSHIP = re.compile(r"^\s*(\w+)\s+\S+\s+(\w+)\s*:")
+
+ENUM = "enum"
+
+PLAIN_TYPES = {
+    "integer": pa.int64(),
+    "text": pa.string(),
+    "date": pa.string(),
+    "time": pa.string(),
+    "boolean": pa.bool_(),
+}
+
+COMPACT_TYPES = {**PLAIN_TYPES, "date": pa.date32()}
+
+
+def parse_schema(schema_path: str = SCHEMA_FILE) -> Dict:
+    """Tables (columns, types, PK/FK markers, comments) and relationships of a Mermaid ER diagram"""
+    tables = {}
+    relationships = []
+    current = None
+
+    with open(schema_path, "r") as f:
+        for line in f:
+            line = line.split("%%")[0].rstrip()
+            if current is None:
+                start = _TABLE_START.match(line)
+                if start:
+                    current = tables.setdefault(
+                        start.group(1), {"columns": {}, "pk": [], "fk": [], "comments": {}}
+                    )
+                    continue
+                relationship = _RELATIONSHIP.match(line)
+                if relationship:
+                    relationships.append((relationship.group(1), relationship.group(2)))
+            elif line.strip() == "}":
+                current = None
+            else:
+                column = _COLUMN.match(line)
+                if column:
+                    column_type, name, key, comment = column.groups()
+                    current["columns"][name] = column_type
+                    if comment:
+                        current["comments"][name] = comment
+                    if key == "PK":
+                        current["pk"].append(name)
+                    elif key == "FK":
+                        current["fk"].append(name)
+
+    return {"tables": tables, "relationships": relationships}
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    type: str
+    key: Optional[str] = None  # "PK" or "FK"
+    enum: bool = False
+
+    @property
+    def is_id(self) -> bool:
+        return self.type == "integer" and (self.key is not None or self.name.endswith("_id"))
+
+    def arrow_type(self, compact: bool = True, parse_dates: bool = True) -> Optional[pa.DataType]:
+        """Arrow type to parse the column with; None leaves it to inference"""
+        if not compact:
+            return PLAIN_TYPES.get(self.type)
+        if self.is_id:
+            return pa.int32()
+        if self.enum:
+            return pa.dictionary(pa.int32(), pa.string())
+        if self.type == "date" and not parse_dates:
+            return pa.string()
+        return COMPACT_TYPES.get(self.type)
+
+
+class SchemaRegistry:
+    """Column specs of every table in the schema"""
+
+    def __init__(self, schema_path: str = SCHEMA_FILE):
+        self.schema_path = schema_path
+        with open(schema_path, "rb") as f:
+            self.fingerprint = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        self.tables: Dict[str, Dict[str, ColumnSpec]] = {}
+        for table, spec in parse_schema(schema_path)["tables"].items():
+            self.tables[table] = {
+                column: ColumnSpec(
+                    column,
+                    column_type,
+                    "PK" if column in spec["pk"] else "FK" if column in spec["fk"] else None,
+                    spec["comments"].get(column) == ENUM,
+                )
+                for column, column_type in spec["columns"].items()
+            }
+
+    def columns(self, table: Optional[str]) -> Dict[str, ColumnSpec]:
+        """Specs of a table's columns (empty for tables outside the schema)"""
+        return self.tables.get(table, {})
+
+    def arrow_types(
+        self, table: Optional[str], compact: bool = True, parse_dates: bool = True
+    ) -> Dict[str, pa.DataType]:
+        """Explicit Arrow types of a table's columns; columns left out are inferred"""
+        types = {
+            column: spec.arrow_type(compact, parse_dates)
+            for column, spec in self.columns(table).items()
+        }
+        return {column: arrow_type for column, arrow_type in types.items() if arrow_type is not None}
+
+    def date_columns(self, table: Optional[str]) -> List[str]:
+        return [column for column, spec in self.columns(table).items() if spec.type == "date"]
+
+    def enum_columns(self, table: Optional[str]) -> List[str]:
+        return [column for column, spec in self.columns(table).items() if spec.enum]
+
+
+@lru_cache(maxsize=None)
+def _registry(schema_path: str, modified: float) -> SchemaRegistry:
+    return SchemaRegistry(schema_path)
+
+
+def get_registry(schema_path: str = SCHEMA_FILE) -> SchemaRegistry:
+    """The process-wide registry of a schema file, rebuilt when the file changes"""
+    return _registry(os.path.abspath(schema_path), os.path.getmtime(schema_path))
+
+
+def main():
+    """Print the registered column types"""
+    parser = argparse.ArgumentParser(description="Show the Luminosity schema registry")
+    parser.add_argument("--schema", default=SCHEMA_FILE, help="Mermaid ER schema file")
+    parser.add_argument("--table", help="Only show this table")
+    parser.add_argument("--plain", action="store_true", help="Show the uncompacted types")
+    args = parser.parse_args()
+
+    registry = get_registry(args.schema)
+    for table in [args.table] if args.table else sorted(registry.tables):
+        print(f"{table}:")
+        types = registry.arrow_types(table, compact=not args.plain)
+        for column, spec in registry.columns(table).items():
+            print(f"    {column:<28} {spec.type:<8} -> {types.get(column, 'inferred')}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
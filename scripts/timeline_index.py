@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Longitudinal timeline index for students and teachers across school years
+
+The yearly rosters are concatenated into one (id, year, ...) frame and sorted once
+by id then year. Every longitudinal question is then answered with shifted-array
+operations on that order instead of per-person Python lists:
+- transitions(): each person's consecutive records side by side (year gap,
+  grade delta)
+- progression_issues(): grade changes other than +1 that are not graduations
+- gaps() and graduations()
+- ages(): age at the start of each school year (September 1st)
+- tenure(): number of years each person appears
+- history(id): one person's records, found with a binary search
+
+Usage:
+    python timeline_index.py --data-dir ../data/decade --student 43
+    python timeline_index.py --data-dir ../data/decade --teacher 7
+"""
+
+import argparse
+import logging
+import os
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csv_ingest import load_table
+
+logger = logging.getLogger(__name__)
+
+FINAL_GRADE = 13  # 12th grade; leaving after it is a graduation
+
+
+class TimelineIndex:
+    """(id, year)-sorted index over yearly rosters of one kind of person"""
+
+    def __init__(self, frame: pd.DataFrame, key: str):
+        order = np.lexsort((frame["year"].to_numpy(), frame[key].to_numpy()))
+        self.key = key
+        # Rows keep their original labels, so per-row results align with the input
+        self.frame = frame.iloc[order]
+        self.ids = self.frame[key].to_numpy()
+        self.years = self.frame["year"].to_numpy()
+
+        # Row i and row i + 1 belong to the same person; an empty index has no runs
+        self._continues = self.ids[1:] == self.ids[:-1]
+        self._starts = np.flatnonzero(np.r_[True, ~self._continues])[: len(self.ids)]
+        self._ends = np.flatnonzero(np.r_[~self._continues, True])[: len(self.ids)]
+
+    @classmethod
+    def from_rosters(
+        cls, rosters: Iterable[Tuple[int, pd.DataFrame]], key: str
+    ) -> "TimelineIndex":
+        """Build from (year, roster) pairs"""
+        frames = [roster.assign(year=year) for year, roster in rosters]
+        if not frames:
+            return cls(pd.DataFrame({key: [], "year": []}, dtype=np.int64), key)
+        return cls(pd.concat(frames, ignore_index=True), key)
+
+    @classmethod
+    def from_decade(
+        cls,
+        data_dir: str,
+        table: str = "students",
+        key: str = "student_id",
+        columns: Optional[List[str]] = None,
+    ) -> "TimelineIndex":
+        """Build from a table present in every year folder of a decade directory"""
+        rosters = []
+        for item in sorted(os.listdir(data_dir)):
+            path = os.path.join(data_dir, item, f"{table}.csv")
+            if "-" in item and os.path.exists(path):
+                usecols = None if columns is None else [key] + list(columns)
+                rosters.append((int(item.split("-")[0]), load_table(path, table, usecols)))
+        return cls.from_rosters(rosters, key)
+
+    def __len__(self) -> int:
+        """Number of distinct people"""
+        return len(self._starts)
+
+    @property
+    def records(self) -> int:
+        """Number of (person, year) records"""
+        return len(self.frame)
+
+    def tenure(self) -> pd.Series:
+        """Years on the roster, per person"""
+        return pd.Series(
+            self._ends - self._starts + 1, index=self.ids[self._starts], name="years"
+        )
+
+    def tracked(self) -> int:
+        """People present in more than one year"""
+        return int((self._ends > self._starts).sum())
+
+    def transitions(self, column: Optional[str] = "grade_level_id") -> pd.DataFrame:
+        """Consecutive records of the same person, one row per adjacent pair.
+
+        With a column, its from_/to_ values and delta are added (NaN if the
+        rosters do not have it), so even an empty result keeps that schema.
+        """
+        pairs = np.flatnonzero(self._continues)
+        transitions = pd.DataFrame(
+            {
+                self.key: self.ids[pairs],
+                "from_year": self.years[pairs],
+                "to_year": self.years[pairs + 1],
+            }
+        )
+        transitions["year_gap"] = transitions["to_year"] - transitions["from_year"]
+        if column is not None:
+            if column in self.frame.columns:
+                values = self.frame[column].to_numpy()
+            else:
+                values = np.full(len(self.frame), np.nan)
+            transitions[f"from_{column}"] = values[pairs]
+            transitions[f"to_{column}"] = values[pairs + 1]
+            transitions["delta"] = values[pairs + 1] - values[pairs]
+        return transitions
+
+    def progression_issues(self, final_grade: int = FINAL_GRADE) -> pd.DataFrame:
+        """Transitions that are not a one-grade advance (leaving the final grade excepted)"""
+        transitions = self.transitions("grade_level_id")
+        irregular = (transitions["delta"] != 1) & (
+            transitions["from_grade_level_id"] != final_grade
+        )
+        return transitions[irregular].reset_index(drop=True)
+
+    def gaps(self) -> pd.DataFrame:
+        """Transitions that skip at least one school year"""
+        transitions = self.transitions(None)
+        return transitions[transitions["year_gap"] > 1].reset_index(drop=True)
+
+    def graduations(self, final_grade: int = FINAL_GRADE) -> pd.DataFrame:
+        """People whose last record is in the final grade, before the last indexed year"""
+        last = self.frame.iloc[self._ends]
+        if last.empty:
+            return last[[self.key, "year"]].reset_index(drop=True)
+        graduated = (last["grade_level_id"] == final_grade) & (last["year"] < self.years.max())
+        return last.loc[graduated, [self.key, "year"]].reset_index(drop=True)
+
+    def ages(self, month: int = 9, day: int = 1) -> pd.Series:
+        """Age in years at the start (September 1st) of each record's school year"""
+        starts = pd.to_datetime(
+            pd.DataFrame({"year": self.years, "month": month, "day": day})
+        )
+        births = pd.to_datetime(self.frame["date_of_birth"]).to_numpy()
+        return pd.Series(
+            (starts.to_numpy() - births) / np.timedelta64(1, "D") / 365.25,
+            index=self.frame.index,
+            name="age",
+        )
+
+    def history(self, entity_id) -> pd.DataFrame:
+        """One person's records, in year order"""
+        position = np.searchsorted(self.ids[self._starts], entity_id)
+        if position == len(self._starts) or self.ids[self._starts[position]] != entity_id:
+            return self.frame.iloc[0:0]
+        return self.frame.iloc[self._starts[position] : self._ends[position] + 1]
+
+
+def main():
+    """Print one student's or teacher's history across the decade"""
+    parser = argparse.ArgumentParser(description="Query the Luminosity timeline index")
+    parser.add_argument(
+        "--data-dir", default="../data/decade", help="Directory containing decade data"
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--student", type=int, help="Student id to show")
+    group.add_argument("--teacher", type=int, help="Teacher id to show")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    if args.student is not None:
+        index = TimelineIndex.from_decade(args.data_dir, "students", "student_id")
+        entity_id = args.student
+    else:
+        index = TimelineIndex.from_decade(args.data_dir, "teachers", "teacher_id")
+        entity_id = args.teacher
+
+    history = index.history(entity_id)
+    if history.empty:
+        logger.error(f"❌ {index.key} {entity_id} not found")
+        return 1
+
+    print(history.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -23,6 +23,8 @@ import pandas as pd
 from dotenv import load_dotenv
 from supabase import Client, create_client
 
+from csv_ingest import load_table
+
 # Load environment variables
 load_dotenv()
 
@@ -163,10 +165,20 @@ class LuminositySupabaseUploader:
             if "payment_date" in df_clean.columns:
                 date_columns.append("payment_date")
 
+        # Any other date column the loader parsed goes out as text as well
+        date_columns += [
+            col
+            for col in df_clean.columns
+            if pd.api.types.is_datetime64_any_dtype(df_clean[col]) and col not in date_columns
+        ]
+
         for col in date_columns:
             if col in df_clean.columns:
-                # Ensure date format is YYYY-MM-DD
-                df_clean[col] = pd.to_datetime(df_clean[col]).dt.strftime("%Y-%m-%d")
+                # Ensure date format is YYYY-MM-DD (the loader already parsed
+                # schema date columns)
+                if not pd.api.types.is_datetime64_any_dtype(df_clean[col]):
+                    df_clean[col] = pd.to_datetime(df_clean[col])
+                df_clean[col] = df_clean[col].dt.strftime("%Y-%m-%d")
 
         # Remove any columns with leading/trailing spaces
         df_clean.columns = df_clean.columns.str.strip()
@@ -189,8 +201,8 @@ class LuminositySupabaseUploader:
         try:
             logger.info(f"📤 Uploading {table_name} from {csv_path}")
 
-            # Read CSV
-            df = pd.read_csv(csv_path)
+            # Read CSV with the schema's column types
+            df = load_table(csv_path, table_name)
             logger.info(f"   📊 Loaded {len(df)} records")
 
             if len(df) == 0:
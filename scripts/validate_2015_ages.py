@@ -8,10 +8,11 @@ and validates age-grade alignment for the 2015-2016 school year.
 """
 
 import logging
-from datetime import date, datetime
 
 import pandas as pd
 
+from timeline_index import TimelineIndex
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
@@ -28,11 +29,9 @@ def validate_ages_2015():
     logger.info(f"Loaded {len(students_df)} students")
 
     # Calculate ages relative to 2015-2016 school year (use Sept 1, 2015)
-    reference_date = date(2015, 9, 1)
+    timeline = TimelineIndex.from_rosters([(2015, students_df)], "student_id")
     students_df["date_of_birth"] = pd.to_datetime(students_df["date_of_birth"])
-    students_df["age_2015"] = (
-        pd.Timestamp(reference_date) - students_df["date_of_birth"]
-    ).dt.days / 365.25
+    students_df["age_2015"] = timeline.ages()
 
     # Expected age ranges by grade level for 2015-2016
     grade_age_expectations = {
@@ -51,38 +50,40 @@ def validate_ages_2015():
         13: (17, 18),  # 12th Grade
     }
 
-    # Validate age-grade alignment
-    mismatches = 0
-    grade_age_summary = {}
-
-    for grade_id in range(1, 14):
-        grade_students = students_df[students_df["grade_level_id"] == grade_id]
-        if len(grade_students) == 0:
-            continue
+    # Validate age-grade alignment, all grades at once
+    expectations = pd.DataFrame.from_dict(
+        grade_age_expectations, orient="index", columns=["min_expected", "max_expected"]
+    )
+    students_df = students_df.join(expectations, on="grade_level_id")
 
-        min_expected, max_expected = grade_age_expectations[grade_id]
-        actual_ages = grade_students["age_2015"]
-
-        # Allow 1-year buffer on each side (kids can be held back or skip)
-        valid_ages = actual_ages[
-            (actual_ages >= min_expected - 1) & (actual_ages <= max_expected + 1)
-        ]
-        invalid_count = len(grade_students) - len(valid_ages)
-
-        grade_label = grade_levels_df[grade_levels_df["grade_level_id"] == grade_id][
-            "label"
-        ].iloc[0]
-
-        grade_age_summary[grade_label] = {
-            "count": len(grade_students),
-            "mean_age": round(actual_ages.mean(), 1),
-            "min_age": round(actual_ages.min(), 1),
-            "max_age": round(actual_ages.max(), 1),
-            "expected_range": f"{min_expected}-{max_expected}",
-            "invalid_count": invalid_count,
+    # Allow 1-year buffer on each side (kids can be held back or skip)
+    students_df["invalid"] = ~(
+        (students_df["age_2015"] >= students_df["min_expected"] - 1)
+        & (students_df["age_2015"] <= students_df["max_expected"] + 1)
+    )
+    known = students_df[students_df["grade_level_id"].isin(expectations.index)]
+    by_grade = known.groupby("grade_level_id").agg(
+        count=("age_2015", "size"),
+        mean_age=("age_2015", "mean"),
+        min_age=("age_2015", "min"),
+        max_age=("age_2015", "max"),
+        min_expected=("min_expected", "first"),
+        max_expected=("max_expected", "first"),
+        invalid_count=("invalid", "sum"),
+    )
+    labels = grade_levels_df.set_index("grade_level_id")["label"]
+
+    grade_age_summary = {
+        labels.get(grade_id, f"Grade {grade_id}"): {
+            "count": int(row["count"]),
+            "mean_age": round(row["mean_age"], 1),
+            "min_age": round(row["min_age"], 1),
+            "max_age": round(row["max_age"], 1),
+            "expected_range": f"{int(row['min_expected'])}-{int(row['max_expected'])}",
+            "invalid_count": int(row["invalid_count"]),
         }
-
-        mismatches += invalid_count
+        for grade_id, row in by_grade.iterrows()
+    }
 
     # Print results
     logger.info("\n" + "=" * 60)
@@ -119,11 +120,10 @@ def validate_ages_2015():
     logger.info(f"\nSample birth dates for verification:")
     for grade_id in [1, 7, 13]:  # K, 6th, 12th grade samples
         grade_students = students_df[students_df["grade_level_id"] == grade_id].head(3)
-        grade_label = grade_levels_df[grade_levels_df["grade_level_id"] == grade_id][
-            "label"
-        ].iloc[0]
+        if grade_students.empty:
+            continue
 
-        print(f"\n{grade_label} samples:")
+        print(f"\n{labels.get(grade_id, f'Grade {grade_id}')} samples:")
         for _, student in grade_students.iterrows():
             birth_date = student["date_of_birth"].strftime("%Y-%m-%d")
             age_2015 = student["age_2015"]
@@ -12,19 +12,43 @@ This script validates the generated 10-year dataset to ensure:
 
 Usage:
     python validate_decade_data.py --data-dir ../data/decade
+    python validate_decade_data.py --data-dir ../data/decade --workers 4
+    python validate_decade_data.py --data-dir ../data/decade --no-cache
+    python validate_decade_data.py --data-dir ../data/decade --streaming --chunk-size 100000
+    python validate_decade_data.py --data-dir ../data/decade --sample --sample-size 20000
+    python validate_decade_data.py --data-dir ../data/decade --budget 1.0 --save-report report.json
 """
 
 import argparse
+import hashlib
+import io
 import json
 import logging
 import os
+import pickle
+import sys
+import time
+import tracemalloc
 import warnings
-from collections import defaultdict
+import zlib
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime
 
 import numpy as np
 import pandas as pd
 
+from csv_ingest import load_table, load_table_chunks, use_jemalloc
+from referential_integrity import ForeignKeyEngine
+from timeline_index import TimelineIndex
+from validation_rules import BUSINESS_RULES
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
 warnings.filterwarnings("ignore")
 
 # Configure logging
@@ -34,13 +58,259 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Row-per-event tables that grow with enrollment; streamed in chunks when requested
+STREAMED_TABLES = ("grades", "attendance", "enrollments")
+
+
+def _new_cost():
+    return {"seconds": 0.0, "rows": 0, "bytes": 0, "memory_mb": 0.0, "runs": 0}
+
+
+def _max_rss_mb():
+    # ru_maxrss is in kilobytes, except on macOS where it is in bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def memory_metric(trace_memory):
+    """What the memory_mb of measure() means: tracemalloc is the fallback where
+    the resource module is missing (Windows)"""
+    return "traced_peak" if trace_memory or resource is None else "rss_high_water_increase"
+
+
+@contextmanager
+def measure(cost, source=None, trace_memory=False):
+    """Add wall time, rows and bytes read from `source`, and memory to cost
+
+    memory_mb is by default the RSS high-water increase: how far the block raised
+    the process's peak RSS. It is free to read, but shows 0 whenever an earlier
+    block already peaked higher, which is most blocks after the first large one.
+    With trace_memory (and wherever the resource module is missing) it is the
+    block's own peak allocation on top of what was already live, as seen by
+    tracemalloc (which also tracks numpy and pandas buffers); that is exact but
+    roughly doubles run time.
+    """
+    trace_memory = memory_metric(trace_memory) == "traced_peak"
+    rows, size = (source.rows_read, source.bytes_read) if source is not None else (0, 0)
+    if trace_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    else:
+        baseline = _max_rss_mb()
+    start = time.perf_counter()
+    try:
+        yield cost
+    finally:
+        cost["seconds"] += time.perf_counter() - start
+        cost["runs"] += 1
+        if trace_memory:
+            peak = (tracemalloc.get_traced_memory()[1] - baseline) / 2**20
+        else:
+            peak = _max_rss_mb() - baseline
+        cost["memory_mb"] = max(cost["memory_mb"], peak)
+        if source is not None:
+            cost["rows"] += source.rows_read - rows
+            cost["bytes"] += source.bytes_read - size
+
+
+class YearTables(Mapping):
+    """A year's CSV tables, read from disk on first access
+
+    Membership and iteration only look at the file listing, so a collector loads
+    just the tables it actually touches. With a chunk_size, chunks() streams the
+    STREAMED_TABLES instead of loading them whole. With sampling set to
+    (sample_size, seed), statistical rules read sample() instead of full scans.
+    rows_read and bytes_read count what has been read from disk so far. Tables
+    are loaded with their registered schema dtypes (csv_ingest.load_table).
+    """
+
+    def __init__(self, year_dir, chunk_size=None, sampling=None):
+        self.year_dir = year_dir
+        self.chunk_size = chunk_size
+        self.sampling = sampling
+        self.names = sorted(f[: -len(".csv")] for f in os.listdir(year_dir) if f.endswith(".csv"))
+        self._tables = {}
+        self.rows_read = 0
+        self.bytes_read = 0
+
+    def _path(self, table_name):
+        return os.path.join(self.year_dir, f"{table_name}.csv")
+
+    def _streams(self, table_name):
+        return bool(self.chunk_size) and table_name in STREAMED_TABLES
+
+    def columns(self, table_name):
+        """Column names, read from the header alone unless the table is already loaded"""
+        if table_name in self._tables:
+            return list(self._tables[table_name].columns)
+        if table_name not in self.names:
+            raise KeyError(table_name)
+        return list(pd.read_csv(os.path.join(self.year_dir, f"{table_name}.csv"), nrows=0).columns)
+
+    def chunks(self, table_name, columns=None):
+        """Yield the table in chunks when streamed, else the whole table once"""
+        if self._streams(table_name):
+            self.bytes_read += os.path.getsize(self._path(table_name))
+            for chunk in load_table_chunks(
+                self._path(table_name), table_name, self.chunk_size, columns
+            ):
+                self.rows_read += len(chunk)
+                yield chunk
+        else:
+            yield self[table_name] if columns is None else self[table_name][columns]
+
+    def sample(self, table_name, columns=None, size=20000, seed=42, strata=20):
+        """Seeded stratified row sample and the table's total row count
+
+        The data rows are split into `strata` contiguous blocks and each block
+        contributes its proportional share of the sample, so the sample spans the
+        whole school year (tables are written in class and date order). A table
+        already loaded by the exact rules is sampled in memory; otherwise only the
+        sampled lines are parsed, assuming one record per line. Both pick the same
+        rows.
+        """
+        if table_name in self._tables:
+            frame = self._tables[table_name]
+            picks = self._sample_rows(table_name, len(frame), size, seed, strata)
+            frame = frame if columns is None else frame[columns]
+            return (frame if picks is None else frame.iloc[picks]), len(frame)
+
+        path = os.path.join(self.year_dir, f"{table_name}.csv")
+        with open(path, "rb") as f:
+            raw = f.read()
+        self.bytes_read += len(raw)
+        if raw[-1:] != b"\n":
+            raw += b"\n"
+
+        buffer = np.frombuffer(raw, dtype=np.uint8)
+        ends = np.flatnonzero(buffer == ord("\n"))
+        starts = ends[:-1] + 1
+        total = len(starts)
+        picks = self._sample_rows(table_name, total, size, seed, strata)
+        if picks is None:
+            self.rows_read += total
+            return load_table(path, table_name, columns), total
+
+        # Gather the picked lines (newline included) with one fancy-indexing pass
+        lengths = ends[1:][picks] - starts[picks] + 1
+        offsets = np.repeat(starts[picks] - (np.cumsum(lengths) - lengths), lengths)
+        lines = buffer[np.arange(int(lengths.sum())) + offsets].tobytes()
+        self.rows_read += len(picks)
+        return load_table(io.BytesIO(raw[: ends[0] + 1] + lines), table_name, columns), total
+
+    def _sample_rows(self, table_name, total, size, seed, strata):
+        """Sorted positions of the sampled rows, or None when the sample is every row"""
+        if size >= total:
+            return None
+
+        # Same seed, year and table always give the same rows
+        rng = np.random.default_rng(
+            [seed, zlib.crc32(f"{os.path.basename(self.year_dir)}/{table_name}".encode())]
+        )
+        bounds = np.linspace(0, total, strata + 1).astype(np.int64)
+        quotas = np.diff(np.round(np.linspace(0, size, strata + 1)).astype(np.int64))
+        return np.sort(
+            np.concatenate(
+                [
+                    low + rng.choice(high - low, size=min(quota, high - low), replace=False)
+                    for low, high, quota in zip(bounds[:-1], bounds[1:], quotas)
+                    if high > low
+                ]
+            )
+        )
+
+    def __getitem__(self, table_name):
+        if table_name not in self.names:
+            raise KeyError(table_name)
+        if table_name not in self._tables:
+            try:
+                self._tables[table_name] = load_table(self._path(table_name), table_name)
+                self.rows_read += len(self._tables[table_name])
+                self.bytes_read += os.path.getsize(self._path(table_name))
+            except Exception as e:
+                logger.warning(f"Could not load {table_name}.csv: {e}")
+                raise
+        return self._tables[table_name]
+
+    def __contains__(self, table_name):
+        return table_name in self.names
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _summarize_year(args):
+    """Process-pool entry point: load one year and summarize it"""
+    data_dir, year, checks, chunk_size, sampling, trace_memory = args
+    costs = {}
+    summaries = LuminosityDataValidator.summarize_year(
+        data_dir, year, checks, chunk_size, sampling, costs, trace_memory
+    )
+    return year, summaries, costs
+
+
 class LuminosityDataValidator:
     """Comprehensive validator for Luminosity decade data"""
 
-    def __init__(self, data_directory):
+    # Bump whenever a per-year collector changes, to invalidate cached summaries
+    VALIDATOR_VERSION = "8"
+
+    # Marks a check that depends on which CSVs exist rather than on their contents
+    FILE_LISTING = "*"
+
+    # Per-year collectors, run next to the year's data (in a worker process), and the
+    # tables each one reads. Each returns a small picklable summary that the
+    # _validate_* checks merge across years; summaries are cached by the content
+    # fingerprints of the declared tables.
+    YEAR_CHECKS = {
+        "file_structure": ("_year_tables", (FILE_LISTING,)),
+        "rules": ("_year_rules", BUSINESS_RULES.tables),
+        "enrollment": ("_year_enrollment", ("students",)),
+        "teacher_ratio": ("_year_teacher_ratio", ("teachers", "students")),
+        "financial": ("_year_financial", ("payments",)),
+        "student_roster": ("_year_student_roster", ("students",)),
+        "teacher_roster": ("_year_teacher_roster", ("teachers",)),
+        "subjects": ("_year_subjects", ("subjects",)),
+        "demographics": ("_year_demographics", ("students",)),
+        "academic_performance": ("_year_academic_performance", ("grades", "assignments")),
+        "operational": (
+            "_year_operational",
+            ("classes", "teachers", "enrollments", "assignments"),
+        ),
+    }
+
+    def __init__(
+        self,
+        data_directory,
+        workers=None,
+        cache_file=None,
+        use_cache=True,
+        chunk_size=None,
+        sample_size=None,
+        sample_seed=42,
+        budget=None,
+        trace_memory=False,
+    ):
         self.data_dir = data_directory
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.sampling = (sample_size, sample_seed) if sample_size else None
+        self.cache_file = cache_file or os.path.join(data_directory, ".validation_cache.pkl")
+        self.use_cache = use_cache
         self.years = []
-        self.yearly_data = {}
+        self.year_summaries = {}
+        self.fingerprints = {}
+        self.student_timeline = None
+        self.costs = {}
+        self.budget = budget
+        self.trace_memory = trace_memory
+        self.teacher_timeline = None
+        self.cache = {}
         self.validation_results = {
             "passed": [],
             "failed": [],
@@ -49,7 +319,11 @@ class LuminosityDataValidator:
         }
 
     def load_decade_data(self):
-        """Load all year data into memory"""
+        """Find the year directories and summarize each year in a process pool
+
+        Summaries whose input files are unchanged since the last run are taken
+        from the cache; only the remaining checks are executed.
+        """
         logger.info("Loading decade data...")
 
         # Find all year directories
@@ -61,27 +335,152 @@ class LuminosityDataValidator:
         self.years.sort()
         logger.info(f"Found {len(self.years)} years: {self.years}")
 
-        # Load data for each year
+        cache = self.cache = self._load_cache()
+        file_hashes = cache.setdefault("files", {})
+        summaries = cache.setdefault("summaries", {})
+
+        # Reuse every summary whose inputs still hash the same
+        tasks = []
+        input_keys = {}
+        with measure(self.costs.setdefault(("load", "fingerprints"), _new_cost()), None, self.trace_memory):
+            for year in self.years:
+                self.fingerprints[year] = self._year_fingerprints(year, file_hashes)
+
         for year in self.years:
-            year_dir = os.path.join(self.data_dir, f"{year}-{year+1}")
-            self.yearly_data[year] = self._load_year_data(year_dir)
+            self.year_summaries[year] = {}
+            fingerprints = self.fingerprints[year]
+            pending = []
+            for check, (_, tables) in self.YEAR_CHECKS.items():
+                input_keys[year, check] = self._input_key(check, tables, fingerprints)
+                cached = summaries.get((year, check))
+                if cached is not None and cached[0] == input_keys[year, check]:
+                    self.year_summaries[year][check] = cached[1]
+                else:
+                    pending.append(check)
+            if pending:
+                tasks.append(
+                    (
+                        self.data_dir,
+                        year,
+                        tuple(pending),
+                        self.chunk_size,
+                        self.sampling,
+                        self.trace_memory,
+                    )
+                )
 
-        logger.info("All data loaded successfully")
+        # Each worker loads only its own year; only the summaries come back
+        workers = max(1, min(self.workers, len(tasks)))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_summarize_year, tasks))
+        else:
+            results = list(map(_summarize_year, tasks))
+
+        for year, year_results, year_costs in results:
+            for check, summary in year_results.items():
+                self.year_summaries[year][check] = summary
+                summaries[year, check] = (input_keys[year, check], summary)
+            for check, cost in year_costs.items():
+                self._merge_cost(("collect", check), cost)
+        for check in self.YEAR_CHECKS:
+            self.costs.setdefault(("collect", check), _new_cost())
+
+        executed = sum(len(task[2]) for task in tasks)
+        total = len(self.years) * len(self.YEAR_CHECKS)
+        self._save_cache(cache)
+        logger.info(
+            f"All data loaded successfully ({executed}/{total} year checks run, "
+            f"{total - executed} cached, {workers} worker(s))"
+        )
 
-    def _load_year_data(self, year_dir):
-        """Load all CSV files for a specific year"""
-        year_data = {}
+    @classmethod
+    def summarize_year(
+        cls,
+        data_dir,
+        year,
+        checks=None,
+        chunk_size=None,
+        sampling=None,
+        costs=None,
+        trace_memory=False,
+    ):
+        """Run the given per-year collectors (default: all) on one year's tables
+
+        With a chunk_size, large tables are streamed and only running aggregates
+        and value histograms are kept, so memory stays bounded regardless of table size.
+        If a costs dict is given, each collector's cost is recorded in it. Tables
+        are loaded once per year, so rows and bytes count against the collector
+        that first needed them.
+        """
+        year_data = YearTables(os.path.join(data_dir, f"{year}-{year+1}"), chunk_size, sampling)
+        costs = {} if costs is None else costs
+        summaries = {}
+        for check in checks or cls.YEAR_CHECKS:
+            with measure(costs.setdefault(check, _new_cost()), year_data, trace_memory):
+                summaries[check] = getattr(cls, cls.YEAR_CHECKS[check][0])(year, year_data)
+        return summaries
+
+    def _year_fingerprints(self, year, file_hashes):
+        """Content fingerprint of every CSV in a year, plus the file listing"""
+        year_dir = os.path.join(self.data_dir, f"{year}-{year+1}")
+        names = sorted(f[: -len(".csv")] for f in os.listdir(year_dir) if f.endswith(".csv"))
+        fingerprints = {
+            name: self._file_fingerprint(os.path.join(year_dir, f"{name}.csv"), file_hashes)
+            for name in names
+        }
+        fingerprints[self.FILE_LISTING] = ",".join(names)
+        return fingerprints
+
+    @staticmethod
+    def _file_fingerprint(path, file_hashes):
+        """blake2b of the file contents, rehashed only when size or mtime changed"""
+        stat = os.stat(path)
+        known = file_hashes.get(path)
+        if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return known[2]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        file_hashes[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+        return file_hashes[path][2]
+
+    def _input_key(self, check, tables, fingerprints):
+        """Cache key of one year check: validator version, sampling and its inputs' fingerprints"""
+        return (self.VALIDATOR_VERSION, check, self.sampling) + tuple(
+            (table, fingerprints.get(table)) for table in tables
+        )
 
-        csv_files = [f for f in os.listdir(year_dir) if f.endswith(".csv")]
-        for csv_file in csv_files:
-            table_name = csv_file.replace(".csv", "")
-            filepath = os.path.join(year_dir, csv_file)
-            try:
-                year_data[table_name] = pd.read_csv(filepath)
-            except Exception as e:
-                logger.warning(f"Could not load {csv_file}: {e}")
+    def _load_cache(self):
+        if not self.use_cache or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable validation cache: {e}")
+            return {}
+
+    def _save_cache(self, cache):
+        """Write the cache atomically, dropping years that no longer exist"""
+        if not self.use_cache:
+            return
+        cache["summaries"] = {
+            key: value for key, value in cache["summaries"].items() if key[0] in self.years
+        }
+        temp_file = f"{self.cache_file}.tmp"
+        with open(temp_file, "wb") as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self.cache_file)
 
-        return year_data
+    def _summaries(self, check):
+        """(year, summary) of one per-year collector, for years where it produced one"""
+        for year in self.years:
+            summary = self.year_summaries[year][check]
+            if summary is not None:
+                yield year, summary
 
     def validate_all(self):
         """Run all validation checks"""
@@ -89,32 +488,63 @@ class LuminosityDataValidator:
         logger.info("=" * 60)
 
         # Core data integrity
-        self._validate_file_structure()
-        self._validate_referential_integrity()
-        self._validate_data_types()
+        self._run_check(self._validate_file_structure)
+        self._run_check(self._validate_referential_integrity)
+        self._run_check(self._validate_data_types)
 
         # Business rule compliance
-        self._validate_enrollment_progression()
-        self._validate_attendance_policies()
-        self._validate_grade_distributions()
-        self._validate_teacher_assignments()
-        self._validate_financial_data()
+        self._run_check(self._validate_enrollment_progression)
+        self._run_check(self._validate_attendance_policies)
+        self._run_check(self._validate_grade_distributions)
+        self._run_check(self._validate_teacher_assignments)
+        self._run_check(self._validate_financial_data)
 
         # Longitudinal consistency
-        self._validate_student_progression()
-        self._validate_teacher_continuity()
-        self._validate_curriculum_evolution()
+        self._run_check(self._validate_student_progression)
+        self._run_check(self._validate_teacher_continuity)
+        self._run_check(self._validate_curriculum_evolution)
 
         # Statistical realism
-        self._validate_demographic_distributions()
-        self._validate_academic_performance()
-        self._validate_operational_metrics()
+        self._run_check(self._validate_demographic_distributions)
+        self._run_check(self._validate_academic_performance)
+        self._run_check(self._validate_operational_metrics)
 
         # Generate summary report
         self._generate_validation_report()
 
         return self.validation_results
 
+    def _run_check(self, check):
+        """Run one _validate_* step, recording its cost"""
+        cost = self.costs.setdefault(("validate", check.__name__[len("_validate_"):]), _new_cost())
+        with measure(cost, trace_memory=self.trace_memory):
+            check()
+
+    def _merge_cost(self, key, cost):
+        total = self.costs.setdefault(key, _new_cost())
+        for field in ("seconds", "rows", "bytes", "runs"):
+            total[field] += cost[field]
+        total["memory_mb"] = max(total["memory_mb"], cost["memory_mb"])
+
+    def cost_report(self):
+        """Per-stage costs, slowest first
+
+        "collect" rows are the per-year collectors (seconds summed over years, so
+        they exceed wall time when workers run in parallel; runs counts the years
+        not served from the cache); "validate" rows are the cross-year checks.
+        """
+        rows = [
+            {"stage": stage, "check": check, **cost}
+            for (stage, check), cost in self.costs.items()
+        ]
+        for row in rows:
+            row["over_budget"] = self.budget is not None and row["seconds"] > self.budget
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    @staticmethod
+    def _year_tables(year, data):
+        return sorted(data)
+
     def _validate_file_structure(self):
         """Ensure all required files exist for each year"""
         logger.info("Validating file structure...")
@@ -133,10 +563,9 @@ class LuminosityDataValidator:
         ]
 
         missing_files = []
-        for year in self.years:
-            year_data = self.yearly_data[year]
+        for year, tables in self._summaries("file_structure"):
             for table in required_tables:
-                if table not in year_data:
+                if table not in tables:
                     missing_files.append(f"{year}: {table}.csv")
 
         if missing_files:
@@ -148,122 +577,96 @@ class LuminosityDataValidator:
             )
 
     def _validate_referential_integrity(self):
-        """Check foreign key relationships"""
-        logger.info("Validating referential integrity...")
+        """Check every schema foreign key, within each year and across the decade
 
-        integrity_issues = []
-
-        for year in self.years:
-            data = self.yearly_data[year]
-
-            # Students -> Grade Levels
-            if "students" in data and "grade_levels" in data:
-                valid_grades = set(data["grade_levels"]["grade_level_id"])
-                student_grades = set(data["students"]["grade_level_id"])
-                invalid_grades = student_grades - valid_grades
-                if invalid_grades:
-                    integrity_issues.append(
-                        f"{year}: Invalid grade_level_ids in students: {invalid_grades}"
-                    )
-
-            # Enrollments -> Students and Classes
-            if "enrollments" in data and "students" in data and "classes" in data:
-                valid_students = set(data["students"]["student_id"])
-                valid_classes = set(data["classes"]["class_id"])
-
-                enrollment_students = set(data["enrollments"]["student_id"])
-                enrollment_classes = set(data["enrollments"]["class_id"])
-
-                invalid_students = enrollment_students - valid_students
-                invalid_classes = enrollment_classes - valid_classes
-
-                if invalid_students:
-                    integrity_issues.append(
-                        f"{year}: Invalid student_ids in enrollments: {len(invalid_students)} records"
-                    )
-                if invalid_classes:
-                    integrity_issues.append(
-                        f"{year}: Invalid class_ids in enrollments: {len(invalid_classes)} records"
-                    )
-
-            # Grades -> Students and Assignments
-            if "grades" in data and "students" in data and "assignments" in data:
-                valid_students = set(data["students"]["student_id"])
-                valid_assignments = set(data["assignments"]["assignment_id"])
-
-                grade_students = set(data["grades"]["student_id"])
-                grade_assignments = set(data["grades"]["assignment_id"])
+        The engine result is cached alongside the year summaries, keyed by the
+        fingerprints of every table a foreign key touches.
+        """
+        logger.info("Validating referential integrity...")
 
-                invalid_students = grade_students - valid_students
-                invalid_assignments = grade_assignments - valid_assignments
+        engine = ForeignKeyEngine(self.data_dir, chunk_size=self.chunk_size)
+        tables = sorted({fk.table for fk in engine.foreign_keys} | {fk.parent for fk in engine.foreign_keys})
+        input_key = (self.VALIDATOR_VERSION, "foreign_keys", tuple(map(str, engine.foreign_keys))) + tuple(
+            (year, table, self.fingerprints[year].get(table)) for year in self.years for table in tables
+        )
+        cached = self.cache.get("foreign_keys")
+        if cached is not None and cached[0] == input_key:
+            results = cached[1]
+        else:
+            results = engine.check()
+            cost = self.costs.setdefault(("validate", "referential_integrity"), _new_cost())
+            cost["rows"] += engine.rows_read
+            cost["bytes"] += engine.bytes_read
+            self.cache["foreign_keys"] = (input_key, results)
+            self._save_cache(self.cache)
 
-                if invalid_students:
-                    integrity_issues.append(
-                        f"{year}: Invalid student_ids in grades: {len(invalid_students)} records"
-                    )
-                if invalid_assignments:
-                    integrity_issues.append(
-                        f"{year}: Invalid assignment_ids in grades: {len(invalid_assignments)} records"
-                    )
+        self.validation_results["statistics"]["referential_integrity"] = results
+        violations = [result for result in results if result["missing_same_year"] > 0]
 
-        if integrity_issues:
+        if violations:
             self._add_failure(
-                "Referential Integrity", f"{len(integrity_issues)} issues found"
+                "Referential Integrity",
+                f"{len(violations)} of {len(results)} foreign keys violated",
             )
-            for issue in integrity_issues[:5]:  # Show first 5
-                logger.warning(f"  {issue}")
+            for result in violations[:5]:  # Show first 5
+                logger.warning(
+                    f"  {result['foreign_key']}: {result['missing_same_year']:,} rows missing in year "
+                    f"({result['cross_year']:,} cross-year, {result['dangling']:,} dangling), "
+                    f"e.g. {result['samples'][:3]}"
+                )
         else:
             self._add_success(
-                "Referential Integrity", "All foreign key relationships valid"
+                "Referential Integrity",
+                f"All {len(results)} foreign key relationships valid",
             )
 
+    @staticmethod
+    def _year_rules(year, data):
+        if data.sampling:
+            sample_size, seed = data.sampling
+            return BUSINESS_RULES.evaluate(data, sample_size=sample_size, seed=seed)
+        return BUSINESS_RULES.evaluate(data)
+
+    def _rule_results(self, category):
+        """Per-year results of the declarative business rules in one category"""
+        by_year = {}
+        for year, summary in self._summaries("rules"):
+            results = {
+                name: result
+                for name, result in summary["results"].items()
+                if result["category"] == category
+            }
+            if results:
+                by_year[year] = results
+        return by_year
+
+    @staticmethod
+    def _intervals(results, **stat_names):
+        """{stat}_ci entries for sampled rule results (none in exact mode)"""
+        return {
+            f"{stat_names.get(name, name)}_ci": result["interval"]
+            for name, result in results.items()
+            if "interval" in result
+        }
+
+    @staticmethod
+    def _interval_text(result, spec):
+        if "interval" not in result:
+            return ""
+        low, high = result["interval"]
+        return f" [{format(low, spec)}, {format(high, spec)}]"
+
     def _validate_data_types(self):
         """Validate data types and ranges"""
         logger.info("Validating data types and ranges...")
 
-        type_issues = []
-
-        for year in self.years:
-            data = self.yearly_data[year]
-
-            # Check grade scores (0-100 range)
-            if "grades" in data:
-                grades_df = data["grades"]
-                if "score" in grades_df.columns:
-                    invalid_scores = grades_df[
-                        (grades_df["score"] < 0) | (grades_df["score"] > 100)
-                    ]
-                    if len(invalid_scores) > 0:
-                        type_issues.append(
-                            f"{year}: {len(invalid_scores)} invalid grade scores (outside 0-100)"
-                        )
-
-            # Check attendance status values
-            if "attendance" in data:
-                attendance_df = data["attendance"]
-                if "status" in attendance_df.columns:
-                    valid_statuses = {
-                        "Present",
-                        "Absent",
-                        "Tardy",
-                        "Excused",
-                        "Dismissed",
-                    }
-                    invalid_statuses = set(attendance_df["status"]) - valid_statuses
-                    if invalid_statuses:
-                        type_issues.append(
-                            f"{year}: Invalid attendance statuses: {invalid_statuses}"
-                        )
-
-            # Check payment amounts (positive)
-            if "payments" in data:
-                payments_df = data["payments"]
-                if "amount_paid" in payments_df.columns:
-                    negative_payments = payments_df[payments_df["amount_paid"] <= 0]
-                    if len(negative_payments) > 0:
-                        type_issues.append(
-                            f"{year}: {len(negative_payments)} non-positive payment amounts"
-                        )
+        type_issues = [
+            f"{year}: {result['table']}.{result['column']} {result['rule']}: "
+            f"{result['violations']} violations (expected {result['expected']})"
+            for year, results in self._rule_results("Data Types").items()
+            for result in results.values()
+            if not result["passed"]
+        ]
 
         if type_issues:
             self._add_failure("Data Types", f"{len(type_issues)} data type issues")
@@ -272,14 +675,17 @@ class LuminosityDataValidator:
         else:
             self._add_success("Data Types", "All data types and ranges valid")
 
+    @staticmethod
+    def _year_enrollment(year, data):
+        if "students" in data:
+            return len(data["students"])
+        return None
+
     def _validate_enrollment_progression(self):
         """Validate student enrollment numbers follow expected patterns"""
         logger.info("Validating enrollment progression...")
 
-        enrollment_stats = {}
-        for year in self.years:
-            if "students" in self.yearly_data[year]:
-                enrollment_stats[year] = len(self.yearly_data[year]["students"])
+        enrollment_stats = dict(self._summaries("enrollment"))
 
         # Check for reasonable growth/decline patterns
         issues = []
@@ -314,42 +720,20 @@ class LuminosityDataValidator:
         logger.info("Validating attendance policies...")
 
         attendance_stats = {}
-
-        for year in self.years:
-            if "attendance" in self.yearly_data[year]:
-                attendance_df = self.yearly_data[year]["attendance"]
-
-                total_records = len(attendance_df)
-                if total_records > 0:
-                    absent_records = len(
-                        attendance_df[
-                            attendance_df["status"].isin(["Absent", "Excused"])
-                        ]
-                    )
-                    tardy_records = len(
-                        attendance_df[attendance_df["status"] == "Tardy"]
-                    )
-
-                    absent_rate = absent_records / total_records
-                    tardy_rate = tardy_records / total_records
-
-                    attendance_stats[year] = {
-                        "absent_rate": absent_rate,
-                        "tardy_rate": tardy_rate,
-                        "total_records": total_records,
-                    }
-
-        # Check if rates are within expected ranges (5% ± 2% for absences, 3% ± 2% for tardies)
         policy_violations = []
-        for year, stats in attendance_stats.items():
-            if not (0.03 <= stats["absent_rate"] <= 0.07):
-                policy_violations.append(
-                    f"{year}: Absence rate {stats['absent_rate']:.1%} (expected ~5%)"
-                )
-            if not (0.01 <= stats["tardy_rate"] <= 0.05):
-                policy_violations.append(
-                    f"{year}: Tardy rate {stats['tardy_rate']:.1%} (expected ~3%)"
-                )
+        for year, results in self._rule_results("Attendance Policies").items():
+            attendance_stats[year] = {
+                "absent_rate": results["absence_rate"]["value"],
+                "tardy_rate": results["tardy_rate"]["value"],
+                "total_records": results["absence_rate"]["rows"],
+            }
+            attendance_stats[year].update(self._intervals(results, absence_rate="absent_rate"))
+            policy_violations.extend(
+                f"{year}: {result['rule']} {result['value']:.1%}{self._interval_text(result, '.1%')} "
+                f"(expected {result['expected']})"
+                for result in results.values()
+                if not result["passed"]
+            )
 
         self.validation_results["statistics"]["attendance_rates"] = attendance_stats
 
@@ -369,44 +753,32 @@ class LuminosityDataValidator:
         logger.info("Validating grade distributions...")
 
         grade_stats = {}
-
-        for year in self.years:
-            if "grades" in self.yearly_data[year]:
-                grades_df = self.yearly_data[year]["grades"]
-
-                if "score" in grades_df.columns and len(grades_df) > 0:
-                    scores = grades_df["score"].dropna()
-
-                    grade_stats[year] = {
-                        "mean": scores.mean(),
-                        "median": scores.median(),
-                        "min": scores.min(),
-                        "max": scores.max(),
-                        "below_70_pct": len(scores[scores < 70]) / len(scores),
-                        "perfect_pct": len(scores[scores >= 95]) / len(scores),
-                        "total_grades": len(scores),
-                    }
-
-        # Validate against expected distributions
         distribution_issues = []
-        for year, stats in grade_stats.items():
-            # Check median in 85-90 range
-            if not (82 <= stats["median"] <= 92):
-                distribution_issues.append(
-                    f"{year}: Median {stats['median']:.1f} outside 85-90 range"
-                )
-
-            # Check perfect grades ~3%
-            if not (0.01 <= stats["perfect_pct"] <= 0.06):
-                distribution_issues.append(
-                    f"{year}: Perfect grades {stats['perfect_pct']:.1%} (expected ~3%)"
-                )
-
-            # Check failing grades 3-5%
-            if stats["below_70_pct"] > 0.08:
-                distribution_issues.append(
-                    f"{year}: Below-70 grades {stats['below_70_pct']:.1%} (expected 3-5%)"
+        for year, results in self._rule_results("Grade Distributions").items():
+            scores = self.year_summaries[year]["rules"]["columns"]["grades.score"]
+            grade_stats[year] = {
+                "mean": scores["mean"],
+                "median": results["grade_median"]["value"],
+                "min": scores["min"],
+                "max": scores["max"],
+                "below_70_pct": results["failing_rate"]["value"],
+                "perfect_pct": results["perfect_rate"]["value"],
+                "total_grades": scores["rows"] - scores["nulls"],
+            }
+            grade_stats[year].update(
+                self._intervals(
+                    results,
+                    grade_median="median",
+                    failing_rate="below_70_pct",
+                    perfect_rate="perfect_pct",
                 )
+            )
+            distribution_issues.extend(
+                f"{year}: {result['rule']} {result['value']:.3g}{self._interval_text(result, '.3g')} "
+                f"(expected {result['expected']})"
+                for result in results.values()
+                if not result["passed"]
+            )
 
         self.validation_results["statistics"]["grade_distributions"] = grade_stats
 
@@ -420,28 +792,25 @@ class LuminosityDataValidator:
                 "Grade Distributions", "Grade distributions follow expected patterns"
             )
 
-    def _validate_teacher_assignments(self):
-        """Validate teacher-to-student ratios and assignments"""
-        logger.info("Validating teacher assignments...")
+    @staticmethod
+    def _year_teacher_ratio(year, data):
+        if not ("teachers" in data and "students" in data):
+            return None
 
-        teacher_stats = {}
+        num_teachers = len(data["teachers"])
+        num_students = len(data["students"])
 
-        for year in self.years:
-            data = self.yearly_data[year]
-
-            if "teachers" in data and "students" in data:
-                num_teachers = len(data["teachers"])
-                num_students = len(data["students"])
+        return {
+            "teachers": num_teachers,
+            "students": num_students,
+            "ratio": num_students / num_teachers if num_teachers > 0 else 0,
+        }
 
-                student_teacher_ratio = (
-                    num_students / num_teachers if num_teachers > 0 else 0
-                )
+    def _validate_teacher_assignments(self):
+        """Validate teacher-to-student ratios and assignments"""
+        logger.info("Validating teacher assignments...")
 
-                teacher_stats[year] = {
-                    "teachers": num_teachers,
-                    "students": num_students,
-                    "ratio": student_teacher_ratio,
-                }
+        teacher_stats = dict(self._summaries("teacher_ratio"))
 
         # Check for reasonable student-teacher ratios (8-12 students per teacher)
         ratio_issues = []
@@ -462,73 +831,62 @@ class LuminosityDataValidator:
                 "Teacher Assignments", "Student-teacher ratios within expected range"
             )
 
+    @staticmethod
+    def _year_financial(year, data):
+        if "payments" not in data or len(data["payments"]) == 0:
+            return None
+
+        payments_df = data["payments"]
+        return {
+            "total_revenue": payments_df["amount_paid"].sum(),
+            "avg_payment": payments_df["amount_paid"].mean(),
+            "num_payments": len(payments_df),
+        }
+
     def _validate_financial_data(self):
         """Validate payment patterns and amounts"""
         logger.info("Validating financial data...")
 
-        financial_stats = {}
-
-        for year in self.years:
-            if "payments" in self.yearly_data[year]:
-                payments_df = self.yearly_data[year]["payments"]
-
-                if len(payments_df) > 0:
-                    total_payments = payments_df["amount_paid"].sum()
-                    avg_payment = payments_df["amount_paid"].mean()
-                    num_payments = len(payments_df)
-
-                    financial_stats[year] = {
-                        "total_revenue": total_payments,
-                        "avg_payment": avg_payment,
-                        "num_payments": num_payments,
-                    }
+        financial_stats = dict(self._summaries("financial"))
 
         self.validation_results["statistics"]["financial_summary"] = financial_stats
         self._add_success(
             "Financial Data", f"Payment data validated for {len(financial_stats)} years"
         )
 
+    @staticmethod
+    def _year_student_roster(year, data):
+        if "students" not in data:
+            return None
+        return data["students"][["student_id", "grade_level_id"]]
+
     def _validate_student_progression(self):
         """Validate students progress through grades correctly"""
         logger.info("Validating student progression...")
 
-        # Track students across years
-        student_progressions = defaultdict(list)
-
-        for year in self.years:
-            if "students" in self.yearly_data[year]:
-                students_df = self.yearly_data[year]["students"]
-                for _, student in students_df.iterrows():
-                    student_progressions[student["student_id"]].append(
-                        {
-                            "year": year,
-                            "grade": student["grade_level_id"],
-                            "name": f"{student['first_name']} {student['last_name']}",
-                        }
-                    )
-
-        # Check for logical progressions
-        progression_issues = []
-        students_tracked = 0
-
-        for student_id, progression in student_progressions.items():
-            if len(progression) > 1:
-                students_tracked += 1
-                progression.sort(key=lambda x: x["year"])
-
-                for i in range(1, len(progression)):
-                    prev_grade = progression[i - 1]["grade"]
-                    curr_grade = progression[i]["grade"]
-
-                    # Students should advance one grade per year (or graduate)
-                    if curr_grade != prev_grade + 1:
-                        # Unless they graduated (grade 13 -> no longer present)
-                        if not (prev_grade == 13):
-                            progression_issues.append(
-                                f"Student {student_id}: Grade {prev_grade} -> {curr_grade}"
-                            )
+        # One sorted (student, year) index; adjacent rows are consecutive years on record
+        timeline = self.student_timeline = TimelineIndex.from_rosters(
+            self._summaries("student_roster"), "student_id"
+        )
+        progression_issues = timeline.progression_issues()
+        students_tracked = timeline.tracked()
+
+        self.validation_results["statistics"]["student_progression"] = {
+            "students": len(timeline),
+            "tracked": students_tracked,
+            "irregular_progressions": len(progression_issues),
+            "gaps": len(timeline.gaps()),
+            "graduations": len(timeline.graduations()),
+        }
 
-        if progression_issues:
+        if not len(timeline):
+            self._add_warning("Student Progression", "No student rosters to track")
+        elif len(progression_issues):
+            for issue in progression_issues.head(3).itertuples(index=False):
+                logger.warning(
+                    f"  Student {issue.student_id}: Grade {issue.from_grade_level_id} -> "
+                    f"{issue.to_grade_level_id} ({issue.from_year}->{issue.to_year})"
+                )
             self._add_warning(
                 "Student Progression",
                 f"{len(progression_issues)} irregular progressions out of {students_tracked} tracked",
@@ -539,51 +897,52 @@ class LuminosityDataValidator:
                 f"{students_tracked} students tracked with logical grade progression",
             )
 
+    @staticmethod
+    def _year_teacher_roster(year, data):
+        if "teachers" not in data:
+            return None
+        return data["teachers"][["teacher_id"]]
+
     def _validate_teacher_continuity(self):
         """Validate teacher employment patterns"""
         logger.info("Validating teacher continuity...")
 
-        # Track teachers across years
-        teacher_continuity = defaultdict(list)
-
-        for year in self.years:
-            if "teachers" in self.yearly_data[year]:
-                teachers_df = self.yearly_data[year]["teachers"]
-                for _, teacher in teachers_df.iterrows():
-                    teacher_continuity[teacher["teacher_id"]].append(
-                        {
-                            "year": year,
-                            "name": f"{teacher['first_name']} {teacher['last_name']}",
-                        }
-                    )
+        timeline = self.teacher_timeline = TimelineIndex.from_rosters(
+            self._summaries("teacher_roster"), "teacher_id"
+        )
 
         # Calculate retention statistics
-        total_teacher_years = sum(len(years) for years in teacher_continuity.values())
-        unique_teachers = len(teacher_continuity)
+        total_teacher_years = timeline.records
+        unique_teachers = len(timeline)
         avg_tenure = total_teacher_years / unique_teachers if unique_teachers > 0 else 0
 
         self.validation_results["statistics"]["teacher_continuity"] = {
             "unique_teachers": unique_teachers,
             "avg_tenure_years": avg_tenure,
             "total_teacher_years": total_teacher_years,
+            "gaps": len(timeline.gaps()),
         }
 
-        self._add_success(
-            "Teacher Continuity",
-            f"{unique_teachers} unique teachers, avg tenure {avg_tenure:.1f} years",
-        )
+        if unique_teachers:
+            self._add_success(
+                "Teacher Continuity",
+                f"{unique_teachers} unique teachers, avg tenure {avg_tenure:.1f} years",
+            )
+        else:
+            self._add_warning("Teacher Continuity", "No teacher rosters to track")
+
+    @staticmethod
+    def _year_subjects(year, data):
+        if "subjects" not in data:
+            return None
+        return set(data["subjects"]["name"].tolist())
 
     def _validate_curriculum_evolution(self):
         """Validate curriculum changes over time"""
         logger.info("Validating curriculum evolution...")
 
         # Track subjects by year
-        subjects_by_year = {}
-
-        for year in self.years:
-            if "subjects" in self.yearly_data[year]:
-                subjects_df = self.yearly_data[year]["subjects"]
-                subjects_by_year[year] = set(subjects_df["name"].tolist())
+        subjects_by_year = dict(self._summaries("subjects"))
 
         # Check for curriculum evolution
         curriculum_changes = []
@@ -619,102 +978,108 @@ class LuminosityDataValidator:
         else:
             self._add_warning("Curriculum Evolution", "No curriculum changes detected")
 
-    def _validate_demographic_distributions(self):
-        """Validate demographic distributions"""
-        logger.info("Validating demographic distributions...")
+    @staticmethod
+    def _year_demographics(year, data):
+        if "students" not in data:
+            return None
 
-        demo_stats = {}
+        students_df = data["students"]
 
-        for year in self.years:
-            if "students" in self.yearly_data[year]:
-                students_df = self.yearly_data[year]["students"]
+        # Gender distribution
+        gender_counts = students_df["gender"].value_counts()
+        total_students = len(students_df)
 
-                # Gender distribution
-                gender_counts = students_df["gender"].value_counts()
-                total_students = len(students_df)
+        # Grade level distribution
+        grade_counts = students_df["grade_level_id"].value_counts().sort_index()
 
-                # Grade level distribution
-                grade_counts = students_df["grade_level_id"].value_counts().sort_index()
+        return {
+            "total_students": total_students,
+            "gender_distribution": gender_counts.to_dict(),
+            "grade_distribution": grade_counts.to_dict(),
+        }
 
-                demo_stats[year] = {
-                    "total_students": total_students,
-                    "gender_distribution": gender_counts.to_dict(),
-                    "grade_distribution": grade_counts.to_dict(),
-                }
+    def _validate_demographic_distributions(self):
+        """Validate demographic distributions"""
+        logger.info("Validating demographic distributions...")
+
+        demo_stats = dict(self._summaries("demographics"))
 
         self.validation_results["statistics"]["demographics"] = demo_stats
         self._add_success("Demographics", "Demographic distributions calculated")
 
+    @staticmethod
+    def _year_academic_performance(year, data):
+        if not ("grades" in data and "assignments" in data):
+            return None
+
+        assignments_df = data["assignments"]
+        points_possible = assignments_df.drop_duplicates("assignment_id").set_index(
+            "assignment_id"
+        )["points_possible"]
+
+        # Join each chunk of grades to points_possible and keep running sums
+        percentage_sum = 0.0
+        percentage_count = 0
+        total_grades = 0
+        for chunk in data.chunks("grades", ["assignment_id", "score"]):
+            # Calculate percentage scores (0-100 scale)
+            percentage = chunk["score"] / chunk["assignment_id"].map(points_possible) * 100
+            percentage_sum += float(percentage.sum())
+            percentage_count += int(percentage.count())
+            total_grades += len(chunk)
+
+        return {
+            "avg_percentage": percentage_sum / percentage_count if percentage_count else np.nan,
+            "total_assignments": len(assignments_df),
+            "total_grades": total_grades,
+        }
+
     def _validate_academic_performance(self):
         """Validate academic performance metrics"""
         logger.info("Validating academic performance...")
 
-        performance_stats = {}
-
-        for year in self.years:
-            if (
-                "grades" in self.yearly_data[year]
-                and "assignments" in self.yearly_data[year]
-            ):
-                grades_df = self.yearly_data[year]["grades"]
-                assignments_df = self.yearly_data[year]["assignments"]
-
-                # Calculate GPA equivalent
-                if len(grades_df) > 0:
-                    # Merge grades with assignments to get points_possible
-                    merged = grades_df.merge(
-                        assignments_df[["assignment_id", "points_possible"]],
-                        on="assignment_id",
-                        how="left",
-                    )
-
-                    # Calculate percentage scores (0-100 scale)
-                merged["percentage"] = (
-                    merged["score"] / merged["points_possible"]
-                ) * 100
-
-                performance_stats[year] = {
-                    "avg_percentage": merged["percentage"].mean(),
-                    "total_assignments": len(assignments_df),
-                    "total_grades": len(grades_df),
-                }
+        performance_stats = dict(self._summaries("academic_performance"))
 
         self.validation_results["statistics"][
             "academic_performance"
         ] = performance_stats
         self._add_success("Academic Performance", "Performance metrics calculated")
 
-    def _validate_operational_metrics(self):
-        """Validate operational efficiency metrics"""
-        logger.info("Validating operational metrics...")
-
-        operational_stats = {}
-
-        for year in self.years:
-            data = self.yearly_data[year]
+    @staticmethod
+    def _year_operational(year, data):
+        metrics = {}
 
-            metrics = {}
+        # Classes per teacher
+        if "classes" in data and "teachers" in data:
+            num_classes = len(data["classes"])
+            num_teachers = len(data["teachers"])
+            metrics["classes_per_teacher"] = (
+                num_classes / num_teachers if num_teachers > 0 else 0
+            )
 
-            # Classes per teacher
-            if "classes" in data and "teachers" in data:
-                num_classes = len(data["classes"])
-                num_teachers = len(data["teachers"])
-                metrics["classes_per_teacher"] = (
-                    num_classes / num_teachers if num_teachers > 0 else 0
+        # Students per class
+        if "enrollments" in data and "classes" in data:
+            enrollments_per_class = pd.Series(dtype=float)
+            for chunk in data.chunks("enrollments", ["class_id"]):
+                enrollments_per_class = enrollments_per_class.add(
+                    chunk["class_id"].value_counts(), fill_value=0
                 )
+            enrollments_per_class = enrollments_per_class.astype(np.int64)
+            metrics["avg_students_per_class"] = enrollments_per_class.mean()
+            metrics["max_students_per_class"] = enrollments_per_class.max()
+
+        # Assignments per class (should be ~70 per year)
+        if "assignments" in data and "classes" in data:
+            assignments_per_class = data["assignments"].groupby("class_id").size()
+            metrics["avg_assignments_per_class"] = assignments_per_class.mean()
 
-            # Students per class
-            if "enrollments" in data and "classes" in data:
-                enrollments_per_class = data["enrollments"].groupby("class_id").size()
-                metrics["avg_students_per_class"] = enrollments_per_class.mean()
-                metrics["max_students_per_class"] = enrollments_per_class.max()
+        return metrics
 
-            # Assignments per class (should be ~70 per year)
-            if "assignments" in data and "classes" in data:
-                assignments_per_class = data["assignments"].groupby("class_id").size()
-                metrics["avg_assignments_per_class"] = assignments_per_class.mean()
+    def _validate_operational_metrics(self):
+        """Validate operational efficiency metrics"""
+        logger.info("Validating operational metrics...")
 
-            operational_stats[year] = metrics
+        operational_stats = dict(self._summaries("operational"))
 
         self.validation_results["statistics"]["operational_metrics"] = operational_stats
         self._add_success(
@@ -744,6 +1109,29 @@ class LuminosityDataValidator:
 
     def _generate_validation_report(self):
         """Generate comprehensive validation report"""
+        # Where the time went
+        costs = self.cost_report()
+        metric = memory_metric(self.trace_memory)
+        self.validation_results["costs"] = costs
+        self.validation_results["memory_metric"] = metric
+        logger.info("\n⏱️  CHECK COSTS (slowest first)")
+        logger.info(
+            f"{'Stage':<9} {'Check':<26} {'Seconds':>8} {'Rows':>12} {'MB read':>9} "
+            f"{'Peak MB' if metric == 'traced_peak' else 'RSS +MB':>8} {'Runs':>5}"
+        )
+        for cost in costs:
+            marker = " ⚠️ over budget" if cost["over_budget"] else ""
+            logger.info(
+                f"{cost['stage']:<9} {cost['check']:<26} {cost['seconds']:>8.2f} {cost['rows']:>12,} "
+                f"{cost['bytes'] / 2**20:>9.1f} {cost['memory_mb']:>8.1f} {cost['runs']:>5}{marker}"
+            )
+        over_budget = [f"{cost['stage']}:{cost['check']}" for cost in costs if cost["over_budget"]]
+        if over_budget:
+            self._add_warning(
+                "Performance Budget",
+                f"{len(over_budget)} checks over {self.budget}s: {', '.join(over_budget)}",
+            )
+
         logger.info("\n" + "=" * 60)
         logger.info("📊 VALIDATION SUMMARY REPORT")
         logger.info("=" * 60)
@@ -803,15 +1191,64 @@ def main():
     parser.add_argument(
         "--save-report", default=None, help="Save detailed report to JSON file"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for per-year validation (default: CPU count)",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Stream grades/attendance/enrollments in chunks with bounded memory",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=250000, help="Rows per chunk when streaming"
+    )
+    parser.add_argument(
+        "--sample",
+        action="store_true",
+        help="Estimate rate and distribution rules from a row sample with confidence intervals",
+    )
+    parser.add_argument(
+        "--sample-size", type=int, default=20000, help="Sampled rows per table per year"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for --sample")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="Flag checks whose time in seconds exceeds this budget",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Report each check's exact peak allocation (tracemalloc, slower) instead of the RSS high-water increase",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-run every check instead of reusing results for unchanged files",
+    )
 
     args = parser.parse_args()
+    use_jemalloc()
 
     if not os.path.exists(args.data_dir):
         logger.error(f"Data directory not found: {args.data_dir}")
         return 1
 
     # Initialize validator
-    validator = LuminosityDataValidator(args.data_dir)
+    validator = LuminosityDataValidator(
+        args.data_dir,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        chunk_size=args.chunk_size if args.streaming else None,
+        sample_size=args.sample_size if args.sample else None,
+        sample_seed=args.seed,
+        budget=args.budget,
+        trace_memory=args.trace_memory,
+    )
 
     try:
         # Load and validate data
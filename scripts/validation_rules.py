@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+Declarative business rules for the Luminosity decade dataset
+
+Rules are declared once in BUSINESS_RULES instead of being hand-coded across the
+validator's methods. Six kinds are supported:
+- Range:          every value within [low, high]
+- Enum:           every value in an allowed set
+- NotNull:        no missing values
+- Unique:         no value appears twice
+- RatioInBand:    share of rows matching a value set or threshold lies in a band
+- QuantileInBand: a quantile of the column lies in a band
+
+A RuleSet compiles its rules into one plan per table (the columns any rule reads)
+and scans each table exactly once, chunk by chunk, building a mergeable
+ColumnProfile per column: row count, null count and an exact value histogram.
+Columns only checked for uniqueness (identifiers, one distinct value per row) get
+a KeyProfile instead, which keeps sorted runs of fixed-width key codes rather
+than a histogram. Every rule is then evaluated from the profiles alone, so adding
+a rule on an already-profiled column costs no extra scan.
+
+In sampling mode the statistical rules (ratio and quantile) are estimated from a
+seeded stratified row sample instead. Each estimate comes with a confidence
+interval (Wilson score for ratios, order statistics for quantiles) and the rule
+only fails when the whole interval lies outside its band. Range, enum, not-null
+and uniqueness rules are integrity rules and always run on every row.
+
+Usage:
+    python validation_rules.py --data-dir ../data/decade
+    python validation_rules.py --data-dir ../data/decade --year 2020 --chunk-size 250000
+    python validation_rules.py --data-dir ../data/decade --sample-size 20000
+"""
+
+import argparse
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+FAILURE = "failure"
+WARNING = "warning"
+
+
+class ColumnProfile:
+    """Mergeable row/null counts plus an exact value histogram of one column
+
+    Memory grows with the number of distinct values, not with the number of rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self.histogram = pd.Series(dtype=float)
+
+    def update(self, values: pd.Series):
+        self.rows += len(values)
+        self.nulls += int(values.isna().sum())
+        counts = values.value_counts()
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Categories missing from these rows are counted as 0; histogram by value
+            counts = counts[counts > 0]
+            counts.index = counts.index.astype(values.cat.categories.dtype)
+        self.histogram = self.histogram.add(counts, fill_value=0)
+
+    def merge(self, other: "ColumnProfile"):
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.histogram = self.histogram.add(other.histogram, fill_value=0)
+
+    @property
+    def count(self) -> int:
+        """Non-null values"""
+        return self.rows - self.nulls
+
+    def duplicates(self) -> Tuple[int, int]:
+        """(values seen more than once, rows beyond each value's first)"""
+        counts = self.histogram.to_numpy()
+        repeated = counts > 1
+        return int(repeated.sum()), int((counts[repeated] - 1).sum())
+
+    def numeric(self) -> bool:
+        return pd.api.types.is_numeric_dtype(self.histogram.index)
+
+    def matching(self, mask: np.ndarray) -> int:
+        """Rows whose value satisfies a boolean mask over the histogram index"""
+        return int(self.histogram.to_numpy()[mask].sum())
+
+    def value_at(self, ranks) -> np.ndarray:
+        """Values at 0-based positions of the sorted non-null values"""
+        histogram = self.histogram.sort_index()
+        positions = np.cumsum(histogram.to_numpy())
+        return histogram.index[np.searchsorted(positions, ranks, side="right")]
+
+    def quantile(self, q: float) -> float:
+        """Exact linearly interpolated quantile, read from the histogram"""
+        if not self.count:
+            return np.nan
+        rank = q * (self.count - 1)
+        lower, upper = self.value_at([np.floor(rank), np.ceil(rank)])
+        return lower + (upper - lower) * (rank - np.floor(rank))
+
+    def describe(self) -> Dict:
+        """Row counts, plus mean/min/max for numeric columns"""
+        summary = {"rows": self.rows, "nulls": self.nulls}
+        if self.count and self.numeric():
+            values = self.histogram.index.to_numpy(dtype=float)
+            summary.update(
+                {
+                    "mean": float((values * self.histogram.to_numpy()).sum() / self.count),
+                    "min": self.histogram.index.min(),
+                    "max": self.histogram.index.max(),
+                }
+            )
+        return summary
+
+
+class KeyProfile:
+    """Row/null counts and duplicate detection of an identifier column
+
+    Each chunk is reduced to its sorted distinct 64-bit key codes (a hash of the
+    value; integer keys are hashed as int64), with duplicates inside the chunk
+    counted right away. Runs are merged whenever the newest is at least half the
+    size of the one before, so n rows cost O(n log n) time and 8 bytes per
+    distinct key whatever the chunk size, instead of a histogram with an entry per
+    row that is re-merged on every chunk.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self._runs: List[np.ndarray] = []
+        self._repeated: List[np.ndarray] = []  # Codes seen more than once
+
+    def update(self, values: pd.Series):
+        present = values.dropna()
+        self.rows += len(values)
+        self.nulls += len(values) - len(present)
+        if len(present):
+            if pd.api.types.is_numeric_dtype(present) and not pd.api.types.is_bool_dtype(present):
+                present = present.astype(np.int64)
+            self._add(np.sort(pd.util.hash_pandas_object(present, index=False).to_numpy()))
+
+    def merge(self, other: "KeyProfile"):
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self._repeated.extend(other._repeated)
+        for run in other._runs:
+            self._add(run)
+
+    def _dedupe(self, codes: np.ndarray) -> np.ndarray:
+        """Distinct values of sorted codes, remembering the repeated ones"""
+        repeats = codes[1:] == codes[:-1]
+        if not repeats.any():
+            return codes
+        self._repeated.append(codes[1:][repeats])
+        return codes[np.r_[True, ~repeats]]
+
+    def _add(self, codes: np.ndarray):
+        """Add sorted codes as a new run, then merge runs of similar size"""
+        self._runs.append(self._dedupe(codes))
+        while len(self._runs) > 1 and 2 * len(self._runs[-1]) >= len(self._runs[-2]):
+            newer, older = self._runs.pop(), self._runs.pop()
+            merged = np.concatenate([older, newer])
+            merged.sort(kind="stable")  # Two sorted runs: a linear merge
+            self._runs.append(self._dedupe(merged))
+
+    def _collapse(self):
+        """Merge the remaining runs into one"""
+        if len(self._runs) > 1:
+            self._runs = [self._dedupe(np.sort(np.concatenate(self._runs), kind="stable"))]
+
+    @property
+    def count(self) -> int:
+        """Non-null values"""
+        return self.rows - self.nulls
+
+    def distinct(self) -> int:
+        self._collapse()
+        return sum(len(run) for run in self._runs)
+
+    def duplicates(self) -> Tuple[int, int]:
+        """(values seen more than once, rows beyond each value's first)"""
+        self._collapse()
+        repeated = len(np.unique(np.concatenate(self._repeated))) if self._repeated else 0
+        return repeated, self.count - self.distinct()
+
+    def describe(self) -> Dict:
+        return {"rows": self.rows, "nulls": self.nulls, "distinct": self.distinct()}
+
+
+@dataclass(frozen=True)
+class Rule(ABC):
+    name: str
+    table: str
+    column: str
+    category: str
+    severity: str = FAILURE
+
+    kind = "rule"
+    statistical = False
+
+    @abstractmethod
+    def measure(self, profile: ColumnProfile) -> Tuple[float, int]:
+        """(observed value, violating rows) of the rule on a profile"""
+
+    @abstractmethod
+    def describe(self) -> str:
+        """The expected outcome, for reports"""
+
+    def evaluate(self, profile: ColumnProfile, rows: Optional[int] = None) -> Dict:
+        """Evaluate on a full profile"""
+        value, violations = self.measure(profile)
+        return self._result(profile, value, violations, rows)
+
+    def _result(self, profile: ColumnProfile, value, violations: int, rows: Optional[int]) -> Dict:
+        return {
+            "rule": self.name,
+            "kind": self.kind,
+            "table": self.table,
+            "column": self.column,
+            "category": self.category,
+            "severity": self.severity,
+            "value": value,
+            "rows": profile.rows if rows is None else rows,
+            "violations": violations,
+            "passed": violations == 0,
+            "expected": self.describe(),
+        }
+
+
+@dataclass(frozen=True)
+class BandRule(Rule):
+    """A statistic of the column that must lie in `band`; estimable from a sample"""
+
+    band: Tuple[float, float] = (-np.inf, np.inf)
+
+    statistical = True
+
+    @abstractmethod
+    def interval(self, profile: ColumnProfile, z: float) -> Tuple[float, float]:
+        """Confidence interval of the measured value on a sampled profile"""
+
+    def band_excludes(self, low: float, high: float) -> bool:
+        """True when [low, high] lies entirely outside the rule's band"""
+        return high < self.band[0] or low > self.band[1]
+
+    def evaluate(self, profile: ColumnProfile, rows: Optional[int] = None, z: Optional[float] = None) -> Dict:
+        """Evaluate on a full profile, or on a sample of `rows` rows when z is given"""
+        if z is None:
+            return super().evaluate(profile, rows)
+        value, _ = self.measure(profile)
+        interval = self.interval(profile, z)
+        violations = int(not np.isnan(value) and self.band_excludes(*interval))
+        result = self._result(profile, value, violations, rows)
+        result.update({"interval": interval, "sampled_rows": profile.rows})
+        return result
+
+
+@dataclass(frozen=True)
+class Range(Rule):
+    low: Optional[float] = None
+    high: Optional[float] = None
+    low_inclusive: bool = True
+
+    kind = "range"
+
+    def measure(self, profile):
+        index = profile.histogram.index
+        outside = np.zeros(len(index), dtype=bool)
+        if self.low is not None:
+            outside |= (index < self.low) if self.low_inclusive else (index <= self.low)
+        if self.high is not None:
+            outside |= index > self.high
+        violations = profile.matching(outside)
+        return violations, violations
+
+    def describe(self):
+        low = "-inf" if self.low is None else self.low
+        high = "inf" if self.high is None else self.high
+        return f"{'[' if self.low_inclusive else '('}{low}, {high}]"
+
+
+@dataclass(frozen=True)
+class Enum(Rule):
+    values: FrozenSet = frozenset()
+
+    kind = "enum"
+
+    def measure(self, profile):
+        invalid = ~profile.histogram.index.isin(list(self.values))
+        return sorted(map(str, profile.histogram.index[invalid])), profile.matching(invalid)
+
+    def describe(self):
+        return f"one of {sorted(self.values)}"
+
+
+@dataclass(frozen=True)
+class NotNull(Rule):
+    kind = "not_null"
+
+    def measure(self, profile):
+        return profile.nulls, profile.nulls
+
+    def describe(self):
+        return "no missing values"
+
+
+@dataclass(frozen=True)
+class Unique(Rule):
+    kind = "unique"
+
+    def measure(self, profile):
+        return profile.duplicates()
+
+    def describe(self):
+        return "unique values"
+
+
+@dataclass(frozen=True)
+class RatioInBand(BandRule):
+    """Share of rows matching `values`, or below / at least a threshold"""
+
+    band: Tuple[float, float] = (0.0, 1.0)
+    values: Optional[FrozenSet] = None
+    below: Optional[float] = None
+    at_least: Optional[float] = None
+
+    kind = "ratio"
+
+    def matches(self, index: pd.Index) -> np.ndarray:
+        if self.values is not None:
+            return index.isin(list(self.values))
+        if self.below is not None:
+            return np.asarray(index < self.below)
+        return np.asarray(index >= self.at_least)
+
+    def measure(self, profile):
+        if not profile.rows:
+            return np.nan, 0
+        ratio = profile.matching(self.matches(profile.histogram.index)) / profile.rows
+        return ratio, int(not (self.band[0] <= ratio <= self.band[1]))
+
+    def interval(self, profile, z):
+        """Wilson score interval; conservative for a proportionally stratified sample"""
+        n = profile.rows
+        if not n:
+            return np.nan, np.nan
+        p = profile.matching(self.matches(profile.histogram.index)) / n
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return float(max(0.0, center - half)), float(min(1.0, center + half))
+
+    def describe(self):
+        return f"share in [{self.band[0]:.0%}, {self.band[1]:.0%}]"
+
+
+@dataclass(frozen=True)
+class QuantileInBand(BandRule):
+    q: float = 0.5
+
+    kind = "quantile"
+
+    def measure(self, profile):
+        value = profile.quantile(self.q)
+        if np.isnan(value):
+            return value, 0
+        return value, int(not (self.band[0] <= value <= self.band[1]))
+
+    def interval(self, profile, z):
+        """Distribution-free interval between the order statistics around rank n*q"""
+        n = profile.count
+        if not n:
+            return np.nan, np.nan
+        spread = z * np.sqrt(n * self.q * (1 - self.q))
+        ranks = np.clip([np.floor(n * self.q - spread), np.ceil(n * self.q + spread)], 0, n - 1)
+        low, high = profile.value_at(ranks)
+        return float(low), float(high)
+
+    def describe(self):
+        return f"q{self.q:g} in [{self.band[0]}, {self.band[1]}]"
+
+
+class RuleSet:
+    """Rules compiled into one single-pass scan plan per table"""
+
+    def __init__(self, rules: List[Rule]):
+        names = [rule.name for rule in rules]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate rule names: {sorted(duplicates)}")
+
+        self.rules = list(rules)
+        self.plan = {}
+        for rule in self.rules:
+            columns = self.plan.setdefault(rule.table, [])
+            if rule.column not in columns:
+                columns.append(rule.column)
+
+    @property
+    def tables(self) -> Tuple[str, ...]:
+        return tuple(sorted(self.plan))
+
+    def _keys_only(self, table: str, column: str) -> bool:
+        return all(
+            isinstance(rule, Unique)
+            for rule in self.rules
+            if rule.table == table and rule.column == column
+        )
+
+    def profile(self, table: str, chunks, columns: List[str]) -> Dict[str, ColumnProfile]:
+        """One pass over a table's chunks, profiling every planned column at once;
+        columns only checked for uniqueness get a KeyProfile"""
+        profiles = {
+            column: KeyProfile() if self._keys_only(table, column) else ColumnProfile()
+            for column in columns
+        }
+        for chunk in chunks:
+            for column, profile in profiles.items():
+                profile.update(chunk[column])
+        return profiles
+
+    def evaluate(
+        self,
+        data,
+        sample_size: Optional[int] = None,
+        seed: int = 42,
+        confidence: float = 0.95,
+    ) -> Dict:
+        """Evaluate every rule against a year's tables (a YearTables-like mapping)
+
+        With a sample_size, statistical rules are estimated from data.sample()
+        with `confidence` intervals while the other rules still scan every row.
+        Returns {"results": {rule name: result}, "columns": {"table.column": profile
+        summary}}. Rules on a missing table or column are skipped.
+        """
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        results = {}
+        columns = {}
+        for table, planned in self.plan.items():
+            if table not in data:
+                continue
+            header = data.columns(table)
+            rules = [rule for rule in self.rules if rule.table == table and rule.column in header]
+            if not rules:
+                continue
+
+            sampled = [rule for rule in rules if sample_size and rule.statistical]
+            exact = [rule for rule in rules if rule not in sampled]
+            exact_columns = [column for column in planned if any(r.column == column for r in exact)]
+            sampled_columns = [column for column in planned if any(r.column == column for r in sampled)]
+
+            if exact:
+                profiles = self.profile(table, data.chunks(table, exact_columns), exact_columns)
+                for column, profile in profiles.items():
+                    columns[f"{table}.{column}"] = profile.describe()
+                for rule in exact:
+                    results[rule.name] = rule.evaluate(profiles[rule.column])
+
+            if sampled:
+                sample, rows = data.sample(table, sampled_columns, sample_size, seed)
+                sample_profiles = self.profile(table, [sample], sampled_columns)
+                for rule in sampled:
+                    results[rule.name] = rule.evaluate(sample_profiles[rule.column], rows, z)
+
+        results = {rule.name: results[rule.name] for rule in self.rules if rule.name in results}
+        return {"results": results, "columns": columns}
+
+
+ATTENDANCE_STATUSES = frozenset({"Present", "Absent", "Tardy", "Excused", "Dismissed"})
+
+BUSINESS_RULES = RuleSet(
+    [
+        # Data types and ranges
+        Range("grade_score_range", "grades", "score", "Data Types", low=0, high=100),
+        NotNull("grade_score_present", "grades", "score", "Data Types"),
+        Unique("grade_id_unique", "grades", "grade_id", "Data Types"),
+        Enum("attendance_status_enum", "attendance", "status", "Data Types", values=ATTENDANCE_STATUSES),
+        Unique("attendance_id_unique", "attendance", "attendance_id", "Data Types"),
+        Range("payment_amount_positive", "payments", "amount_paid", "Data Types", low=0, low_inclusive=False),
+        Unique("payment_id_unique", "payments", "payment_id", "Data Types"),
+        Unique("student_id_unique", "students", "student_id", "Data Types"),
+        NotNull("student_grade_level_present", "students", "grade_level_id", "Data Types"),
+        Unique("teacher_id_unique", "teachers", "teacher_id", "Data Types"),
+        # Attendance policy: 5% ± 2% absences, 3% ± 2% tardies
+        RatioInBand(
+            "absence_rate",
+            "attendance",
+            "status",
+            "Attendance Policies",
+            WARNING,
+            band=(0.03, 0.07),
+            values=frozenset({"Absent", "Excused"}),
+        ),
+        RatioInBand(
+            "tardy_rate",
+            "attendance",
+            "status",
+            "Attendance Policies",
+            WARNING,
+            band=(0.01, 0.05),
+            values=frozenset({"Tardy"}),
+        ),
+        # Grade distribution: 85-90 median, ~3% perfect, 3-5% failing
+        QuantileInBand("grade_median", "grades", "score", "Grade Distributions", WARNING, q=0.5, band=(82, 92)),
+        RatioInBand(
+            "perfect_rate", "grades", "score", "Grade Distributions", WARNING, band=(0.01, 0.06), at_least=95
+        ),
+        RatioInBand(
+            "failing_rate", "grades", "score", "Grade Distributions", WARNING, band=(0.0, 0.08), below=70
+        ),
+    ]
+)
+
+
+def main():
+    """Evaluate the business rules for every year (or one) and print the results"""
+    from validate_decade_data import YearTables
+
+    parser = argparse.ArgumentParser(description="Evaluate Luminosity business rules")
+    parser.add_argument(
+        "--data-dir", default="../data/decade", help="Directory containing decade data"
+    )
+    parser.add_argument("--year", type=int, default=None, help="Only evaluate this school year")
+    parser.add_argument(
+        "--chunk-size", type=int, default=None, help="Stream large tables in chunks of this size"
+    )
+    parser.add_argument(
+        "--sample-size", type=int, default=None, help="Estimate statistical rules from this many rows"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for --sample-size")
+    args = parser.parse_args()
+
+    years = sorted(
+        int(item.split("-")[0])
+        for item in os.listdir(args.data_dir)
+        if "-" in item and os.path.isdir(os.path.join(args.data_dir, item))
+    )
+    failed = 0
+    for year in years:
+        if args.year is not None and year != args.year:
+            continue
+        data = YearTables(os.path.join(args.data_dir, f"{year}-{year+1}"), args.chunk_size)
+        evaluation = BUSINESS_RULES.evaluate(data, sample_size=args.sample_size, seed=args.seed)
+        for result in evaluation["results"].values():
+            status = "✅" if result["passed"] else ("❌" if result["severity"] == FAILURE else "⚠️ ")
+            failed += not result["passed"] and result["severity"] == FAILURE
+            value = result["value"]
+            value = f"{value:.4g}" if isinstance(value, float) else value
+            if "interval" in result:
+                value = f"{value} [{result['interval'][0]:.4g}, {result['interval'][1]:.4g}]"
+            print(
+                f"{status} {year} {result['rule']}: {value} "
+                f"({result['violations']:,} violations, expected {result['expected']})"
+            )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())